@@ -221,3 +221,20 @@ CH_CMDS_PER_PAGE               = 20
 PWD_TIMEOUT_TOTAL              = 1800
 PWD_TIMEOUT_REFRESH            = 300
 THREAD_POOL_MAX_WORKERS        = 2
+CONNECTION_POOL_MIN_SIZE       = 0
+CONNECTION_POOL_MAX_SIZE       = 4
+CONNECTION_POOL_IDLE_TIMEOUT   = 600
+PUSH_CHANNEL_PORT              = None
+RESPONSE_QUEUE_MAX_SIZE        = 64*1024*1024
+RESPONSE_QUEUE_TIMEOUT         = 300
+REQUEST_POOL_MAX_WORKERS       = 32
+REQUEST_POOL_MAX_PER_USER      = 8
+REQUEST_POOL_PRIORITY_WORKERS  = 4
+COMPACT_RESULT_BLOCKS          = True
+EDIT_DATA_BATCH_SIZE           = 500
+TERMINAL_IDLE_SECONDS          = 1
+TERMINAL_FRAME_SECONDS         = 0.02
+TERMINAL_FRAME_SIZE            = 10000
+TAB_IDLE_TIMEOUT               = 3600
+CLOSER_THREADS                 = 4
+EDIT_DATA_IDLE_TIMEOUT         = 30
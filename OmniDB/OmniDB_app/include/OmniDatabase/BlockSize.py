@@ -0,0 +1,71 @@
+'''
+The MIT License (MIT)
+
+Portions Copyright (c) 2015-2019, The OmniDB Team
+Portions Copyright (c) 2017-2019, 2ndQuadrant Limited
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+'''
+------------------------------------------------------------------------
+Adaptive Block Size
+------------------------------------------------------------------------
+'''
+class AdaptiveBlockSize(object):
+    """Chooses the number of rows of each QueryBlock call in loops that read a
+        whole result, such as fetch all and exports.
+
+        After each block, Update receives the rows fetched, their approximate
+        size in bytes and the seconds the fetch took. The next block aims at
+        v_block_bytes bytes and v_block_seconds seconds, grows at most 4 times
+        per block and stays between v_block_size_min and v_block_size_max.
+        These limits are capability flags of each OmniDatabase technology.
+        The first block starts at p_size, or v_block_size when not given. Its
+        time includes executing the query, so only its size in bytes is used.
+    """
+    def __init__(self, p_database, p_size=None):
+        self.v_enabled = p_database.v_block_size_adaptive
+        self.v_min_size = p_database.v_block_size_min
+        self.v_max_size = p_database.v_block_size_max
+        if p_size is None:
+            self.v_size = p_database.v_block_size
+        else:
+            self.v_size = max(self.v_min_size, min(self.v_max_size, p_size))
+        self.v_bytes = p_database.v_block_bytes
+        self.v_seconds = p_database.v_block_seconds
+        self.v_first = True
+
+    def Size(self):
+        return self.v_size
+
+    def Update(self, p_rows, p_bytes, p_seconds):
+        # A short block is the end of the result and says nothing about speed
+        if not self.v_enabled or p_rows < self.v_size:
+            return self.v_size
+        v_first = self.v_first
+        self.v_first = False
+        v_size = self.v_max_size
+        if p_bytes > 0:
+            v_size = min(v_size, int(self.v_bytes * p_rows / p_bytes))
+        if p_seconds > 0 and not v_first:
+            v_size = min(v_size, int(self.v_seconds * p_rows / p_seconds))
+        v_size = min(v_size, self.v_size * 4)
+        self.v_size = max(self.v_min_size, min(self.v_max_size, v_size))
+        return self.v_size
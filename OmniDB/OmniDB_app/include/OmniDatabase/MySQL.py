@@ -158,6 +158,15 @@ class MySQL:
         self.v_reserved_words = []
         self.v_console_help = "Console tab. Type the commands in the editor below this box. \? to view command list."
         self.v_use_server_cursor = False
+        self.v_block_size_adaptive = True
+        self.v_block_size = 1000
+        self.v_block_size_min = 100
+        self.v_block_size_max = 50000
+        self.v_block_bytes = 4*1024*1024
+        self.v_block_seconds = 1.0
+        self.v_can_insert_multiple_rows = True
+        self.v_can_update_from_values = False
+        self.v_can_copy_to_csv = False
 
     # Decorator to acquire lock before performing action
     def lock_required(function):
@@ -577,6 +586,18 @@ class MySQL:
             ), True
         )
 
+    def QueryTableRecordsBlock(self, p_column_list, p_table, p_filter, p_blocksize):
+        return self.v_connection.QueryBlock('''
+            select {0}
+            from {1} t
+            {2}
+        '''.format(
+                p_column_list,
+                p_table,
+                p_filter
+            ), p_blocksize, True, True, True
+        )
+
     def QueryFunctions(self, p_all_schemas=False, p_schema=None):
         v_filter = ''
         if not p_all_schemas:
@@ -159,6 +159,15 @@ class Oracle:
         self.v_reserved_words = []
         self.v_console_help = "Console tab. Type the commands in the editor below this box. \? to view command list."
         self.v_use_server_cursor = False
+        self.v_block_size_adaptive = True
+        self.v_block_size = 1000
+        self.v_block_size_min = 100
+        self.v_block_size_max = 20000
+        self.v_block_bytes = 4*1024*1024
+        self.v_block_seconds = 1.0
+        self.v_can_insert_multiple_rows = False
+        self.v_can_update_from_values = False
+        self.v_can_copy_to_csv = False
 
     # Decorator to acquire lock before performing action
     def lock_required(function):
@@ -648,6 +657,19 @@ class Oracle:
             ), True
         )
 
+    @lock_required
+    def QueryTableRecordsBlock(self, p_column_list, p_table, p_filter, p_blocksize):
+        return self.v_connection.QueryBlock('''
+            select {0}
+            from {1} t
+            {2}
+        '''.format(
+                p_column_list,
+                p_table,
+                p_filter
+            ), p_blocksize, True, True, True
+        )
+
     @lock_required
     def QueryFunctions(self, p_all_schemas=False, p_schema=None):
         v_filter = ''
@@ -0,0 +1,135 @@
+'''
+The MIT License (MIT)
+
+Portions Copyright (c) 2015-2019, The OmniDB Team
+Portions Copyright (c) 2017-2019, 2ndQuadrant Limited
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import threading
+from datetime import datetime, timedelta
+
+'''
+------------------------------------------------------------------------
+Connection Pool
+------------------------------------------------------------------------
+'''
+class ConnectionPool(object):
+    """Keeps warm OmniDatabase objects so that tabs pointing to the same
+        database can reuse an open connection instead of connecting again.
+
+        Pools are keyed on a tuple chosen by the caller, usually connection
+        id, database and user. Objects handed out by Acquire are tracked with
+        their owner until Release returns them. ReleaseOrphans puts back
+        objects whose owner no longer exists.
+    """
+    def __init__(self, p_min_size=0, p_max_size=4, p_idle_timeout=600):
+        self.v_min_size = p_min_size
+        self.v_max_size = p_max_size
+        self.v_idle_timeout = p_idle_timeout
+        self.v_lock = threading.Lock()
+        self.v_idle = {}
+        self.v_busy = {}
+
+    def IsHealthy(self, p_database):
+        try:
+            return p_database.v_connection.GetConStatus() in (0, 1)
+        except Exception:
+            return False
+
+    def Discard(self, p_database):
+        try:
+            p_database.v_connection.Close()
+        except Exception:
+            None
+
+    def Acquire(self, p_key, p_factory, p_owner=None):
+        v_database = None
+        v_discarded = []
+        with self.v_lock:
+            v_idle = self.v_idle.get(p_key, [])
+            while v_idle and v_database is None:
+                v_candidate = v_idle.pop()[0]
+                if self.IsHealthy(v_candidate):
+                    v_database = v_candidate
+                else:
+                    v_discarded.append(v_candidate)
+            v_pooled = len(self.v_idle.get(p_key, [])) + self.Busy(p_key) < self.v_max_size
+        for v_candidate in v_discarded:
+            self.Discard(v_candidate)
+        if v_database is None:
+            v_database = p_factory()
+            if not v_pooled:
+                return v_database
+        v_database.v_pool_key = p_key
+        with self.v_lock:
+            self.v_busy[id(v_database)] = (v_database, p_owner)
+        return v_database
+
+    def Release(self, p_database):
+        with self.v_lock:
+            v_entry = self.v_busy.pop(id(p_database), None)
+        if v_entry is None or not self.IsHealthy(p_database):
+            self.Discard(p_database)
+            return
+        v_key = p_database.v_pool_key
+        with self.v_lock:
+            v_idle = self.v_idle.setdefault(v_key, [])
+            if len(v_idle) + self.Busy(v_key) < self.v_max_size:
+                v_idle.append((p_database, datetime.now()))
+                return
+        self.Discard(p_database)
+
+    def Busy(self, p_key):
+        return len([e for e in self.v_busy.values() if e[0].v_pool_key == p_key])
+
+    def Evict(self):
+        v_limit = datetime.now() - timedelta(0, self.v_idle_timeout)
+        v_evicted = []
+        with self.v_lock:
+            for v_key in list(self.v_idle):
+                v_idle = self.v_idle[v_key]
+                v_keep = []
+                for v_entry in reversed(v_idle):
+                    if len(v_keep) < self.v_min_size or v_entry[1] > v_limit:
+                        v_keep.insert(0, v_entry)
+                    else:
+                        v_evicted.append(v_entry[0])
+                if v_keep:
+                    self.v_idle[v_key] = v_keep
+                else:
+                    del self.v_idle[v_key]
+        for v_database in v_evicted:
+            self.Discard(v_database)
+        return len(v_evicted)
+
+    def ReleaseOrphans(self, p_is_alive):
+        with self.v_lock:
+            v_orphans = [e[0] for e in self.v_busy.values() if e[1] is not None and not p_is_alive(e[1])]
+        for v_database in v_orphans:
+            self.Release(v_database)
+        return len(v_orphans)
+
+    def Clear(self):
+        with self.v_lock:
+            v_databases = [e[0] for v in self.v_idle.values() for e in v]
+            self.v_idle = {}
+        for v_database in v_databases:
+            self.Discard(v_database)
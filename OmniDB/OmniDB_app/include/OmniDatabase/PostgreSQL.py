@@ -720,6 +720,15 @@ class PostgreSQL:
         self.v_version = ''
         self.v_version_num = ''
         self.v_use_server_cursor = True
+        self.v_block_size_adaptive = True
+        self.v_block_size = 1000
+        self.v_block_size_min = 100
+        self.v_block_size_max = 50000
+        self.v_block_bytes = 4*1024*1024
+        self.v_block_seconds = 1.0
+        self.v_can_insert_multiple_rows = True
+        self.v_can_update_from_values = True
+        self.v_can_copy_to_csv = True
 
     # Decorator to acquire lock before performing action
     def lock_required(function):
@@ -1940,6 +1949,19 @@ class PostgreSQL:
             ), False
         )
 
+    @lock_required
+    def QueryTableRecordsBlock(self, p_column_list, p_table, p_filter, p_blocksize):
+        return self.v_connection.QueryBlock('''
+            select {0}
+            from {1} t
+            {2}
+        '''.format(
+                p_column_list,
+                p_table,
+                p_filter
+            ), p_blocksize, False, True, True
+        )
+
     @lock_required
     def QueryFunctions(self, p_all_schemas=False, p_schema=None):
         v_filter = ''
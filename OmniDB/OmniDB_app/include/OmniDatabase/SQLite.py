@@ -114,6 +114,15 @@ class SQLite:
         self.v_reserved_words = []
         self.v_console_help = "Console tab."
         self.v_use_server_cursor = False
+        self.v_block_size_adaptive = True
+        self.v_block_size = 5000
+        self.v_block_size_min = 500
+        self.v_block_size_max = 100000
+        self.v_block_bytes = 4*1024*1024
+        self.v_block_seconds = 0.5
+        self.v_can_insert_multiple_rows = True
+        self.v_can_update_from_values = False
+        self.v_can_copy_to_csv = False
         self.v_version = ''
         self.v_version_num = ''
 
@@ -818,6 +827,18 @@ class SQLite:
             ), True
         )
 
+    def QueryTableRecordsBlock(self, p_column_list, p_table, p_filter, p_blocksize):
+        return self.v_connection.QueryBlock('''
+            select {0}
+            from {1} t
+            {2}
+        '''.format(
+                p_column_list,
+                p_table,
+                p_filter
+            ), p_blocksize, True, True, True
+        )
+
     def TemplateCreateView(self):
         return Template('''CREATE
 --TEMPORARY
@@ -28,6 +28,8 @@ from OmniDB_app.include.OmniDatabase.PostgreSQL import PostgreSQL
 from OmniDB_app.include.OmniDatabase.Oracle import Oracle
 from OmniDB_app.include.OmniDatabase.MariaDB import MariaDB
 from OmniDB_app.include.OmniDatabase.MySQL import MySQL
+from OmniDB_app.include.OmniDatabase.Pool import ConnectionPool
+from OmniDB_app.include.OmniDatabase.BlockSize import AdaptiveBlockSize
 
 '''
 ------------------------------------------------------------------------
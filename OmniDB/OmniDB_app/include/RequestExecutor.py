@@ -0,0 +1,200 @@
+'''
+The MIT License (MIT)
+
+Portions Copyright (c) 2015-2019, The OmniDB Team
+Portions Copyright (c) 2017-2019, 2ndQuadrant Limited
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+'''
+
+import threading
+import time
+from collections import deque
+
+import logging
+logger = logging.getLogger('OmniDB_app.RequestExecutor')
+
+'''
+------------------------------------------------------------------------
+Request Executor
+------------------------------------------------------------------------
+'''
+class RequestTask(object):
+    """Unit of work run by RequestExecutor. It has the same interface as
+        polling.StoppableThread: the target function receives the task itself
+        as first argument, checks self.cancel to stop cooperatively, and
+        stop() sets that flag, and also removes the task if it is still queued.
+    """
+    def __init__(self, p_executor, p_target, p_args, p_user=None, p_priority=False):
+        self.v_executor = p_executor
+        self.v_target = p_target
+        self.v_args = p_args
+        self.v_user = p_user
+        self.v_priority = p_priority
+        self.v_queued_at = None
+        self.v_started_at = None
+        self.cancel = False
+    def stop(self):
+        self.cancel = True
+        self.v_executor.Drop(self)
+    def start(self):
+        self.v_executor.Submit(self)
+    def run(self):
+        self.v_target(self, self.v_args)
+
+class RequestExecutor(object):
+    """Runs RequestTask objects on a bounded set of worker threads.
+
+        At most p_max_workers normal tasks run at once, and each user runs at
+        most p_max_per_user tasks. Tasks submitted with p_priority, such as
+        loading a page of edit data, are taken first and may also use
+        p_priority_workers extra workers, so they are not stuck behind long
+        queries. Tasks cancelled while queued are dropped without running and
+        passed to p_on_drop, so the caller can still answer the request.
+    """
+    def __init__(self, p_max_workers=32, p_max_per_user=8, p_priority_workers=4, p_on_drop=None):
+        self.v_max_workers = p_max_workers
+        self.v_max_per_user = p_max_per_user
+        self.v_priority_workers = p_priority_workers
+        self.v_on_drop = p_on_drop
+        self.v_condition = threading.Condition()
+        self.v_queues = {True: deque(), False: deque()}
+        self.v_running = {True: 0, False: 0}
+        self.v_running_user = {}
+        self.v_workers = 0
+        self.v_idle = 0
+        self.v_local = threading.local()
+        self.v_completed = 0
+        self.v_dropped = 0
+        self.v_wait_total = 0.0
+        self.v_wait_max = 0.0
+
+    def Task(self, p_target, p_args, p_user=None, p_priority=False):
+        return RequestTask(self, p_target, p_args, p_user, p_priority)
+
+    def Submit(self, p_task):
+        with self.v_condition:
+            p_task.v_queued_at = time.time()
+            self.v_queues[p_task.v_priority].append(p_task)
+            if self.v_idle == 0 and self.v_workers < self.v_max_workers + self.v_priority_workers:
+                self.v_workers += 1
+                t = threading.Thread(target=self.Worker)
+                t.setDaemon(True)
+                t.start()
+            self.v_condition.notify()
+
+    def CanRun(self, p_task):
+        if self.v_running_user.get(p_task.v_user, 0) >= self.v_max_per_user:
+            return False
+        v_total = self.v_running[True] + self.v_running[False]
+        if p_task.v_priority:
+            return v_total < self.v_max_workers + self.v_priority_workers
+        return self.v_running[False] < self.v_max_workers and v_total < self.v_max_workers + self.v_priority_workers
+
+    def Drop(self, p_task):
+        with self.v_condition:
+            v_queue = self.v_queues[p_task.v_priority]
+            if p_task not in v_queue:
+                return
+            v_queue.remove(p_task)
+            self.v_dropped += 1
+        self.Dropped([p_task])
+
+    def Dropped(self, p_tasks):
+        # Called without the condition held
+        if self.v_on_drop is None:
+            return
+        for v_task in p_tasks:
+            try:
+                self.v_on_drop(v_task)
+            except Exception as exc:
+                logger.error('Request drop handler failed: {0}'.format(str(exc)))
+
+    def NextTask(self, p_dropped):
+        # Called with the condition held. Cancelled tasks are moved to
+        # p_dropped and tasks of users at their cap are skipped, keeping their
+        # order.
+        for v_priority in (True, False):
+            v_queue = self.v_queues[v_priority]
+            for v_task in list(v_queue):
+                if v_task.cancel:
+                    v_queue.remove(v_task)
+                    self.v_dropped += 1
+                    p_dropped.append(v_task)
+                elif self.CanRun(v_task):
+                    v_queue.remove(v_task)
+                    return v_task
+        return None
+
+    def Worker(self):
+        while True:
+            v_dropped = []
+            with self.v_condition:
+                self.v_idle += 1
+                v_task = self.NextTask(v_dropped)
+                while v_task is None and len(v_dropped) == 0:
+                    self.v_condition.wait()
+                    v_task = self.NextTask(v_dropped)
+                self.v_idle -= 1
+                if v_task is not None:
+                    self.v_running[v_task.v_priority] += 1
+                    self.v_running_user[v_task.v_user] = self.v_running_user.get(v_task.v_user, 0) + 1
+                    v_task.v_started_at = time.time()
+                    v_wait = v_task.v_started_at - v_task.v_queued_at
+                    self.v_wait_total += v_wait
+                    self.v_wait_max = max(self.v_wait_max, v_wait)
+            self.Dropped(v_dropped)
+            if v_task is None:
+                continue
+            self.v_local.task = v_task
+            try:
+                v_task.run()
+            except Exception as exc:
+                logger.error('Request task failed: {0}'.format(str(exc)))
+            finally:
+                self.v_local.task = None
+                with self.v_condition:
+                    self.v_running[v_task.v_priority] -= 1
+                    self.v_running_user[v_task.v_user] -= 1
+                    if self.v_running_user[v_task.v_user] == 0:
+                        del self.v_running_user[v_task.v_user]
+                    self.v_completed += 1
+                    self.v_condition.notify_all()
+
+    def CurrentTask(self):
+        return getattr(self.v_local, 'task', None)
+
+    def Queued(self, p_user=None):
+        with self.v_condition:
+            return len([t for q in self.v_queues.values() for t in q if p_user is None or t.v_user == p_user])
+
+    def Stats(self):
+        with self.v_condition:
+            v_started = self.v_completed + self.v_running[True] + self.v_running[False]
+            return {
+                'workers': self.v_workers,
+                'queued_priority': len(self.v_queues[True]),
+                'queued': len(self.v_queues[False]),
+                'running_priority': self.v_running[True],
+                'running': self.v_running[False],
+                'completed': self.v_completed,
+                'dropped': self.v_dropped,
+                'wait_avg': self.v_wait_total / v_started if v_started > 0 else 0.0,
+                'wait_max': self.v_wait_max
+            }
@@ -148,6 +148,12 @@ class Session(object):
                         self.v_databases[p_database_index]['tunnel_object'] = str(server.local_bind_port)
                         self.v_databases[p_database_index]['database'].v_connection.v_host = '127.0.0.1'
                         self.v_databases[p_database_index]['database'].v_connection.v_port = server.local_bind_port
+                        self.v_databases[p_database_index]['database'].v_connection.v_tunnel_target = (
+                            self.v_databases[p_database_index]['tunnel']['server'],
+                            str(self.v_databases[p_database_index]['tunnel']['port']),
+                            self.v_databases[p_database_index]['database'].v_active_server,
+                            str(self.v_databases[p_database_index]['database'].v_active_port)
+                        )
 
                         s['omnidb_session'] = self
                         s.save()
@@ -24,17 +24,37 @@ SOFTWARE.
 
 from collections import OrderedDict
 from abc import ABC, abstractmethod
+import builtins
 import datetime
 import decimal
+import gzip
+import io
 import json
 import math
+import re
+import queue
+import select
+import threading
+import time
 
 import OmniDB_app.include.Spartacus as Spartacus
 import OmniDB_app.include.Spartacus.prettytable as prettytable
 from urllib.parse import urlparse
 
+import logging
+logger = logging.getLogger('OmniDB_app.Spartacus')
+
 v_supported_rdbms = []
 
+# PostgreSQL type maps shared by all connections to the same server,
+# keyed by PostgreSQL.TypesKey() and holding (server_version, {oid: typname}).
+v_pg_types = {}
+v_pg_types_lock = threading.Lock()
+
+# Text made only of characters prettytable counts as one column wide, so
+# DataTable.PrettyWidth can use len() instead of measuring every character.
+v_pretty_plain = re.compile('[\x01-\x07\x09-\x1a\x1c-\x1e\x20-\x7e]*\\Z')
+
 try:
     import sqlite3
     v_supported_rdbms.append('SQLite')
@@ -91,6 +111,7 @@ class DataTable(object):
         self.Rows = []
         self.AllTypesStr = p_alltypesstr
         self.Simple = p_simple
+        self.Indexes = {}
     def AddColumn(self, p_columnname):
         self.Columns.append(p_columnname)
     def AddRow(self, p_row):
@@ -104,20 +125,37 @@ class DataTable(object):
                                 v_rowtmp2[j] = str(v_rowtmp2[j])
                             else:
                                 v_rowtmp2[j] = ''
-                    v_rowtmp = OrderedDict(zip(self.Columns, tuple(v_rowtmp2)))
                     if self.Simple:
-                        v_row = []
-                        for c in self.Columns:
-                            v_row.append(v_rowtmp[c])
+                        v_row = list(v_rowtmp2)
                     else:
-                        v_row = v_rowtmp
+                        v_row = OrderedDict(zip(self.Columns, tuple(v_rowtmp2)))
                 else:
                     v_row = p_row
                 self.Rows.append(v_row)
+                if self.Indexes:
+                    self.RefreshIndexes()
             else:
                 raise Spartacus.Database.Exception('Can not add row to a table with different columns.')
         else:
             raise Spartacus.Database.Exception('Can not add row to a table with no columns.')
+    def AddRows(self, p_rows):
+        if len(self.Columns) > 0:
+            v_width = len(self.Columns)
+            for r in p_rows:
+                if len(r) != v_width:
+                    raise Spartacus.Database.Exception('Can not add row to a table with different columns.')
+            if self.AllTypesStr:
+                v_rows = [[str(v) if v != None else '' for v in r] for r in p_rows]
+            else:
+                v_rows = p_rows
+            if self.Simple:
+                self.Rows.extend([list(r) for r in v_rows])
+            else:
+                self.Rows.extend([OrderedDict(zip(self.Columns, r)) for r in v_rows])
+            if self.Indexes:
+                self.RefreshIndexes()
+        else:
+            raise Spartacus.Database.Exception('Can not add row to a table with no columns.')
     def Select(self, p_key, p_value):
         if isinstance(p_key, list):
             v_key = p_key
@@ -132,18 +170,13 @@ class DataTable(object):
                 v_table = Spartacus.Database.DataTable(None, p_alltypesstr=self.AllTypesStr, p_simple=self.Simple)
                 for c in self.Columns:
                     v_table.AddColumn(c)
+                v_positions = self.SelectIndex(v_key, v_value)
+                if v_positions is not None:
+                    for k in v_positions:
+                        v_table.Rows.append(self.Rows[k])
+                    return v_table
                 if self.Simple:
-                    v_keytmp = v_key
-                    v_key = []
-                    for x in v_keytmp:
-                        k = 0
-                        found = False
-                        while not found and k < len(self.Columns):
-                            if self.Columns[k] == x:
-                                found = True
-                                v_key.append(k)
-                            else:
-                                k = k + 1
+                    v_key = self.ColumnPositions(v_key)
                 for r in self.Rows:
                     v_match = True
                     for k in range(len(v_key)):
@@ -156,11 +189,90 @@ class DataTable(object):
                 raise Spartacus.Database.Exception(str(exc))
         else:
             raise Spartacus.Database.Exception('Can not select with different key-value dimension.')
+    def ColumnPositions(self, p_columns):
+        v_positions = []
+        for x in p_columns:
+            k = 0
+            found = False
+            while not found and k < len(self.Columns):
+                if self.Columns[k] == x:
+                    found = True
+                    v_positions.append(k)
+                else:
+                    k = k + 1
+        return v_positions
+    def CreateIndex(self, p_columns):
+        if isinstance(p_columns, list):
+            v_columns = tuple(p_columns)
+        else:
+            v_columns = (p_columns,)
+        for c in v_columns:
+            if c not in self.Columns:
+                raise Spartacus.Database.Exception('Can not create index on column "{0}" because it does not exist.'.format(c))
+        if self.Simple:
+            v_keys = self.ColumnPositions(v_columns)
+        else:
+            v_keys = list(v_columns)
+        self.Indexes[v_columns] = {
+            'keys': v_keys,
+            'map': {},
+            'count': 0
+        }
+        self.RefreshIndexes()
+    def DropIndex(self, p_columns):
+        if isinstance(p_columns, list):
+            v_columns = tuple(p_columns)
+        else:
+            v_columns = (p_columns,)
+        self.Indexes.pop(v_columns, None)
+    def RefreshIndexes(self):
+        v_rows = self.Rows
+        v_len = len(v_rows)
+        for v_index in self.Indexes.values():
+            if v_index['count'] > v_len:
+                v_index['map'] = {}
+                v_index['count'] = 0
+            v_map = v_index['map']
+            v_keys = v_index['keys']
+            if v_map is not None:
+                try:
+                    for k in range(v_index['count'], v_len):
+                        r = v_rows[k]
+                        v_map.setdefault(tuple([self.CompareValue(r[c]) for c in v_keys]), []).append(k)
+                except TypeError:
+                    # Some key value can't be hashed, Select scans the rows instead
+                    v_index['map'] = None
+            v_index['count'] = v_len
+    def SelectIndex(self, p_key, p_value):
+        if not self.Indexes:
+            return None
+        v_columns = tuple(p_key)
+        if v_columns in self.Indexes:
+            v_values = p_value
+        else:
+            v_values = None
+            for v_indexcolumns in self.Indexes:
+                if len(v_indexcolumns) == len(v_columns) and set(v_indexcolumns) == set(v_columns):
+                    v_values = [p_value[v_columns.index(c)] for c in v_indexcolumns]
+                    v_columns = v_indexcolumns
+                    break
+            if v_values is None:
+                return None
+        if self.Indexes[v_columns]['count'] != len(self.Rows):
+            self.RefreshIndexes()
+        if self.Indexes[v_columns]['map'] is None:
+            return None
+        try:
+            return self.Indexes[v_columns]['map'].get(tuple([self.CompareValue(v) for v in v_values]), [])
+        except TypeError:
+            return None
     def Merge(self, p_datatable):
         if len(self.Columns) > 0 and len(p_datatable.Columns) > 0:
             if self.Columns == p_datatable.Columns:
                 for r in p_datatable.Rows:
                     self.Rows.append(r)
+                if self.Indexes:
+                    self.RefreshIndexes()
             else:
                 raise Spartacus.Database.Exception('Can not merge tables with different columns.')
         else:
@@ -179,6 +291,42 @@ class DataTable(object):
         elif v_val1 == '' and v_val2 is None:
             v_val2 = ''
         return v_val1 == v_val2
+    def CompareKey(self, p_row, p_pkcols):
+        v_key = []
+        for c in p_pkcols:
+            v_key.append(self.CompareValue(p_row[c]))
+        return tuple(v_key)
+    def CompareValue(self, p_value):
+        if p_value is None:
+            return ''
+        elif type(p_value) is float:
+            return decimal.Decimal(repr(p_value))
+        elif isinstance(p_value, list):
+            return tuple([self.CompareValue(v) for v in p_value])
+        elif isinstance(p_value, dict):
+            return tuple(sorted([(str(k), self.CompareValue(v)) for (k, v) in p_value.items()], key=lambda x: x[0]))
+        elif isinstance(p_value, set):
+            return frozenset([self.CompareValue(v) for v in p_value])
+        else:
+            return p_value
+    def CompareRow(self, p_row1, p_row2):
+        v_allmatch = True
+        v_row = []
+        v_diff = []
+        for c in self.Columns:
+            if not self.Equal(p_row1[c], p_row2[c]):
+                v_row.append('{0} --> {1}'.format(p_row1[c], p_row2[c]))
+                v_diff.append(c)
+                v_allmatch = False
+            else:
+                v_row.append(p_row1[c])
+        if v_allmatch:
+            v_row.append('E')
+            v_row.append('')
+        else:
+            v_row.append('U')
+            v_row.append(','.join(v_diff))
+        return v_row
     def Compare(self, p_datatable, p_pkcols, p_statuscolname, p_diffcolname, p_ordered=False, p_keepequal=False, p_debugupdates=False):
         if len(self.Columns) > 0 and len(p_datatable.Columns) > 0:
             if self.Columns == p_datatable.Columns:
@@ -267,35 +415,17 @@ class DataTable(object):
                         v_table.AddRow(v_row)
                         k2 = k2 + 1
                 else:
+                    v_index = {}
+                    for r2 in p_datatable.Rows:
+                        v_index.setdefault(self.CompareKey(r2, v_pkcols), r2)
+                    v_keys = set()
                     for r1 in self.Rows:
-                        v_pkmatch = False
-                        for r2 in p_datatable.Rows:
-                            v_pkmatch = True
-                            for pkcol in v_pkcols:
-                                if not self.Equal(r1[pkcol], r2[pkcol]):
-                                    v_pkmatch = False
-                                    break
-                            if v_pkmatch:
-                                break;
-                        if v_pkmatch:
-                            v_allmatch = True
-                            v_row = []
-                            v_diff = []
-                            for c in self.Columns:
-                                if not self.Equal(r1[c], r2[c]):
-                                    v_row.append('{0} --> {1}'.format(r1[c], r2[c]))
-                                    v_diff.append(c)
-                                    v_allmatch = False
-                                else:
-                                    v_row.append(r1[c])
-                            if v_allmatch:
-                                v_row.append('E')
-                                v_row.append('')
-                                if p_keepequal:
-                                    v_table.AddRow(v_row)
-                            else:
-                                v_row.append('U')
-                                v_row.append(','.join(v_diff))
+                        v_key = self.CompareKey(r1, v_pkcols)
+                        v_keys.add(v_key)
+                        r2 = v_index.get(v_key)
+                        if r2 is not None:
+                            v_row = self.CompareRow(r1, r2)
+                            if v_row[-2] == 'U' or p_keepequal:
                                 v_table.AddRow(v_row)
                         else:
                             v_row = []
@@ -305,16 +435,7 @@ class DataTable(object):
                             v_row.append('')
                             v_table.AddRow(v_row)
                     for r2 in p_datatable.Rows:
-                        v_pkmatch = False
-                        for r1 in self.Rows:
-                            v_pkmatch = True
-                            for pkcol in v_pkcols:
-                                if not self.Equal(r1[pkcol], r2[pkcol]):
-                                    v_pkmatch = False
-                                    break
-                            if v_pkmatch:
-                                break
-                        if not v_pkmatch:
+                        if self.CompareKey(r2, v_pkcols) not in v_keys:
                             v_row = []
                             for c in p_datatable.Columns:
                                 v_row.append(r2[c])
@@ -327,159 +448,161 @@ class DataTable(object):
         else:
             raise Spartacus.Database.Exception('Can not compare tables with no columns.')
     def Jsonify(self):
-        if self.Simple:
-            if len(self.Rows) > 0:
-                if isinstance(self.Rows[0], OrderedDict):
-                    return json.dumps(self.Rows)
-                else:
-                    v_table = []
-                    for r in self.Rows:
-                        v_row = []
-                        for c in range(0, len(self.Columns)):
-                            v_row.append(r[c])
-                        v_table.append(OrderedDict(zip(self.Columns, tuple(v_row))))
-                    return json.dumps(v_table)
-            else:
-                return json.dumps(self.Rows)
+        return ''.join(self.JsonifyStream())
+    def ToList(self):
+        if len(self.Rows) > 0 and isinstance(self.Rows[0], dict):
+            return [list(r.values()) for r in self.Rows]
+        return self.Rows
+    def ColumnData(self):
+        if len(self.Rows) == 0:
+            return [[] for c in self.Columns]
+        elif isinstance(self.Rows[0], dict):
+            return [[r[c] for r in self.Rows] for c in self.Columns]
         else:
-            if len(self.Rows) > 0:
-                if isinstance(self.Rows[0], OrderedDict):
-                    return json.dumps(self.Rows)
+            return [list(c) for c in zip(*self.Rows)]
+    def Compact(self, p_string=str, p_dictratio=4):
+        # Columnar encoding with one type tag per column:
+        #   'i': integers that are exact in a javascript number, sent as is
+        #   's': other values, converted with p_string
+        #   'd': 's' column with few distinct values, sent as
+        #        [distinct values, index of each row's value]
+        # None is sent as null in every type.
+        v_types = []
+        v_columns = []
+        for c in self.ColumnData():
+            if all([v is None or (type(v) == int and -9007199254740991 <= v <= 9007199254740991) for v in c]):
+                v_types.append('i')
+                v_columns.append(c)
+            else:
+                v_values = [p_string(v) if v is not None else None for v in c]
+                v_distinct = {}
+                v_codes = [v_distinct.setdefault(v, len(v_distinct)) for v in v_values]
+                if len(v_values) >= 16 and len(v_distinct) * p_dictratio <= len(v_values):
+                    v_types.append('d')
+                    v_columns.append([list(v_distinct.keys()), v_codes])
                 else:
-                    v_table = []
-                    for r in self.Rows:
-                        v_row = []
-                        for c in self.Columns:
-                            v_row.append(r[c])
-                        v_table.append(OrderedDict(zip(self.Columns, tuple(v_row))))
-                    return json.dumps(v_table)
+                    v_types.append('s')
+                    v_columns.append(v_values)
+        return {
+            'v_types': v_types,
+            'v_columns': v_columns,
+            'v_count': len(self.Rows)
+        }
+    def JsonifyStream(self, p_objects=True, p_chunksize=1000, p_encoder=None):
+        v_rows = self.Rows
+        yield '['
+        for k in range(0, len(v_rows), p_chunksize):
+            v_chunk = []
+            for r in v_rows[k:k+p_chunksize]:
+                if p_objects:
+                    if isinstance(r, dict):
+                        v_chunk.append(r)
+                    else:
+                        v_chunk.append(OrderedDict(zip(self.Columns, r)))
+                elif isinstance(r, dict):
+                    v_chunk.append(list(r.values()))
+                elif isinstance(r, (list, tuple)):
+                    v_chunk.append(r)
+                else:
+                    v_chunk.append(list(r))
+            if k > 0:
+                yield ', '
+            yield json.dumps(v_chunk, cls=p_encoder)[1:-1]
+        yield ']'
+    def PrettyWidth(self, p_text):
+        if v_pretty_plain.match(p_text):
+            return len(p_text)
+        else:
+            return prettytable._str_block_width(p_text)
+    def PrettyLines(self, p_transpose=False):
+        if self.Simple:
+            v_keys = range(0, len(self.Columns))
+        else:
+            v_keys = self.Columns
+        v_rows = self.Rows
+        if p_transpose:
+            v_maxc = 0
+            for c in self.Columns:
+                if len(c) > v_maxc:
+                    v_maxc = len(c)
+            if v_maxc < (14 + len(str(len(v_rows)))):
+                v_maxc = (14 + len(str(len(v_rows))))
             else:
-                return json.dumps(self.Rows)
+                v_maxc = v_maxc + 1
+            v_values = [[str(r[c]).split('\n') for c in v_keys] for r in v_rows]
+            k = 0
+            s = 0
+            v_maxf = 0
+            for r in v_values:
+                for v_snippets in r:
+                    v_length = sum(len(v_snippet) for v_snippet in v_snippets) + len(v_snippets) - 1
+                    for v_snippet in v_snippets:
+                        k = k + 1
+                        s = s + len(v_snippet)
+                        if v_length > v_maxf:
+                            v_maxf = len(v_snippet)
+            if v_maxf > 30:
+                v_maxf = int(s / k) + int((v_maxf - int(s / k)) / 2)
+            v_maxf = v_maxf + 10
+            v_size = v_maxf - 2
+            v_names = [c.ljust(v_maxc) for c in self.Columns]
+            v_blank = ' '.ljust(v_maxc)
+            v_rule = '-' * v_maxf
+            v_row = 1
+            for r in v_values:
+                yield '-[ RECORD {0} ]'.format(v_row).ljust(v_maxc, '-') + '+' + v_rule
+                for c in range(0, len(v_names)):
+                    x = v_names[c]
+                    for v_snippet in r[c]:
+                        n = -(-len(v_snippet) // v_size)
+                        for j in range(0, (n-1)*v_size, v_size):
+                            yield x + '| ' + v_snippet[j:j+v_size] + '+'
+                            x = v_blank
+                        if n > 0:
+                            yield x + '| ' + v_snippet[(n-1)*v_size:]
+                            x = v_blank
+                v_row = v_row + 1
+        elif len(self.Columns) == 0:
+            yield '++'
+            yield '||'
+            yield '++'
+            for r in v_rows:
+                yield ''
+            yield '++'
+        else:
+            v_widths = [max([self.PrettyWidth(v_line) for v_line in c.split('\n')]) for c in self.Columns]
+            v_cells = []
+            for r in v_rows:
+                v_cell = []
+                for c in range(0, len(v_widths)):
+                    v_lines = []
+                    for v_line in str(r[v_keys[c]]).split('\n'):
+                        v_width = self.PrettyWidth(v_line)
+                        if v_width > v_widths[c]:
+                            v_widths[c] = v_width
+                        v_lines.append((v_line, v_width))
+                    v_cell.append(v_lines)
+                v_cells.append(v_cell)
+            v_rule = '+' + '+'.join(['-' * (w + 2) for w in v_widths]) + '+'
+            yield v_rule
+            yield '| ' + ' | '.join([c + ' ' * (w - self.PrettyWidth(c)) for (c, w) in zip(self.Columns, v_widths)]) + ' |'
+            yield v_rule
+            for v_cell in v_cells:
+                v_height = max([len(v_lines) for v_lines in v_cell])
+                for y in range(0, v_height):
+                    v_line = []
+                    for c in range(0, len(v_widths)):
+                        if y < len(v_cell[c]):
+                            v_line.append(v_cell[c][y][0] + ' ' * (v_widths[c] - v_cell[c][y][1]))
+                        else:
+                            v_line.append(' ' * v_widths[c])
+                    yield '| ' + ' | '.join(v_line) + ' |'
+            yield v_rule
     def Pretty(self, p_transpose=False):
-        if self.Simple:
-            if p_transpose:
-                v_maxc = 0
-                for c in self.Columns:
-                    if len(c) > v_maxc:
-                        v_maxc = len(c)
-                if v_maxc < (14 + len(str(len(self.Rows)))):
-                    v_maxc = (14 + len(str(len(self.Rows))))
-                else:
-                    v_maxc = v_maxc + 1
-                k = 0
-                s = 0
-                v_maxf = 0
-                for r in self.Rows:
-                    for c in range(0, len(self.Columns)):
-                        for v_snippet in str(r[c]).split('\n'):
-                            k = k + 1
-                            s = s + len(v_snippet)
-                            if len(str(r[c])) > v_maxf:
-                                v_maxf = len(v_snippet)
-                if v_maxf > 30:
-                    v_maxf = int(s / k) + int((v_maxf - int(s / k)) / 2)
-                v_maxf = v_maxf + 10
-                v_string = ''
-                v_row = 1
-                for r in self.Rows:
-                    v_aux = '-[ RECORD {0} ]'.format(v_row)
-                    for k in range(len(v_aux), v_maxc):
-                        v_aux = v_aux + '-'
-                    v_string = v_string + v_aux + '+'
-                    for k in range(0, v_maxf):
-                        v_string = v_string + '-'
-                    v_string = v_string + '\n'
-                    for c in range(0, len(self.Columns)):
-                        v_first = True
-                        for v_snippet in str(r[c]).split('\n'):
-                            n = math.ceil(len(v_snippet) / (v_maxf-2))
-                            j = 0
-                            for i in range(0, n):
-                                if v_first:
-                                    x = c.ljust(v_maxc)
-                                    v_first = False
-                                else:
-                                    x = ' '.ljust(v_maxc)
-                                if i < n-1:
-                                    y = ' ' + v_snippet[j:j+v_maxf-2] + '+'
-                                    j = j + v_maxf-2
-                                else:
-                                    y = ' ' + v_snippet[j:]
-                                v_string = v_string + '{0}|{1}\n'.format(x, y)
-                    v_row = v_row + 1
-                return v_string
-            else:
-                v_pretty = prettytable.PrettyTable()
-                v_pretty._set_field_names(self.Columns)
-                v_pretty._set_align('l')
-                for r in self.Rows:
-                    v_row = []
-                    for c in range(0, len(self.Columns)):
-                        v_row.append(r[c])
-                    v_pretty.add_row(v_row)
-                return v_pretty.get_string()
+        if p_transpose:
+            return ''.join([v_line + '\n' for v_line in self.PrettyLines(True)])
         else:
-            if p_transpose:
-                v_maxc = 0
-                for c in self.Columns:
-                    if len(c) > v_maxc:
-                        v_maxc = len(c)
-                if v_maxc < (14 + len(str(len(self.Rows)))):
-                    v_maxc = (14 + len(str(len(self.Rows))))
-                else:
-                    v_maxc = v_maxc + 1
-                k = 0
-                s = 0
-                v_maxf = 0
-                for r in self.Rows:
-                    for c in self.Columns:
-                        for v_snippet in str(r[c]).split('\n'):
-                            k = k + 1
-                            s = s + len(v_snippet)
-                            if len(str(r[c])) > v_maxf:
-                                v_maxf = len(v_snippet)
-                if v_maxf > 30:
-                    v_maxf = int(s / k) + int((v_maxf - int(s / k)) / 2)
-                v_maxf = v_maxf + 10
-                v_string = ''
-                v_row = 1
-                for r in self.Rows:
-                    v_aux = '-[ RECORD {0} ]'.format(v_row)
-                    for k in range(len(v_aux), v_maxc):
-                        v_aux = v_aux + '-'
-                    v_string = v_string + v_aux + '+'
-                    for k in range(0, v_maxf):
-                        v_string = v_string + '-'
-                    v_string = v_string + '\n'
-                    for c in self.Columns:
-                        v_first = True
-                        for v_snippet in str(r[c]).split('\n'):
-                            n = math.ceil(len(v_snippet) / (v_maxf-2))
-                            j = 0
-                            for i in range(0, n):
-                                if v_first:
-                                    x = c.ljust(v_maxc)
-                                    v_first = False
-                                else:
-                                    x = ' '.ljust(v_maxc)
-                                if i < n-1:
-                                    y = ' ' + v_snippet[j:j+v_maxf-2] + '+'
-                                    j = j + v_maxf-2
-                                else:
-                                    y = ' ' + v_snippet[j:]
-                                v_string = v_string + '{0}|{1}\n'.format(x, y)
-                    v_row = v_row + 1
-                return v_string
-            else:
-                v_pretty = prettytable.PrettyTable()
-                v_pretty._set_field_names(self.Columns)
-                v_pretty._set_align('l')
-                for r in self.Rows:
-                    v_row = []
-                    for c in self.Columns:
-                        v_row.append(r[c])
-                    v_pretty.add_row(v_row)
-                return v_pretty.get_string()
+            return '\n'.join(self.PrettyLines(False))
     def Transpose(self, p_column1, p_column2):
         if len(self.Rows) == 1:
             v_table = Spartacus.Database.DataTable()
@@ -498,6 +621,10 @@ class DataTable(object):
         v_table = Spartacus.Database.DataTable(None, p_alltypesstr=self.AllTypesStr, p_simple=self.Simple)
         for c in self.Columns:
             v_table.AddColumn(c)
+        try:
+            v_table.CreateIndex(list(p_pkcols))
+        except Spartacus.Database.Exception:
+            None
         a = 0
         for r in self.Rows:
             v_value = []
@@ -520,6 +647,170 @@ class DataTable(object):
             a = a + 1
         return v_table
 
+class DataRow(object):
+    __slots__ = ('v_table', 'v_index')
+    def __init__(self, p_table, p_index):
+        self.v_table = p_table
+        self.v_index = p_index
+    def __getitem__(self, p_key):
+        if isinstance(p_key, int):
+            return self.v_table.Data[p_key][self.v_index]
+        elif isinstance(p_key, slice):
+            return [c[self.v_index] for c in self.v_table.Data[p_key]]
+        else:
+            return self.v_table.Data[self.v_table.ColumnIndex(p_key)][self.v_index]
+    def __setitem__(self, p_key, p_value):
+        if isinstance(p_key, int):
+            self.v_table.Data[p_key][self.v_index] = p_value
+        else:
+            self.v_table.Data[self.v_table.ColumnIndex(p_key)][self.v_index] = p_value
+    def __len__(self):
+        return len(self.v_table.Data)
+    def __iter__(self):
+        for c in self.v_table.Data:
+            yield c[self.v_index]
+    def __eq__(self, p_other):
+        return list(self) == list(p_other)
+    def __repr__(self):
+        return repr(list(self))
+
+class DataRowList(object):
+    __slots__ = ('v_table',)
+    def __init__(self, p_table):
+        self.v_table = p_table
+    def __len__(self):
+        if len(self.v_table.Data) > 0:
+            return len(self.v_table.Data[0])
+        else:
+            return 0
+    def __getitem__(self, p_index):
+        v_len = len(self)
+        if isinstance(p_index, slice):
+            return [DataRow(self.v_table, k) for k in range(*p_index.indices(v_len))]
+        if p_index < 0:
+            p_index = p_index + v_len
+        if p_index < 0 or p_index >= v_len:
+            raise IndexError('row index out of range')
+        return DataRow(self.v_table, p_index)
+    def __iter__(self):
+        for k in range(0, len(self)):
+            yield DataRow(self.v_table, k)
+    def append(self, p_row):
+        self.v_table.AddRow(p_row)
+
+class ColumnarDataTable(DataTable):
+    def __init__(self, p_name=None, p_alltypesstr=False, p_simple=False):
+        self.Name = p_name
+        self.Columns = []
+        self.Data = []
+        self.AllTypesStr = p_alltypesstr
+        self.Simple = p_simple
+        self.Indexes = {}
+        self.v_columnindex = None
+    @property
+    def Rows(self):
+        return DataRowList(self)
+    @Rows.setter
+    def Rows(self, p_rows):
+        self.v_columnindex = None
+        if len(p_rows) > 0:
+            if isinstance(p_rows[0], dict):
+                v_rows = [[r[c] for c in self.Columns] for r in p_rows]
+            else:
+                v_rows = p_rows
+            self.Data = [list(c) for c in zip(*v_rows)]
+        else:
+            self.Data = [[] for c in self.Columns]
+    def ColumnIndex(self, p_column):
+        if self.v_columnindex is None:
+            self.v_columnindex = dict((c, k) for k, c in enumerate(self.Columns))
+        try:
+            return self.v_columnindex[p_column]
+        except KeyError:
+            raise Spartacus.Database.Exception('Column "{0}" does not exist.'.format(p_column))
+    def AddColumn(self, p_columnname):
+        self.Columns.append(p_columnname)
+        self.Data.append([None] * len(self.Rows))
+        self.v_columnindex = None
+    def AddRow(self, p_row):
+        if len(self.Columns) > 0 and len(p_row) > 0:
+            if len(self.Columns) == len(p_row):
+                if len(self.Data) != len(self.Columns):
+                    self.Data = [[] for c in self.Columns]
+                    self.v_columnindex = None
+                if isinstance(p_row, dict):
+                    for k in range(0, len(self.Columns)):
+                        self.Data[k].append(p_row[self.Columns[k]])
+                elif self.AllTypesStr:
+                    for k in range(0, len(self.Columns)):
+                        v_value = p_row[k]
+                        if v_value != None:
+                            self.Data[k].append(str(v_value))
+                        else:
+                            self.Data[k].append('')
+                else:
+                    for k in range(0, len(self.Columns)):
+                        self.Data[k].append(p_row[k])
+                if self.Indexes:
+                    self.RefreshIndexes()
+            else:
+                raise Spartacus.Database.Exception('Can not add row to a table with different columns.')
+        else:
+            raise Spartacus.Database.Exception('Can not add row to a table with no columns.')
+    def AddRows(self, p_rows):
+        if len(self.Columns) > 0:
+            v_width = len(self.Columns)
+            for r in p_rows:
+                if len(r) != v_width:
+                    raise Spartacus.Database.Exception('Can not add row to a table with different columns.')
+            if len(self.Data) != len(self.Columns):
+                self.Data = [[] for c in self.Columns]
+                self.v_columnindex = None
+            if len(p_rows) > 0:
+                v_columns = zip(*p_rows)
+                for k, c in enumerate(v_columns):
+                    if self.AllTypesStr:
+                        self.Data[k].extend([str(v) if v != None else '' for v in c])
+                    else:
+                        self.Data[k].extend(c)
+            if self.Indexes:
+                self.RefreshIndexes()
+        else:
+            raise Spartacus.Database.Exception('Can not add row to a table with no columns.')
+    def Merge(self, p_datatable):
+        if len(self.Columns) > 0 and len(p_datatable.Columns) > 0:
+            if self.Columns == p_datatable.Columns:
+                if isinstance(p_datatable, ColumnarDataTable) and len(self.Data) == len(p_datatable.Data):
+                    for k in range(0, len(self.Data)):
+                        self.Data[k].extend(p_datatable.Data[k])
+                else:
+                    for r in p_datatable.Rows:
+                        self.AddRow(r)
+                if self.Indexes:
+                    self.RefreshIndexes()
+            else:
+                raise Spartacus.Database.Exception('Can not merge tables with different columns.')
+        else:
+            raise Spartacus.Database.Exception('Can not merge tables with no columns.')
+    def ToList(self):
+        return list(zip(*self.Data))
+    def ColumnData(self):
+        if len(self.Data) != len(self.Columns):
+            return [[] for c in self.Columns]
+        return self.Data
+    def JsonifyStream(self, p_objects=True, p_chunksize=1000, p_encoder=None):
+        yield '['
+        for k in range(0, len(self.Rows), p_chunksize):
+            v_chunk = zip(*[c[k:k+p_chunksize] for c in self.Data])
+            if p_objects:
+                v_chunk = [OrderedDict(zip(self.Columns, r)) for r in v_chunk]
+            else:
+                v_chunk = list(v_chunk)
+            if k > 0:
+                yield ', '
+            yield json.dumps(v_chunk, cls=p_encoder)[1:-1]
+        yield ']'
+
 class DataField(object):
     def __init__(self, p_name, p_type=None, p_dbtype=None, p_mask='#'):
         self.v_name = p_name
@@ -539,6 +830,60 @@ class DataList(object):
     def append(self, p_item):
         self.v_list.append(p_item)
 
+class DataCopyReader(object):
+    def __init__(self, p_database, p_block, p_fields):
+        self.v_database = p_database
+        self.v_rows = iter(p_block.Rows)
+        self.v_fields = p_fields
+        self.v_buffer = ''
+        self.v_eof = False
+    def read(self, p_size=-1):
+        v_lines = [self.v_buffer]
+        v_len = len(self.v_buffer)
+        while not self.v_eof and (p_size < 0 or v_len < p_size):
+            r = next(self.v_rows, None)
+            if r is None:
+                self.v_eof = True
+            else:
+                v_line = self.v_database.CopyRow(r, self.v_fields)
+                v_lines.append(v_line)
+                v_len = v_len + len(v_line)
+        v_data = ''.join(v_lines)
+        if p_size < 0 or len(v_data) <= p_size:
+            self.v_buffer = ''
+            return v_data
+        else:
+            self.v_buffer = v_data[p_size:]
+            return v_data[:p_size]
+    def readline(self, p_size=-1):
+        return self.read(p_size)
+
+class DataCopyWriter(io.TextIOBase):
+    # COPY TO STDOUT writes one row per write() call. Every p_interval
+    # seconds p_progress receives the number of rows written, header excluded.
+    # psycopg2 only writes str to io.TextIOBase targets, bytes are still
+    # decoded with p_encoding, the connection encoding, before reaching the
+    # text mode p_file.
+    def __init__(self, p_file, p_progress=None, p_interval=1, p_encoding='utf-8'):
+        super(DataCopyWriter, self).__init__()
+        self.v_file = p_file
+        self.v_progress = p_progress
+        self.v_interval = p_interval
+        self.v_encoding = p_encoding
+        self.v_writes = 0
+        self.v_last_progress = time.time()
+    def writable(self):
+        return True
+    def write(self, p_data):
+        if isinstance(p_data, bytes):
+            p_data = p_data.decode(self.v_encoding)
+        self.v_file.write(p_data)
+        self.v_writes = self.v_writes + 1
+        if self.v_progress is not None and time.time() - self.v_last_progress >= self.v_interval:
+            self.v_last_progress = time.time()
+            self.v_progress(self.v_writes - 1)
+        return len(p_data)
+
 
 '''
 ------------------------------------------------------------------------
@@ -595,11 +940,13 @@ class Generic(ABC):
     def GetConStatus(self):
         pass
     @abstractmethod
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_columnar=False):
         pass
     @abstractmethod
     def InsertBlock(self, p_block, p_tablename, p_fields=None):
         pass
+    def BulkInsertBlock(self, p_block, p_tablename, p_fields=None):
+        return self.InsertBlock(p_block, p_tablename, p_fields)
     @abstractmethod
     def Special(self, p_sql):
         pass
@@ -649,6 +996,64 @@ class Generic(ABC):
             return '(' + ','.join(v_mog) + ')'
         else:
             raise Spartacus.Database.Exception('Can not mogrify with different number of parameters.')
+    def Placeholder(self, p_index):
+        return '%s'
+    def Parameters(self, p_row, p_fields):
+        if len(p_row) == len(p_fields):
+            v_params = []
+            for k in range(0, len(p_fields)):
+                v_value = p_row[p_fields[k].v_name]
+                if type(v_value) == type(list()):
+                    v_value = self.MogrifyArray(v_value)
+                v_params.append(v_value)
+            return v_params
+        else:
+            raise Spartacus.Database.Exception('Can not bind with different number of parameters.')
+    def ExecuteMany(self, p_sql, p_rows):
+        raise Spartacus.Database.Exception('Batch execution is not supported by this database.')
+    def InsertBlockMany(self, p_block, p_tablename, p_fields=None, p_batchsize=1000):
+        """Inserts a data table into a table using one parameterized statement
+            executed over batches of rows, instead of mogrifying every value into
+            the SQL text.
+
+            Args:
+                p_block (Spartacus.Database.DataTable): rows to be inserted.
+                p_tablename (str): target table name.
+                p_fields (list of Spartacus.Database.DataField): target fields, optionally with masks. Defaults to None, meaning all columns of p_block.
+                p_batchsize (int): number of rows sent to the driver per executemany call. A value of 0 or less sends all rows at once. Defaults to 1000.
+        """
+        v_columnames = []
+        if p_fields is None:
+            v_fields = []
+            for c in p_block.Columns:
+                v_columnames.append(c)
+                v_fields.append(DataField(c))
+        else:
+            v_fields = p_fields
+            for p in v_fields:
+                v_columnames.append(p.v_name)
+        v_placeholders = []
+        for k in range(0, len(v_fields)):
+            v_placeholders.append(v_fields[k].v_mask.replace('#', self.Placeholder(k)))
+        v_sql = 'insert into ' + p_tablename + '(' + ','.join(v_columnames) + ') values (' + ','.join(v_placeholders) + ')'
+        v_keep = None
+        if self.v_con is None:
+            self.Open()
+            v_keep = False
+        else:
+            v_keep = True
+        try:
+            v_batch = []
+            for r in p_block.Rows:
+                v_batch.append(self.Parameters(r, v_fields))
+                if p_batchsize > 0 and len(v_batch) >= p_batchsize:
+                    self.ExecuteMany(v_sql, v_batch)
+                    v_batch = []
+            if len(v_batch) > 0:
+                self.ExecuteMany(v_sql, v_batch)
+        finally:
+            if not v_keep:
+                self.Close()
     def Transfer(self, p_sql=None, p_table=None, p_targetdatabase=None, p_tablename=None, p_blocksize=1000, p_fields=None, p_alltypesstr=False):
         """Method used to transfer data from one database to another one.
 
@@ -680,7 +1085,7 @@ class Generic(ABC):
         try:
             v_table = self.QueryBlock(p_sql, p_blocksize, p_alltypesstr) if p_sql is not None else p_table
             if len(v_table.Rows) > 0:
-                p_targetdatabase.InsertBlock(v_table, p_tablename, p_fields)
+                p_targetdatabase.BulkInsertBlock(v_table, p_tablename, p_fields)
             v_return.v_numrecords = len(v_table.Rows)
             v_return.v_hasmorerecords = not self.v_start
         except Spartacus.Database.Exception as exc:
@@ -688,6 +1093,161 @@ class Generic(ABC):
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
         return v_return
+    def TransferBlocks(self, p_sql, p_targetdatabase=None, p_tablename=None, p_blocksize=1000, p_fields=None, p_alltypesstr=False, p_queuesize=4):
+        """Method used to transfer all rows of a query from one database to another one.
+
+            Args:
+                p_sql (str): the sql query to be executed in the current database, in order to provide data to be inserted into target database.
+                p_targetdatabase (Spartacus.Database.Generic): any object that inherits from Spartacus.Database.Generic. It is the target database connection. Defaults to None.
+                p_tablename (str): the target table name. Defaults to None.
+                p_blocksize (int): number of rows to be read at a time from source database. Defaults to 1000.
+                p_fields (list): list of fields to be considered while inserting into target database table. Defaults to None.
+                p_alltypesstr (bool): if all fields should be queried as str instances.
+                p_queuesize (int): maximum number of blocks read from source database and still waiting to be inserted. Defaults to 4.
+
+            Notes:
+                Both connections must be opened before calling this method.
+                Blocks are read by a separate thread and inserted through BulkInsertBlock(), so reading and writing overlap.
+                When the target falls behind, the reader waits for room in the queue instead of buffering the whole result.
+
+            Returns:
+                Spartacus.Database.DataTransferReturn.
+
+            Raises:
+                Spartacus.Database.Exception.
+        """
+
+        v_return = DataTransferReturn()
+        v_queue = queue.Queue(p_queuesize)
+        v_state = {
+            'cancel': False,
+            'error': None
+        }
+        def Reader():
+            try:
+                self.v_start = True
+                v_hasmorerecords = True
+                while v_hasmorerecords and not v_state['cancel']:
+                    v_table = self.QueryBlock(p_sql, p_blocksize, p_alltypesstr)
+                    v_hasmorerecords = not self.v_start and len(v_table.Rows) > 0
+                    if len(v_table.Rows) > 0:
+                        v_queue.put(v_table)
+            # Exception is Spartacus.Database.Exception in this module, any
+            # error must reach the consumer or it waits forever
+            except builtins.Exception as exc:
+                v_state['error'] = exc
+            finally:
+                v_queue.put(None)
+        v_thread = threading.Thread(target=Reader)
+        v_thread.daemon = True
+        v_thread.start()
+        try:
+            v_table = v_queue.get()
+            while v_table is not None:
+                p_targetdatabase.BulkInsertBlock(v_table, p_tablename, p_fields)
+                v_return.v_numrecords = v_return.v_numrecords + len(v_table.Rows)
+                v_table = v_queue.get()
+        except builtins.Exception as exc:
+            v_return.v_log = str(exc)
+            v_state['cancel'] = True
+            while v_table is not None:
+                v_table = v_queue.get()
+        v_thread.join()
+        if v_return.v_log is None and v_state['error'] is not None:
+            v_return.v_log = str(v_state['error'])
+        v_return.v_hasmorerecords = False
+        return v_return
+    def CompareBlock(self, p_sql, p_targetdatabase, p_targetsql, p_pkcols, p_statuscolname, p_diffcolname, p_blocksize=1000, p_keepequal=False, p_alltypesstr=False):
+        """Method used to compare the results of two queries, one block at a time.
+
+            Args:
+                p_sql (str): the sql query to be executed in the current database. Its rows are the old side of the comparison.
+                p_targetdatabase (Spartacus.Database.Generic): any object that inherits from Spartacus.Database.Generic. It is the database providing the new side of the comparison.
+                p_targetsql (str): the sql query to be executed in the target database.
+                p_pkcols (list): list of columns that identify a row. If empty, all columns are used.
+                p_statuscolname (str): name of the column that will hold the status of each row: I, U, D or E.
+                p_diffcolname (str): name of the column that will hold the list of changed columns.
+                p_blocksize (int): number of rows to be read at a time from each database. Defaults to 1000.
+                p_keepequal (bool): if rows with status E should be returned too. Defaults to False.
+                p_alltypesstr (bool): if all fields should be queried as str instances.
+
+            Notes:
+                Both connections must be opened before iterating and both queries must return the same columns.
+                Inputs do not need to be ordered. Rows are matched through a hash index on the primary key values, so
+                only rows still waiting for a match on the other side are kept in memory. Rows sharing a key are matched
+                in the order they arrive, and each one left without a match is returned as D or I.
+                Updated and equal rows are yielded as soon as both sides have been read; deleted and inserted rows are
+                yielded once both queries are exhausted.
+
+            Yields:
+                Spartacus.Database.DataTable, with the same columns as DataTable.Compare().
+
+            Raises:
+                Spartacus.Database.Exception.
+        """
+
+        try:
+            self.v_start = True
+            p_targetdatabase.v_start = True
+            v_pending1 = OrderedDict()
+            v_pending2 = OrderedDict()
+            v_helper = None
+            v_hasmore1 = True
+            v_hasmore2 = True
+            while v_hasmore1 or v_hasmore2:
+                v_blocks = []
+                if v_hasmore1:
+                    v_block1 = self.QueryBlock(p_sql, p_blocksize, p_alltypesstr)
+                    v_hasmore1 = not self.v_start and len(v_block1.Rows) > 0
+                    v_blocks.append((v_block1, v_pending1, v_pending2, True))
+                if v_hasmore2:
+                    v_block2 = p_targetdatabase.QueryBlock(p_targetsql, p_blocksize, p_alltypesstr)
+                    v_hasmore2 = not p_targetdatabase.v_start and len(v_block2.Rows) > 0
+                    v_blocks.append((v_block2, v_pending2, v_pending1, False))
+                for (v_block, v_own, v_other, v_isold) in v_blocks:
+                    if v_helper is None and len(v_block.Columns) > 0:
+                        v_helper = DataTable()
+                        v_helper.Columns = v_block.Columns
+                        if len(p_pkcols) > 0:
+                            v_pkcols = p_pkcols
+                        else:
+                            v_pkcols = v_block.Columns
+                        v_table = DataTable()
+                        v_table.Columns = v_block.Columns + [p_statuscolname, p_diffcolname]
+                    elif len(v_block.Columns) > 0 and v_block.Columns != v_helper.Columns:
+                        raise Spartacus.Database.Exception('Can not compare tables with different columns.')
+                    for r in v_block.Rows:
+                        v_key = v_helper.CompareKey(r, v_pkcols)
+                        v_matches = v_other.get(v_key)
+                        if v_matches is None:
+                            v_own.setdefault(v_key, []).append(r)
+                        else:
+                            v_match = v_matches.pop(0)
+                            if len(v_matches) == 0:
+                                del v_other[v_key]
+                            if v_isold:
+                                v_row = v_helper.CompareRow(r, v_match)
+                            else:
+                                v_row = v_helper.CompareRow(v_match, r)
+                            if v_row[-2] == 'U' or p_keepequal:
+                                v_table.AddRow(v_row)
+                if v_helper is not None and len(v_table.Rows) > 0:
+                    yield v_table
+                    v_table = DataTable()
+                    v_table.Columns = v_helper.Columns + [p_statuscolname, p_diffcolname]
+            if v_helper is not None:
+                for v_rows in v_pending1.values():
+                    for r in v_rows:
+                        v_table.AddRow([r[c] for c in v_helper.Columns] + ['D', ''])
+                for v_rows in v_pending2.values():
+                    for r in v_rows:
+                        v_table.AddRow([r[c] for c in v_helper.Columns] + ['I', ''])
+                if len(v_table.Rows) > 0:
+                    yield v_table
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
     def GetIdentifiersDML(p_sql):
         try:
             v_dict = {
@@ -848,10 +1408,7 @@ class SQLite(Generic):
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -987,29 +1544,24 @@ class SQLite(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_columnar=False):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception('This method should be called in the middle of Open() and Close() calls.')
             else:
                 if self.v_start:
                     self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                if p_columnar:
+                    v_table = ColumnarDataTable(None, p_alltypesstr, p_simple)
+                else:
+                    v_table = DataTable(None, p_alltypesstr, p_simple)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 return v_table
@@ -1019,23 +1571,38 @@ class SQLite(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
-    def InsertBlock(self, p_block, p_tablename, p_fields=None):
+    def Placeholder(self, p_index):
+        return '?'
+    def ExecuteMany(self, p_sql, p_rows):
         try:
-            v_columnames = []
-            if p_fields is None:
-                v_fields = []
-                for c in p_block.Columns:
-                    v_columnames.append(c)
-                    v_fields.append(DataField(c))
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
             else:
-                v_fields = p_fields
-                for p in v_fields:
-                    v_columnames.append(p.v_name)
-            v_insert = 'begin; '
-            for r in p_block.Rows:
-                v_insert = v_insert + 'insert into ' + p_tablename + '(' + ','.join(v_columnames) + ') values ' + self.Mogrify(r, v_fields) + '; '
-            v_insert = v_insert + 'commit;'
-            self.Execute(v_insert)
+                v_keep = True
+            if self.v_con.isolation_level is None and not self.v_con.in_transaction:
+                self.v_cur.execute('begin')
+                try:
+                    self.v_cur.executemany(p_sql, p_rows)
+                except:
+                    self.v_cur.execute('rollback')
+                    raise
+                self.v_cur.execute('commit')
+            else:
+                self.v_cur.executemany(p_sql, p_rows)
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except sqlite3.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if not v_keep:
+                self.Close()
+    def InsertBlock(self, p_block, p_tablename, p_fields=None, p_batchsize=1000):
+        try:
+            self.InsertBlockMany(p_block, p_tablename, p_fields, p_batchsize)
         except Spartacus.Database.Exception as exc:
             raise exc
         except sqlite3.Error as exc:
@@ -1089,10 +1656,7 @@ class Memory(Generic):
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
-                    while v_row is not None:
-                        v_table.AddRow(list(v_row))
-                        v_row = self.v_cur.fetchone()
+                    v_table.AddRows(self.v_cur.fetchall())
                 return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -1207,29 +1771,24 @@ class Memory(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_columnar=False):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception('This method should be called in the middle of Open() and Close() calls.')
             else:
                 if self.v_start:
                     self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                if p_columnar:
+                    v_table = ColumnarDataTable(None, p_alltypesstr, p_simple)
+                else:
+                    v_table = DataTable(None, p_alltypesstr, p_simple)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 return v_table
@@ -1239,23 +1798,23 @@ class Memory(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
-    def InsertBlock(self, p_block, p_tablename, p_fields=None):
+    def Placeholder(self, p_index):
+        return '?'
+    def ExecuteMany(self, p_sql, p_rows):
         try:
-            v_columnames = []
-            if p_fields is None:
-                v_fields = []
-                for c in p_block.Columns:
-                    v_columnames.append(c)
-                    v_fields.append(DataField(c))
+            if self.v_con is None:
+                raise Spartacus.Database.Exception('This method should be called in the middle of Open() and Close() calls.')
             else:
-                v_fields = p_fields
-                for p in v_fields:
-                    v_columnames.append(p.v_name)
-            v_insert = 'begin; '
-            for r in p_block.Rows:
-                v_insert = v_insert + 'insert into ' + p_tablename + '(' + ','.join(v_columnames) + ') values ' + self.Mogrify(r, v_fields) + '; '
-            v_insert = v_insert + 'commit;'
-            self.Execute(v_insert)
+                self.v_cur.executemany(p_sql, p_rows)
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except sqlite3.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+    def InsertBlock(self, p_block, p_tablename, p_fields=None, p_batchsize=1000):
+        try:
+            self.InsertBlockMany(p_block, p_tablename, p_fields, p_batchsize)
         except Spartacus.Database.Exception as exc:
             raise exc
         except sqlite3.Error as exc:
@@ -1287,6 +1846,7 @@ class PostgreSQL(Generic):
             self.v_user = p_user
             self.v_password = p_password
             self.v_application_name = p_application_name
+            self.v_tunnel_target = None
             self.v_con = None
             self.v_cur = None
             self.v_start = True
@@ -1317,6 +1877,7 @@ class PostgreSQL(Generic):
             self.v_help.AddRow(['\\dT', '\\dT[+] [pattern]', 'List data types.'])
             self.v_help.AddRow(['\\x', '\\x', 'Toggle expanded output.'])
             self.v_help.AddRow(['\\timing', '\\timing', 'Toggle timing of commands.'])
+            self.v_help.CreateIndex('Command')
             self.v_helpcommands = Spartacus.Database.DataTable()
             self.v_helpcommands.Columns = ['SQL Command']
             for s in list(HelpCommands.keys()):
@@ -1324,6 +1885,7 @@ class PostgreSQL(Generic):
             self.v_expanded = False
             self.v_timing = False
             self.v_types = None
+            self.v_types_version = None
             psycopg2.extras.register_default_json(loads=lambda x: x)
             psycopg2.extras.register_default_jsonb(loads=lambda x: x)
             psycopg2.extensions.register_type(psycopg2.extensions.new_type(psycopg2.extensions.INTERVAL.values, 'INTERVAL_STR', psycopg2.STRING), self.v_cur)
@@ -1383,18 +1945,16 @@ class PostgreSQL(Generic):
             self.v_start = True
             self.v_cursor = None
             # PostgreSQL types
-            if self.v_types is None:
-                self.v_cur.execute('select oid, typname from pg_type')
-                self.v_types = dict([(r['oid'], r['typname']) for r in self.v_cur.fetchall()])
-                tmp = []
-                for oid, name in self.v_types.items():
-                    if name == 'date' or name == 'timestamp' or name == 'timestamptz':
-                        tmp.append(oid)
-                oids = tuple(tmp)
-                v_new_date_type = psycopg2.extensions.new_type(oids, 'DATE', self.Handler)
-                psycopg2.extensions.register_type(v_new_date_type)
-                if not p_autocommit:
-                    self.v_con.commit()
+            if self.v_types is None or self.v_types_version != self.v_con.server_version:
+                with v_pg_types_lock:
+                    v_cached = v_pg_types.get(self.TypesKey())
+                if v_cached is not None and v_cached[0] == self.v_con.server_version:
+                    self.v_types = v_cached[1]
+                    self.v_types_version = v_cached[0]
+                else:
+                    self.LoadTypes()
+                    if not p_autocommit:
+                        self.v_con.commit()
             self.v_con.notices = DataList()
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -1402,6 +1962,37 @@ class PostgreSQL(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+    def TypesKey(self):
+        # Through an SSH tunnel v_host and v_port are a local forward whose port
+        # is reused by other tunnels, so key on the tunnel target instead.
+        if self.v_tunnel_target is not None:
+            return (self.v_tunnel_target, self.v_service, self.v_conn_string)
+        return (self.v_host, str(self.v_port), self.v_service, self.v_conn_string)
+    def LoadTypes(self):
+        self.v_cur.execute('select oid, typname from pg_type')
+        self.v_types = dict([(r['oid'], r['typname']) for r in self.v_cur.fetchall()])
+        self.v_types_version = self.v_con.server_version
+        tmp = []
+        for oid, name in self.v_types.items():
+            if name == 'date' or name == 'timestamp' or name == 'timestamptz':
+                tmp.append(oid)
+        oids = tuple(tmp)
+        v_new_date_type = psycopg2.extensions.new_type(oids, 'DATE', self.Handler)
+        psycopg2.extensions.register_type(v_new_date_type)
+        with v_pg_types_lock:
+            v_pg_types[self.TypesKey()] = (self.v_types_version, self.v_types)
+    def InvalidateTypes(self, p_all=False):
+        with v_pg_types_lock:
+            if p_all:
+                v_pg_types.clear()
+            else:
+                v_pg_types.pop(self.TypesKey(), None)
+        self.v_types = None
+        self.v_types_version = None
+    def TypeName(self, p_oid):
+        if p_oid not in self.v_types:
+            self.LoadTypes()
+        return self.v_types.get(p_oid)
     def Query(self, p_sql, p_alltypesstr=False, p_simple=False):
         try:
             v_keep = None
@@ -1451,6 +2042,24 @@ class PostgreSQL(Generic):
         finally:
             if not v_keep:
                 self.Close()
+    def ExecuteMany(self, p_sql, p_rows):
+        try:
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
+            else:
+                v_keep = True
+            self.v_cur.executemany(p_sql, p_rows)
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except psycopg2.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if not v_keep:
+                self.Close()
     def ExecuteScalar(self, p_sql):
         try:
             v_keep = None
@@ -1574,7 +2183,7 @@ class PostgreSQL(Generic):
             if r != None:
                 k = 0
                 for c in self.v_cur.description:
-                    v_fields.append(DataField(c[0], p_type=type(r[k]), p_dbtype=self.v_types[c[1]]))
+                    v_fields.append(DataField(c[0], p_type=type(r[k]), p_dbtype=self.TypeName(c[1])))
                     if v_first:
                         v_sql = v_sql + "quote_ident('{0}')".format(c[0])
                         v_first = False
@@ -1584,7 +2193,7 @@ class PostgreSQL(Generic):
             else:
                 k = 0
                 for c in self.v_cur.description:
-                    v_fields.append(DataField(c[0], p_type=type(None), p_dbtype=self.v_types[c[1]]))
+                    v_fields.append(DataField(c[0], p_type=type(None), p_dbtype=self.TypeName(c[1])))
                     if v_first:
                         v_sql = v_sql + "quote_ident('{0}')".format(c[0])
                         v_first = False
@@ -1706,7 +2315,7 @@ class PostgreSQL(Generic):
         except Exception as exc:
             self.v_cursor = None
             return p_sql
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_columnar=False):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception('This method should be called in the middle of Open() and Close() calls.')
@@ -1721,7 +2330,10 @@ class PostgreSQL(Generic):
                     if not self.v_autocommit and not self.GetConStatus() == 3 and not self.GetConStatus() == 4:
                         self.v_cur.execute('BEGIN;')
                     self.v_cur.execute(v_sql)
-                v_table = DataTable()
+                if p_columnar:
+                    v_table = ColumnarDataTable()
+                else:
+                    v_table = DataTable()
                 if self.v_cursor:
                     if p_blocksize > 0:
                         self.v_cur.execute('FETCH {0} {1}'.format(p_blocksize, self.v_cursor))
@@ -1734,7 +2346,10 @@ class PostgreSQL(Generic):
                         v_table.Rows = self.v_cur.fetchmany(p_blocksize)
                     else:
                         v_table.Rows = self.v_cur.fetchall()
-                    if p_alltypesstr:
+                    if p_alltypesstr and p_columnar:
+                        for j in range(0, len(v_table.Data)):
+                            v_table.Data[j] = [self.String(v) if v is not None else '' for v in v_table.Data[j]]
+                    elif p_alltypesstr:
                         for i in range(0, len(v_table.Rows)):
                             for j in range(0, len(v_table.Columns)):
                                 if v_table.Rows[i][j] != None:
@@ -1783,6 +2398,141 @@ class PostgreSQL(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+    def BulkInsertBlock(self, p_block, p_tablename, p_fields=None):
+        try:
+            v_columnames = []
+            if p_fields is None:
+                v_fields = []
+                for c in p_block.Columns:
+                    v_columnames.append(c)
+                    v_fields.append(DataField(c))
+            else:
+                v_fields = p_fields
+                for p in v_fields:
+                    v_columnames.append(p.v_name)
+            for p in v_fields:
+                if p.v_mask != '#':
+                    return self.InsertBlock(p_block, p_tablename, p_fields)
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
+            else:
+                v_keep = True
+            try:
+                self.v_cur.copy_expert(
+                    'copy ' + p_tablename + '(' + ','.join(v_columnames) + ') from stdin with csv',
+                    DataCopyReader(self, p_block, v_fields)
+                )
+            finally:
+                if not v_keep:
+                    self.Close()
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except psycopg2.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+    def CopyValue(self, p_value):
+        if p_value is None:
+            return ''
+        elif type(p_value) == type(list()):
+            v_value = self.MogrifyArray(p_value)
+        elif isinstance(p_value, (bytes, bytearray, memoryview)):
+            v_value = '\\x' + bytes(p_value).hex()
+        elif isinstance(p_value, dict):
+            v_value = json.dumps(p_value)
+        else:
+            v_value = str(p_value)
+        return '"' + v_value.replace('"', '""') + '"'
+    def CopyRow(self, p_row, p_fields):
+        if len(p_row) == len(p_fields):
+            v_copy = []
+            for k in range(0, len(p_fields)):
+                v_copy.append(self.CopyValue(p_row[p_fields[k].v_name]))
+            return ','.join(v_copy) + '\n'
+        else:
+            raise Spartacus.Database.Exception('Can not copy with different number of parameters.')
+    def Listen(self, p_channel):
+        self.Execute('listen "{0}"'.format(p_channel.replace('"', '""')))
+    def WaitNotify(self, p_timeout=None):
+        try:
+            if self.v_con is None:
+                raise Spartacus.Database.Exception('This method should be called in the middle of Open() and Close() calls.')
+            else:
+                if len(self.v_con.notifies) == 0:
+                    select.select([self.v_con], [], [], p_timeout)
+                    self.v_con.poll()
+                v_payloads = [n.payload for n in self.v_con.notifies]
+                del self.v_con.notifies[:]
+                return v_payloads
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except psycopg2.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+    def CopyStatement(self, p_sql):
+        try:
+            v_statement = sqlparse.split(p_sql)
+            v_analysis = sqlparse.parse(p_sql)
+            if len(v_statement) != 1 or len(v_analysis) != 1 or v_analysis[0].get_type() != 'SELECT':
+                return None
+            v_found_cte = False
+            v_found_dml = False
+            for v_token in v_analysis[0].flatten():
+                if v_token.ttype == sqlparse.tokens.Token.Keyword.CTE:
+                    v_found_cte = True
+                if v_token.ttype == sqlparse.tokens.Token.Keyword.DML and v_token.value.upper() != 'SELECT':
+                    v_found_dml = True
+                if v_token.is_keyword and v_token.value.upper() == 'INTO':
+                    return None
+            if v_found_cte and v_found_dml:
+                return None
+            return v_statement[0].strip().rstrip(';')
+        except Exception as exc:
+            return None
+    def CopyToFile(self, p_sql, p_filename, p_encoding='utf-8', p_delimiter=';', p_progress=None):
+        try:
+            v_sql = self.CopyStatement(p_sql)
+            if v_sql is None:
+                raise Spartacus.Database.Exception('Only a single SELECT statement can be copied to a file.')
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
+            else:
+                v_keep = True
+            try:
+                if p_filename.lower().endswith('.gz'):
+                    v_file = gzip.open(p_filename, 'wt', encoding=p_encoding)
+                else:
+                    v_file = open(p_filename, 'w', encoding=p_encoding)
+                try:
+                    self.v_cur.copy_expert(
+                        'copy (\n{0}\n) to stdout with (format csv, header, delimiter {1})'.format(
+                            v_sql,
+                            "'" + p_delimiter.replace("'", "''") + "'"
+                        ),
+                        DataCopyWriter(
+                            v_file,
+                            p_progress,
+                            1,
+                            psycopg2.extensions.encodings.get(self.v_con.encoding, 'utf-8')
+                        )
+                    )
+                    return self.v_cur.rowcount
+                finally:
+                    v_file.close()
+            finally:
+                if not v_keep:
+                    self.Close()
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except psycopg2.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
     def Special(self, p_sql):
         try:
             v_keep = None
@@ -1866,7 +2616,7 @@ MySQL
 ------------------------------------------------------------------------
 '''
 class MySQL(Generic):
-    def __init__(self, p_host, p_port, p_service, p_user, p_password, p_conn_string='', p_encoding=None):
+    def __init__(self, p_host, p_port, p_service, p_user, p_password, p_conn_string='', p_encoding=None, p_serverside=True):
         if 'MySQL' in v_supported_rdbms:
             self.v_host = p_host
             if p_port is None or p_port == '':
@@ -1880,11 +2630,14 @@ class MySQL(Generic):
             self.v_password = p_password
             self.v_con = None
             self.v_cur = None
+            self.v_sscur = None
+            self.v_serverside = p_serverside
             self.v_help = Spartacus.Database.DataTable()
             self.v_help.Columns = ['Command', 'Syntax', 'Description']
             self.v_help.AddRow(['\\?', '\\?', 'Show Commands.'])
             self.v_help.AddRow(['\\x', '\\x', 'Toggle expanded output.'])
             self.v_help.AddRow(['\\timing', '\\timing', 'Toggle timing of commands.'])
+            self.v_help.CreateIndex('Command')
             self.v_expanded = False
             self.v_timing = False
             self.v_status = 0
@@ -1935,6 +2688,7 @@ class MySQL(Generic):
                 autocommit=p_autocommit,
                 read_default_file='~/.my.cnf')
             self.v_cur = self.v_con.cursor()
+            self.v_sscur = None
             self.v_start = True
             self.v_status = 0
             self.v_con_id = self.ExecuteScalar('select connection_id()')
@@ -1950,15 +2704,13 @@ class MySQL(Generic):
                 v_keep = False
             else:
                 v_keep = True
+            self.CloseStream()
             self.v_status = self.v_cur.execute(p_sql)
             v_table = DataTable(None, p_alltypesstr, p_simple)
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -1977,6 +2729,7 @@ class MySQL(Generic):
                 v_keep = False
             else:
                 v_keep = True
+            self.CloseStream()
             self.v_status = self.v_cur.execute(p_sql)
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -1995,6 +2748,7 @@ class MySQL(Generic):
                 v_keep = False
             else:
                 v_keep = True
+            self.CloseStream()
             self.v_status = self.v_cur.execute(p_sql)
             r = self.v_cur.fetchone()
             if r != None:
@@ -2014,6 +2768,7 @@ class MySQL(Generic):
     def Close(self, p_commit=True):
         try:
             if self.v_con:
+                self.CloseStream()
                 self.v_con.commit()
                 if self.v_cur:
                     self.v_cur.close()
@@ -2041,6 +2796,7 @@ class MySQL(Generic):
                 self.v_status = v_cur2.execute('kill {0}'.format(self.v_con_id))
                 v_cur2.close()
                 v_con2.close()
+                self.v_sscur = None
                 if self.v_cur:
                     self.v_cur.close()
                     self.v_cur = None
@@ -2050,6 +2806,49 @@ class MySQL(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+    def CloseStream(self):
+        # An abandoned server side cursor is killed from a second connection
+        # instead of reading its remaining rows. The kill ends the stream with
+        # ER_QUERY_INTERRUPTED, and PyMySQL < 1.0 then leaves the result marked
+        # unbuffered, so the next execute would wait forever. The result is
+        # discarded and the connection pinged. If it doesn't answer, it is
+        # dropped and opened again.
+        if self.v_sscur:
+            v_sscur = self.v_sscur
+            self.v_sscur = None
+            try:
+                v_con2 = pymysql.connect(
+                    host=self.v_host,
+                    port=int(self.v_port),
+                    db=self.v_service,
+                    user=self.v_user,
+                    password=self.v_password)
+                v_cur2 = v_con2.cursor()
+                v_cur2.execute('kill query {0}'.format(self.v_con_id))
+                v_cur2.close()
+                v_con2.close()
+            except builtins.Exception as exc:
+                logger.warning('Could not kill streaming query of connection {0}: {1}'.format(self.v_con_id, str(exc)))
+            try:
+                v_sscur.close()
+            except builtins.Exception as exc:
+                logger.info('Streaming query of connection {0} ended with: {1}'.format(self.v_con_id, str(exc)))
+            try:
+                self.v_con._result = None
+                self.v_con.ping(reconnect=False)
+            except builtins.Exception as exc:
+                logger.warning('Connection {0} unusable after closing its stream, reconnecting: {1}'.format(self.v_con_id, str(exc)))
+                try:
+                    v_autocommit = self.v_con.get_autocommit()
+                except builtins.Exception:
+                    v_autocommit = True
+                try:
+                    self.v_con.close()
+                except builtins.Exception:
+                    None
+                self.v_con = None
+                self.v_cur = None
+                self.Open(v_autocommit)
     def GetPID(self):
         return self.v_con_id
     def Terminate(self, p_pid):
@@ -2070,6 +2869,7 @@ class MySQL(Generic):
             else:
                 v_keep = True
             v_fields = []
+            self.CloseStream()
             self.v_status = self.v_cur.execute('select * from ( ' + p_sql + ' ) t limit 1')
             r = self.v_cur.fetchone()
             if r != None:
@@ -2120,31 +2920,44 @@ class MySQL(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_columnar=False):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception('This method should be called in the middle of Open() and Close() calls.')
             else:
                 if self.v_start:
-                    self.v_status = self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
-                if self.v_cur.description:
-                    for c in self.v_cur.description:
+                    self.CloseStream()
+                    if self.v_serverside:
+                        self.v_sscur = self.v_con.cursor(pymysql.cursors.SSCursor)
+                        self.v_status = self.v_sscur.execute(p_sql)
+                        if self.v_sscur.description:
+                            self.v_status = 0
+                    else:
+                        self.v_status = self.v_cur.execute(p_sql)
+                if self.v_sscur:
+                    v_cur = self.v_sscur
+                else:
+                    v_cur = self.v_cur
+                if p_columnar:
+                    v_table = ColumnarDataTable(None, p_alltypesstr, p_simple)
+                else:
+                    v_table = DataTable(None, p_alltypesstr, p_simple)
+                if v_cur.description:
+                    for c in v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
+                if self.v_sscur:
+                    if v_cur.description:
+                        self.v_status = self.v_status + len(v_table.Rows)
+                    if p_blocksize <= 0 or len(v_table.Rows) < p_blocksize:
+                        self.v_sscur.close()
+                        self.v_sscur = None
+                        self.v_start = True
                 return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -2174,6 +2987,27 @@ class MySQL(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+    def ExecuteMany(self, p_sql, p_rows):
+        try:
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
+            else:
+                v_keep = True
+            self.CloseStream()
+            self.v_cur.executemany(p_sql, p_rows)
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except pymysql.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if not v_keep:
+                self.Close()
+    def BulkInsertBlock(self, p_block, p_tablename, p_fields=None, p_batchsize=1000):
+        return self.InsertBlockMany(p_block, p_tablename, p_fields, p_batchsize)
     def Special(self, p_sql):
         try:
             v_keep = None
@@ -2248,7 +3082,7 @@ MariaDB
 ------------------------------------------------------------------------
 '''
 class MariaDB(Generic):
-    def __init__(self, p_host, p_port, p_service, p_user, p_password, p_conn_string='', p_encoding=None):
+    def __init__(self, p_host, p_port, p_service, p_user, p_password, p_conn_string='', p_encoding=None, p_serverside=True):
         if 'MariaDB' in v_supported_rdbms:
             self.v_host = p_host
             if p_port is None or p_port == '':
@@ -2262,11 +3096,14 @@ class MariaDB(Generic):
             self.v_password = p_password
             self.v_con = None
             self.v_cur = None
+            self.v_sscur = None
+            self.v_serverside = p_serverside
             self.v_help = Spartacus.Database.DataTable()
             self.v_help.Columns = ['Command', 'Syntax', 'Description']
             self.v_help.AddRow(['\\?', '\\?', 'Show Commands.'])
             self.v_help.AddRow(['\\x', '\\x', 'Toggle expanded output.'])
             self.v_help.AddRow(['\\timing', '\\timing', 'Toggle timing of commands.'])
+            self.v_help.CreateIndex('Command')
             self.v_expanded = False
             self.v_timing = False
             self.v_status = 0
@@ -2317,6 +3154,7 @@ class MariaDB(Generic):
                 autocommit=p_autocommit,
                 read_default_file='~/.my.cnf')
             self.v_cur = self.v_con.cursor()
+            self.v_sscur = None
             self.v_start = True
             self.v_status = 0
             self.v_con_id = self.ExecuteScalar('select connection_id()')
@@ -2332,15 +3170,13 @@ class MariaDB(Generic):
                 v_keep = False
             else:
                 v_keep = True
+            self.CloseStream()
             self.v_status = self.v_cur.execute(p_sql)
             v_table = DataTable(None, p_alltypesstr, p_simple)
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -2359,6 +3195,7 @@ class MariaDB(Generic):
                 v_keep = False
             else:
                 v_keep = True
+            self.CloseStream()
             self.v_status = self.v_cur.execute(p_sql)
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -2377,6 +3214,7 @@ class MariaDB(Generic):
                 v_keep = False
             else:
                 v_keep = True
+            self.CloseStream()
             self.v_status = self.v_cur.execute(p_sql)
             r = self.v_cur.fetchone()
             if r != None:
@@ -2396,6 +3234,7 @@ class MariaDB(Generic):
     def Close(self, p_commit=True):
         try:
             if self.v_con:
+                self.CloseStream()
                 self.v_con.commit()
                 if self.v_cur:
                     self.v_cur.close()
@@ -2423,6 +3262,7 @@ class MariaDB(Generic):
                 self.v_status = v_cur2.execute('kill {0}'.format(self.v_con_id))
                 v_cur2.close()
                 v_con2.close()
+                self.v_sscur = None
                 if self.v_cur:
                     self.v_cur.close()
                     self.v_cur = None
@@ -2432,6 +3272,49 @@ class MariaDB(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+    def CloseStream(self):
+        # An abandoned server side cursor is killed from a second connection
+        # instead of reading its remaining rows. The kill ends the stream with
+        # ER_QUERY_INTERRUPTED, and PyMySQL < 1.0 then leaves the result marked
+        # unbuffered, so the next execute would wait forever. The result is
+        # discarded and the connection pinged. If it doesn't answer, it is
+        # dropped and opened again.
+        if self.v_sscur:
+            v_sscur = self.v_sscur
+            self.v_sscur = None
+            try:
+                v_con2 = pymysql.connect(
+                    host=self.v_host,
+                    port=int(self.v_port),
+                    db=self.v_service,
+                    user=self.v_user,
+                    password=self.v_password)
+                v_cur2 = v_con2.cursor()
+                v_cur2.execute('kill query {0}'.format(self.v_con_id))
+                v_cur2.close()
+                v_con2.close()
+            except builtins.Exception as exc:
+                logger.warning('Could not kill streaming query of connection {0}: {1}'.format(self.v_con_id, str(exc)))
+            try:
+                v_sscur.close()
+            except builtins.Exception as exc:
+                logger.info('Streaming query of connection {0} ended with: {1}'.format(self.v_con_id, str(exc)))
+            try:
+                self.v_con._result = None
+                self.v_con.ping(reconnect=False)
+            except builtins.Exception as exc:
+                logger.warning('Connection {0} unusable after closing its stream, reconnecting: {1}'.format(self.v_con_id, str(exc)))
+                try:
+                    v_autocommit = self.v_con.get_autocommit()
+                except builtins.Exception:
+                    v_autocommit = True
+                try:
+                    self.v_con.close()
+                except builtins.Exception:
+                    None
+                self.v_con = None
+                self.v_cur = None
+                self.Open(v_autocommit)
     def GetPID(self):
         return self.v_con_id
     def Terminate(self, p_pid):
@@ -2452,6 +3335,7 @@ class MariaDB(Generic):
             else:
                 v_keep = True
             v_fields = []
+            self.CloseStream()
             self.v_status = self.v_cur.execute('select * from ( ' + p_sql + ' ) t limit 1')
             r = self.v_cur.fetchone()
             if r != None:
@@ -2502,31 +3386,44 @@ class MariaDB(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_columnar=False):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception('This method should be called in the middle of Open() and Close() calls.')
             else:
                 if self.v_start:
-                    self.v_status = self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
-                if self.v_cur.description:
-                    for c in self.v_cur.description:
+                    self.CloseStream()
+                    if self.v_serverside:
+                        self.v_sscur = self.v_con.cursor(pymysql.cursors.SSCursor)
+                        self.v_status = self.v_sscur.execute(p_sql)
+                        if self.v_sscur.description:
+                            self.v_status = 0
+                    else:
+                        self.v_status = self.v_cur.execute(p_sql)
+                if self.v_sscur:
+                    v_cur = self.v_sscur
+                else:
+                    v_cur = self.v_cur
+                if p_columnar:
+                    v_table = ColumnarDataTable(None, p_alltypesstr, p_simple)
+                else:
+                    v_table = DataTable(None, p_alltypesstr, p_simple)
+                if v_cur.description:
+                    for c in v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
+                if self.v_sscur:
+                    if v_cur.description:
+                        self.v_status = self.v_status + len(v_table.Rows)
+                    if p_blocksize <= 0 or len(v_table.Rows) < p_blocksize:
+                        self.v_sscur.close()
+                        self.v_sscur = None
+                        self.v_start = True
                 return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -2556,6 +3453,27 @@ class MariaDB(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+    def ExecuteMany(self, p_sql, p_rows):
+        try:
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
+            else:
+                v_keep = True
+            self.CloseStream()
+            self.v_cur.executemany(p_sql, p_rows)
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except pymysql.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if not v_keep:
+                self.Close()
+    def BulkInsertBlock(self, p_block, p_tablename, p_fields=None, p_batchsize=1000):
+        return self.InsertBlockMany(p_block, p_tablename, p_fields, p_batchsize)
     def Special(self, p_sql):
         try:
             v_keep = None
@@ -2680,10 +3598,7 @@ class Firebird(Generic):
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -2819,29 +3734,24 @@ class Firebird(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_columnar=False):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception('This method should be called in the middle of Open() and Close() calls.')
             else:
                 if self.v_start:
                     self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                if p_columnar:
+                    v_table = ColumnarDataTable(None, p_alltypesstr, p_simple)
+                else:
+                    v_table = DataTable(None, p_alltypesstr, p_simple)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 return v_table
@@ -2882,7 +3792,7 @@ Oracle
 ------------------------------------------------------------------------
 '''
 class Oracle(Generic):
-    def __init__(self, p_host, p_port, p_service, p_user, p_password, p_conn_string='', p_encoding=None):
+    def __init__(self, p_host, p_port, p_service, p_user, p_password, p_conn_string='', p_encoding=None, p_arraysize=1000):
         if 'Oracle' in v_supported_rdbms:
             self.v_host = p_host
             if p_host is not None and (p_port is None or p_port == ''):
@@ -2899,11 +3809,13 @@ class Oracle(Generic):
             self.v_password = p_password
             self.v_con = None
             self.v_cur = None
+            self.v_arraysize = p_arraysize
             self.v_help = Spartacus.Database.DataTable()
             self.v_help.Columns = ['Command', 'Syntax', 'Description']
             self.v_help.AddRow(['\\?', '\\?', 'Show Commands.'])
             self.v_help.AddRow(['\\x', '\\x', 'Toggle expanded output.'])
             self.v_help.AddRow(['\\timing', '\\timing', 'Toggle timing of commands.'])
+            self.v_help.CreateIndex('Command')
             self.v_expanded = False
             self.v_timing = False
             self.v_encoding = p_encoding
@@ -2950,6 +3862,9 @@ class Oracle(Generic):
             self.v_con = cx_Oracle.connect(self.GetConnectionString())
             self.v_con.outputtypehandler = self.Handler
             self.v_cur = self.v_con.cursor()
+            self.v_cur.arraysize = self.v_arraysize
+            if hasattr(self.v_cur, 'prefetchrows'):
+                self.v_cur.prefetchrows = self.v_arraysize + 1
             self.v_start = True
         except cx_Oracle.Error as exc:
             raise Spartacus.Database.Exception(str(exc))
@@ -2968,10 +3883,7 @@ class Oracle(Generic):
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -3128,29 +4040,24 @@ class Oracle(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_columnar=False):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception('This method should be called in the middle of Open() and Close() calls.')
             else:
                 if self.v_start:
                     self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                if p_columnar:
+                    v_table = ColumnarDataTable(None, p_alltypesstr, p_simple)
+                else:
+                    v_table = DataTable(None, p_alltypesstr, p_simple)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 return v_table
@@ -3182,6 +4089,28 @@ class Oracle(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
+    def Placeholder(self, p_index):
+        return ':' + str(p_index + 1)
+    def ExecuteMany(self, p_sql, p_rows):
+        try:
+            v_keep = None
+            if self.v_con is None:
+                self.Open()
+                v_keep = False
+            else:
+                v_keep = True
+            self.v_cur.executemany(p_sql, p_rows)
+        except Spartacus.Database.Exception as exc:
+            raise exc
+        except cx_Oracle.Error as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        except Exception as exc:
+            raise Spartacus.Database.Exception(str(exc))
+        finally:
+            if not v_keep:
+                self.Close()
+    def BulkInsertBlock(self, p_block, p_tablename, p_fields=None, p_batchsize=1000):
+        return self.InsertBlockMany(p_block, p_tablename, p_fields, p_batchsize)
     def Special(self, p_sql):
         try:
             v_keep = None
@@ -3302,10 +4231,7 @@ class MSSQL(Generic):
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -3441,29 +4367,24 @@ class MSSQL(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_columnar=False):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception('This method should be called in the middle of Open() and Close() calls.')
             else:
                 if self.v_start:
                     self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                if p_columnar:
+                    v_table = ColumnarDataTable(None, p_alltypesstr, p_simple)
+                else:
+                    v_table = DataTable(None, p_alltypesstr, p_simple)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 return v_table
@@ -3554,10 +4475,7 @@ class IBMDB2(Generic):
             if self.v_cur.description:
                 for c in self.v_cur.description:
                     v_table.AddColumn(c[0])
-                v_row = self.v_cur.fetchone()
-                while v_row is not None:
-                    v_table.AddRow(list(v_row))
-                    v_row = self.v_cur.fetchone()
+                v_table.AddRows(self.v_cur.fetchall())
             return v_table
         except Spartacus.Database.Exception as exc:
             raise exc
@@ -3693,29 +4611,24 @@ class IBMDB2(Generic):
             raise Spartacus.Database.Exception(str(exc))
         except Exception as exc:
             raise Spartacus.Database.Exception(str(exc))
-    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False):
+    def QueryBlock(self, p_sql, p_blocksize, p_alltypesstr=False, p_simple=False, p_columnar=False):
         try:
             if self.v_con is None:
                 raise Spartacus.Database.Exception('This method should be called in the middle of Open() and Close() calls.')
             else:
                 if self.v_start:
                     self.v_cur.execute(p_sql)
-                v_table = DataTable(None, p_alltypesstr, p_simple)
+                if p_columnar:
+                    v_table = ColumnarDataTable(None, p_alltypesstr, p_simple)
+                else:
+                    v_table = DataTable(None, p_alltypesstr, p_simple)
                 if self.v_cur.description:
                     for c in self.v_cur.description:
                         v_table.AddColumn(c[0])
-                    v_row = self.v_cur.fetchone()
                     if p_blocksize > 0:
-                        k = 0
-                        while v_row is not None and k < p_blocksize:
-                            v_table.AddRow(list(v_row))
-                            k = k + 1
-                            if k < p_blocksize:
-                                v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchmany(p_blocksize))
                     else:
-                        while v_row is not None:
-                            v_table.AddRow(list(v_row))
-                            v_row = self.v_cur.fetchone()
+                        v_table.AddRows(self.v_cur.fetchall())
                 if self.v_start:
                     self.v_start = False
                 return v_table
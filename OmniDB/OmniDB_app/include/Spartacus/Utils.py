@@ -32,6 +32,7 @@ import pyaes
 import base64
 import os
 import csv
+import gzip
 import openpyxl
 from collections import OrderedDict
 import tempfile
@@ -86,6 +87,9 @@ class Cryptor(object):
 class DataFileWriter(object):
     def __init__(self, p_filename, p_fieldnames=None, p_encoding='utf-8', p_delimiter=';', p_lineterminator='\n'):
         v_tmp = p_filename.split('.')
+        self.v_compress = len(v_tmp) > 2 and v_tmp[-1].lower() == 'gz'
+        if self.v_compress:
+            v_tmp = v_tmp[:-1]
         if len(v_tmp) > 1:
             self.v_extension = v_tmp[-1].lower()
         else:
@@ -94,6 +98,7 @@ class DataFileWriter(object):
             self.v_extension = 'csv'
         self.v_filename = p_filename
         self.v_file = None
+        self.v_worksheet = None
         self.v_header = p_fieldnames # Can't be empty for CSV
         self.v_encoding = p_encoding
         self.v_delimiter = p_delimiter
@@ -102,8 +107,13 @@ class DataFileWriter(object):
         self.v_open = False
     def Open(self):
         try:
+            if self.v_compress and self.v_extension != 'csv':
+                raise Spartacus.Utils.Exception('Compression is only supported for CSV files.')
             if self.v_extension == 'csv':
-                self.v_file = open(self.v_filename, 'w', encoding=self.v_encoding)
+                if self.v_compress:
+                    self.v_file = gzip.open(self.v_filename, 'wt', encoding=self.v_encoding)
+                else:
+                    self.v_file = open(self.v_filename, 'w', encoding=self.v_encoding)
                 self.v_object = csv.writer(self.v_file, delimiter=self.v_delimiter, lineterminator=self.v_lineterminator)
                 self.v_object.writerow(self.v_header)
                 self.v_open = True
@@ -121,23 +131,17 @@ class DataFileWriter(object):
             if not self.v_open:
                 raise Spartacus.Utils.Exception('You need to call Open() first.')
             if self.v_extension == 'csv':
-                for v_row in p_datatable.Rows:
-                    self.v_object.writerow(v_row)
+                self.v_object.writerows(p_datatable.ToList())
             else:
                 if self.v_currentrow == 1:
                     if p_sheetname:
-                        v_worksheet = self.v_object.create_sheet(p_sheetname)
+                        self.v_worksheet = self.v_object.create_sheet(p_sheetname)
                     else:
-                        v_worksheet = self.v_object.create_sheet()
-                    v_worksheet.append(p_datatable.Columns)
+                        self.v_worksheet = self.v_object.create_sheet()
+                    self.v_worksheet.append(p_datatable.Columns)
                     self.v_currentrow = self.v_currentrow + 1
-                else:
-                    v_worksheet = self.v_object.active
-                for r in range(0, len(p_datatable.Rows)):
-                    v_row = []
-                    for c in range(0, len(p_datatable.Columns)):
-                        v_row.append(p_datatable.Rows[r][c])
-                    v_worksheet.append(v_row)
+                for v_row in p_datatable.ToList():
+                    self.v_worksheet.append(v_row)
                 self.v_currentrow = self.v_currentrow + len(p_datatable.Rows)
         except Spartacus.Utils.Exception as exc:
             raise exc
@@ -15,6 +15,7 @@ from __future__ import unicode_literals
 
 import sys
 import re
+import codecs
 import socket
 import struct
 
@@ -73,6 +74,7 @@ class SSHClientInteraction(object):
         self.current_output_clean = ''
         self.current_send_string = ''
         self.last_match = ''
+        self.decoder = codecs.getincrementaldecoder(encoding)('replace')
 
     def __del__(self):
         self.close()
@@ -126,6 +128,25 @@ class SSHClientInteraction(object):
 
         return self.current_output
 
+    def fileno(self):
+        """Returns a file descriptor that becomes readable when output
+        arrives, so the channel can be waited on with select/selectors."""
+        return self.channel.fileno()
+
+    def read_available(self):
+        """Reads all output already received without waiting. Multibyte
+        characters split across reads are kept until they are complete.
+        Returns -1 once the channel is closed."""
+        current_output = []
+        while self.channel.recv_ready():
+            current_buffer = self.channel.recv(self.buffer_size)
+            if len(current_buffer) == 0:
+                break
+            current_output.append(self.decoder.decode(current_buffer))
+        if len(current_output) == 0 and (self.channel.closed or self.channel.eof_received):
+            return -1
+        return ''.join(current_output)
+
     def expect(
         self, re_strings='', timeout=None, output_callback=None, default_match_prefix='.*\n',
         strip_ansi=True
@@ -509,6 +509,18 @@ function consoleReturn(p_data,p_context) {
 	}
 }
 
+/// <summary>
+/// Writes the console output received so far while the command is still running.
+/// </summary>
+/// <param name="p_context">Context of the running command.</param>
+function consoleReturnPartial(p_context) {
+	var v_tag = p_context.tab_tag;
+	if (v_tag.state!=v_consoleState.Idle && v_tag.tab_id == v_tag.tabControl.selectedTab.id && v_tag.connTab.id == v_tag.connTab.tag.connTabControl.selectedTab.id) {
+		appendToEditor(v_tag.editor_console,v_tag.tempData);
+		v_tag.tempData = '';
+	}
+}
+
 function consoleReturnRender(p_message,p_context) {
   p_context.tab_tag.state = v_consoleState.Idle;
 
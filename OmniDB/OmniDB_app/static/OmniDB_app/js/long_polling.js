@@ -28,6 +28,8 @@ SOFTWARE.
 
 var v_client_id;
 var v_polling_ajax = null;
+var v_push_source = null;
+var v_push_opened = false;
 
 
 var v_context_object = {
@@ -79,6 +81,35 @@ function call_polling(p_startup) {
     });
 }
 
+function call_push() {
+  var v_url = window.location.protocol + '//' + window.location.hostname + ':' + v_push_port + v_url_folder + '/push/';
+  v_push_source = new EventSource(v_url, { withCredentials: true });
+  v_push_source.onopen = function() {
+    v_push_opened = true;
+  };
+  v_push_source.onmessage = function(p_event) {
+    var p_return = JSON.parse(p_event.data);
+    for (var i=0; i<p_return.returning_rows.length; i++) {
+      try {
+        polling_response(p_return.returning_rows[i]);
+      }
+      catch(err) {
+
+      }
+    }
+  };
+  v_push_source.onerror = function() {
+    // Channel not reachable, for example behind a proxy that only forwards
+    // the main port. Fall back to long polling for the rest of the session.
+    if (!v_push_opened) {
+      v_push_source.close();
+      v_push_source = null;
+      v_push_port = '';
+      call_polling(true);
+    }
+  };
+}
+
 $(window).on('beforeunload', function() {
   clear_client().then(function() {});
 });
@@ -153,8 +184,16 @@ function polling_response(p_message) {
     case parseInt(v_queryResponseCodes.QueryResult): {
       if (p_context) {
         SetAcked(p_context);
+        if (!v_message.v_error && v_message.v_data.v_export_progress !== undefined) {
+          p_context.tab_tag.div_result.innerHTML = 'Exporting... ' + v_message.v_data.v_export_progress + ' rows';
+          break;
+        }
         if (!v_message.v_error || v_message.v_data.v_chunks) {
-          p_context.tab_tag.tempData = p_context.tab_tag.tempData.concat(v_message.v_data.v_data);
+          var v_block = v_message.v_data.v_data;
+          if (v_block && v_block.v_types) {
+            v_block = decodeCompactBlock(v_block);
+          }
+          p_context.tab_tag.tempData = p_context.tab_tag.tempData.concat(v_block);
         }
         if (!v_message.v_data.v_chunks || v_message.v_data.v_last_block || v_message.v_error) {
           v_message.v_data.v_data = [];
@@ -171,7 +210,10 @@ function polling_response(p_message) {
         if (!v_message.v_error) {
           p_context.tab_tag.tempData = p_context.tab_tag.tempData += v_message.v_data.v_data;
         }
-        if (v_message.v_data.v_last_block || v_message.v_error) {
+        if (!v_message.v_data.v_last_block && !v_message.v_error) {
+          consoleReturnPartial(p_context);
+        }
+        else {
           v_message.v_data.v_data = [];
           consoleReturn(v_message,p_context);
           //Remove context
@@ -224,14 +266,45 @@ function polling_response(p_message) {
       if (p_context) {
         SetAcked(p_context);
         advancedObjectSearchReturn(v_message, p_context);
-        //Remove context
-        removeContext(p_context_code);
+        //Categories arrive as they finish, the last message closes the context
+        if (v_message.v_error || v_message.v_data.v_last_block) {
+          removeContext(p_context_code);
+        }
       }
       break;
     }
   }
 }
 
+/// <summary>
+/// Expands a compact result block into rows of strings.
+/// </summary>
+/// <param name="p_block">Block with v_types, v_columns and v_count.</param>
+function decodeCompactBlock(p_block) {
+  var v_rows = new Array(p_block.v_count);
+  for (var i=0; i<p_block.v_count; i++) {
+    v_rows[i] = new Array(p_block.v_types.length);
+  }
+  for (var j=0; j<p_block.v_types.length; j++) {
+    var v_column = p_block.v_columns[j];
+    if (p_block.v_types[j]=='d') {
+      var v_values = v_column[0];
+      var v_codes = v_column[1];
+      for (var i=0; i<p_block.v_count; i++) {
+        var v_value = v_values[v_codes[i]];
+        v_rows[i][j] = (v_value===null) ? '' : v_value;
+      }
+    }
+    else {
+      for (var i=0; i<p_block.v_count; i++) {
+        var v_value = v_column[i];
+        v_rows[i][j] = (v_value===null) ? '' : String(v_value);
+      }
+    }
+  }
+  return v_rows;
+}
+
 function QueryPasswordRequired(p_context, p_message) {
 	if (p_context.tab_tag.mode=='query') {
 		showPasswordPrompt(
@@ -330,7 +403,11 @@ function createRequest(p_messageCode, p_messageData, p_context) {
 		}
 	}
 
-  if (v_polling_ajax == null)
+  if (typeof v_push_port !== 'undefined' && v_push_port != '' && window.EventSource) {
+    if (v_push_source == null)
+      call_push();
+  }
+  else if (v_polling_ajax == null)
     call_polling(true);
   else if (v_polling_ajax.readyState == 0 || v_polling_ajax.readyState == 4) {
     call_polling(false);
@@ -175,6 +175,7 @@ function querySQL(p_mode,
 				v_tab_db_id: v_connTabControl.selectedTab.tag.tabControl.selectedTab.tag.tab_db_id,
 				v_mode: p_mode,
 				v_all_data: p_all_data,
+				v_compact: true,
 				v_log_query: p_log_query,
 				v_tab_title: p_tab_title,
 				v_autocommit: v_connTabControl.selectedTab.tag.tabControl.selectedTab.tag.check_autocommit.checked
@@ -101,9 +101,10 @@ var v_createEditDataTabFunction = function(p_table) {
   "<div class='row mb-1'>" +
     "<div class='tab_actions omnidb__tab-actions col-12'>" +
       "<button id='bt_start_" + v_tab.id + "' class='btn btn-sm omnidb__theme__btn--primary omnidb__tab-actions__btn' title='Run' onclick='queryEditData();'><i class='fas fa-play'></i></button>" +
-      "<select id='sel_filtered_data_" + v_tab.id + "' class='sel_export_file_type form-control w-auto mr-2' onchange='queryEditData()'><option selected='selected' value='10' >Query 10 rows</option><option value='100'>Query 100 rows</option><option value='1000'>Query 1000 rows</option></select>" +
+      "<select id='sel_filtered_data_" + v_tab.id + "' class='sel_export_file_type form-control w-auto mr-2' onchange='queryEditData()'><option selected='selected' value='10' >Query 10 rows per page</option><option value='100'>Query 100 rows per page</option><option value='1000'>Query 1000 rows per page</option></select>" +
       "<button id='bt_cancel_" + v_tab.id + "' class='btn btn-sm btn-danger omnidb__tab-actions__btn' title='Cancel' style='display: none;' onclick='cancelEditData();'>Cancel</button>" +
       "<div id='div_edit_data_query_info_" + v_tab.id + "' class='query_info' style='display: inline-block; margin-left: 5px; vertical-align: middle;'></div>" +
+      "<button id='bt_fetch_more_" + v_tab.id + "' class='btn btn-sm omnidb__theme__btn--secondary omnidb__tab-actions__btn' title='Fetch more' style='display: none;' onclick='queryEditDataMore();'>Fetch more</button>" +
       "<button id='bt_saveEditData_" + v_tab.id + "' onclick='saveEditData()' class='btn btn-sm btn-success omnidb__tab-actions__btn' style='visibility: hidden;'>Save Changes</button>" +
     "</div>" +
   "</div>" +
@@ -214,6 +215,7 @@ var v_createEditDataTabFunction = function(p_table) {
     button_save: document.getElementById('bt_saveEditData_' + v_tab.id),
     sel_export_type : document.getElementById('sel_export_type_' + v_tab.id),
     bt_cancel: document.getElementById('bt_cancel_' + v_tab.id),
+    bt_fetch_more: document.getElementById('bt_fetch_more_' + v_tab.id),
     bt_save: document.getElementById('bt_save_' + v_tab.id),
     tab_title_span : v_tab_title_span,
     tab_loading_span : v_tab_loading_span,
@@ -152,8 +152,8 @@ function cancelEditDataTab(p_tab_tag) {
 	else
 		v_tab_tag = v_connTabControl.selectedTab.tag.tabControl.selectedTab.tag;
 
-	//Displays canceled if is querying data (not saving)
-	if (v_tab_tag.state == v_editDataState.Querying)
+	//Displays canceled if is querying data (not saving or fetching more rows)
+	if (v_tab_tag.state == v_editDataState.Querying && !(v_tab_tag.context && v_tab_tag.context.fetch_more))
 		v_tab_tag.div_result.innerHTML = 'Canceled.';
 
 	v_tab_tag.state = v_editDataState.Idle;
@@ -191,10 +191,12 @@ function queryEditData() {
 			v_pk_list: v_currTabTag.editDataObject.pk,
 			v_columns: v_currTabTag.editDataObject.columns,
 			v_conn_tab_id: v_connTabControl.selectedTab.id,
-			v_tab_id: v_currTabTag.tab_id
+			v_tab_id: v_currTabTag.tab_id,
+			v_mode: 0
 		}
 
 		var start_time = new Date().getTime();
+		v_currTabTag.bt_fetch_more.style.display = 'none';
 
 		v_currTabTag.tab_loading_span.style.visibility = 'visible';
 		v_currTabTag.bt_cancel.style.display = '';
@@ -227,6 +229,77 @@ function queryEditData() {
 
 }
 
+function queryEditDataMore() {
+
+	var v_currTabTag = v_connTabControl.selectedTab.tag.tabControl.selectedTab.tag;
+
+	if (v_currTabTag.state!=v_editDataState.Idle) {
+		showAlert('Tab with activity in progress.');
+	}
+	else if (v_currTabTag.button_save.style.visibility=='visible') {
+		showAlert('Save your changes before fetching more rows.');
+	}
+	else {
+
+		v_currTabTag.state = v_editDataState.Querying;
+		v_currTabTag.bt_fetch_more.style.display = 'none';
+
+		var v_message_data = {
+			v_table: v_currTabTag.editDataObject.table,
+			v_schema: v_currTabTag.editDataObject.schema,
+			v_db_index: v_connTabControl.selectedTab.tag.selectedDatabaseIndex,
+			v_filter : v_currTabTag.editDataObject.editor.getValue(),
+			v_count: v_currTabTag.sel_filtered_data.value,
+			v_pk_list: v_currTabTag.editDataObject.pk,
+			v_columns: v_currTabTag.editDataObject.columns,
+			v_conn_tab_id: v_connTabControl.selectedTab.id,
+			v_tab_id: v_currTabTag.tab_id,
+			v_mode: 1
+		}
+
+		v_currTabTag.tab_loading_span.style.visibility = 'visible';
+		v_currTabTag.bt_cancel.style.display = '';
+
+		var v_context = {
+			tab_tag: v_currTabTag,
+			start_time: new Date().getTime(),
+			database_index: v_connTabControl.selectedTab.tag.selectedDatabaseIndex,
+			fetch_more: true
+		}
+		v_context.tab_tag.context = v_context;
+
+		createRequest(v_queryRequestCodes.QueryEditData, v_message_data, v_context);
+
+	}
+
+}
+
+function queryEditDataMoreRender(p_message,p_context) {
+
+	var v_data = p_message.v_data;
+	var v_currTabTag = p_context.tab_tag;
+	var v_source = v_currTabTag.editDataObject.ht.getSourceData();
+	var v_first = v_currTabTag.editDataObject.infoRows.length;
+
+	//New rows go after the loaded ones, before the spare row
+	for (var i=0; i < v_data.v_data.length; i++) {
+		v_source.splice(v_first + i, 0, v_data.v_data[i]);
+
+		var v_object = new Object();
+		v_object.mode = 0;
+		v_object.old_mode = -1;
+		v_object.index = v_first + i;
+		v_object.changed_cols = [];
+		v_object.pk = v_data.v_row_pk[i];
+		v_currTabTag.editDataObject.infoRows.push(v_object);
+	}
+
+	v_currTabTag.editDataObject.ht.render();
+
+	v_currTabTag.query_info.innerHTML = "<span style='font-weight: 900; color: #4a81d4;'>" + v_currTabTag.editDataObject.infoRows.length +  "</span><span> rows</span><span> in </span><span style='font-weight: 900; color: #4a81d4;'>" + p_context.duration/1000 + "</span><span> seconds</span>";
+
+}
+
 function checkEditDataStatus(p_tab) {
 	//Finished querying
 	if (p_tab.tag.state == v_editDataState.QueryReady) {
@@ -272,214 +345,231 @@ function queryEditDataReturnRender(p_message,p_context) {
 	var v_div_result = v_currTabTag.div_result;
 	var v_query_info = v_currTabTag.query_info;
 
-	if (v_currTabTag.editDataObject.ht!=null) {
-		v_currTabTag.editDataObject.ht.destroy();
-		v_currTabTag.editDataObject.ht = null;
-	}
-
-	v_div_result.innerHTML = '';
-
 	var request_time = p_context.duration;
 
-	if (p_message.v_error) {
-
-		v_div_result.innerHTML = '<div class="error_text">' + p_message.v_data + '</div>';
-		v_query_info.innerHTML = "Response time: " + request_time/1000 + " seconds";
+	//Rows fetched by "Fetch more" are appended to the current grid
+	if (!p_message.v_error && v_data.v_mode==1) {
+		queryEditDataMoreRender(p_message,p_context);
 
+		//The paging cursor is closed after EDIT_DATA_IDLE_TIMEOUT seconds idle
+		if (v_data.v_expired)
+			showAlert('The rows were idle for too long to fetch more, query the table again.');
 	}
 	else {
 
-		if (v_currTabTag.editDataObject.pk.length==0) {
-			if (v_currTabTag.editDataObject.firstRender)
-				showAlert('Table has no primary key, existing rows will be read only.');
-
-			v_currTabTag.editDataObject.firstRender = false;
-			v_currTabTag.editDataObject.hasPK = false;
+		if (v_currTabTag.editDataObject.ht!=null) {
+			v_currTabTag.editDataObject.ht.destroy();
+			v_currTabTag.editDataObject.ht = null;
 		}
-		else
-			v_currTabTag.editDataObject.hasPK = true;
 
-		window.scrollTo(0,0);
+		v_div_result.innerHTML = '';
 
-		v_query_info.innerHTML = "<span style='font-weight: 900; color: #4a81d4;'>" + v_data.v_query_info +  "</span><span> rows</span><span> in </span><span style='font-weight: 900; color: #4a81d4;'>" + request_time/1000 + "</span><span> seconds</span>";
+		if (p_message.v_error) {
 
-		var columnProperties = [];
+			v_div_result.innerHTML = '<div class="error_text">' + p_message.v_data + '</div>';
+			v_query_info.innerHTML = "Response time: " + request_time/1000 + " seconds";
 
-		var col = new Object();
-		col.title = ' ';
-		col.width = 40;
-		columnProperties.push(col);
+		}
+		else {
+
+			if (v_currTabTag.editDataObject.pk.length==0) {
+				if (v_currTabTag.editDataObject.firstRender)
+					showAlert('Table has no primary key, existing rows will be read only.');
 
-		for (var i = 0; i < v_currTabTag.editDataObject.columns.length; i++) {
-				var col = new Object();
+				v_currTabTag.editDataObject.firstRender = false;
+				v_currTabTag.editDataObject.hasPK = false;
+			}
+			else
+				v_currTabTag.editDataObject.hasPK = true;
 
-				var v_tooltip_attr =
-				' data-toggle=tooltip ' +
-				'data-placement=bottom ' +
-				'data-html=true ' +
-				'title="<div><b>Type</b> ' + v_currTabTag.editDataObject.columns[i].v_type + '</div>" ';
+			window.scrollTo(0,0);
 
-				var v_tooltip_html = '<i class="ml-1 omnidb__theme-text--primary fas fa-info-circle"' + v_tooltip_attr + '"></i>';
+			v_query_info.innerHTML = "<span style='font-weight: 900; color: #4a81d4;'>" + v_data.v_query_info +  "</span><span> rows</span><span> in </span><span style='font-weight: 900; color: #4a81d4;'>" + request_time/1000 + "</span><span> seconds</span>";
 
-				if (!v_currTabTag.editDataObject.columns[i].v_is_pk)
-					col.title =  '<span>' + v_currTabTag.editDataObject.columns[i].v_column + '</span>' + v_tooltip_html;
-				else
-					col.title = '<i class="fas fa-key action-key text-secondary"></i> <span>' + v_currTabTag.editDataObject.columns[i].v_column + '</span>' + v_tooltip_html;
+			var columnProperties = [];
 
-				col.renderer = 'text';
+			var col = new Object();
+			col.title = ' ';
+			col.width = 40;
 			columnProperties.push(col);
 
-		}
+			for (var i = 0; i < v_currTabTag.editDataObject.columns.length; i++) {
+					var col = new Object();
 
-		var v_infoRows = [];
+					var v_tooltip_attr =
+					' data-toggle=tooltip ' +
+					'data-placement=bottom ' +
+					'data-html=true ' +
+					'title="<div><b>Type</b> ' + v_currTabTag.editDataObject.columns[i].v_type + '</div>" ';
 
-						for (var i=0; i < v_data.v_data.length; i++) {
-							var v_object = new Object();
-							v_object.mode = 0;
-							v_object.old_mode = -1;
-							v_object.index = i;
-							v_object.changed_cols = [];
-							v_object.pk = v_data.v_row_pk[i];
-							v_infoRows.push(v_object);
-						}
+					var v_tooltip_html = '<i class="ml-1 omnidb__theme-text--primary fas fa-info-circle"' + v_tooltip_attr + '"></i>';
 
-		var v_div_result = v_currTabTag.div_result;
+					if (!v_currTabTag.editDataObject.columns[i].v_is_pk)
+						col.title =  '<span>' + v_currTabTag.editDataObject.columns[i].v_column + '</span>' + v_tooltip_html;
+					else
+						col.title = '<i class="fas fa-key action-key text-secondary"></i> <span>' + v_currTabTag.editDataObject.columns[i].v_column + '</span>' + v_tooltip_html;
 
-		if (v_div_result.innerHTML!='') {
+					col.renderer = 'text';
+				columnProperties.push(col);
 
-			v_currTabTag.editDataObject.ht.destroy();
-		}
+			}
 
-		v_currTabTag.editDataObject.infoRows = v_infoRows;
-
-		var container = v_div_result;
-		v_currTabTag.editDataObject.ht = new Handsontable(container,
-		{
-			licenseKey: 'non-commercial-and-evaluation',
-			columns : columnProperties,
-			data : v_data.v_data,
-			colHeaders : true,
-			rowHeaders : true,
-			manualColumnResize: true,
-			fixedColumnsLeft: 1,
-			minSpareRows: 1,
-			contextMenu: {
-					callback: function (key, options) {
-						if (key === 'edit_data') {
-							if (v_currTabTag.editDataObject.hasPK)
-								editCellData(this,options[0].start.row,options[0].start.col,this.getDataAtCell(options[0].start.row,options[0].start.col),true);
-							else
-								editCellData(this,options[0].start.row,options[0].start.col,this.getDataAtCell(options[0].start.row,options[0].start.col),false);
-						}
-						else if (key === 'copy') {
-							this.selectCell(options[0].start.row,options[0].start.col,options[0].end.row,options[0].end.col);
-							document.execCommand('copy');
-						}
-					},
-					items: {
-						"copy": {name: '<div style=\"position: absolute;\"><i class=\"fas fa-copy cm-all\" style=\"vertical-align: middle;\"></i></div><div style=\"padding-left: 30px;\">Copy</div>'},
-						"edit_data": {name: '<div style=\"position: absolute;\"><i class=\"fas fa-edit cm-all\" style=\"vertical-align: middle;\"></i></div><div style=\"padding-left: 30px;\">Edit Content</div>'}
-					}
-				},
-			beforeChange: function (changes, source) {
-										if (!changes) {
-												return;
-										}
-
-										$.each(changes, function (index, element) {
-												var change = element;
-												var rowIndex = change[0];
-												var columnIndex = change[1];
-												var oldValue = change[2];
-												var newValue = change[3];
-
-												if (rowIndex >= v_currTabTag.editDataObject.infoRows.length)
-												{
-													var v_object = new Object();
-								v_object.mode = 2;
+			var v_infoRows = [];
+
+							for (var i=0; i < v_data.v_data.length; i++) {
+								var v_object = new Object();
+								v_object.mode = 0;
 								v_object.old_mode = -1;
+								v_object.index = i;
 								v_object.changed_cols = [];
-								v_object.index = v_currTabTag.editDataObject.infoRows.length;
-								v_object.pk = null;
+								v_object.pk = v_data.v_row_pk[i];
+								v_infoRows.push(v_object);
+							}
 
-						v_currTabTag.editDataObject.infoRows.push(v_object);
+			var v_div_result = v_currTabTag.div_result;
 
-						v_currTabTag.button_save.style.visibility = 'visible';
+			if (v_div_result.innerHTML!='') {
 
-												}
-												if(oldValue != newValue && v_currTabTag.editDataObject.infoRows[rowIndex].mode!=2){
-
-													var v_found = false;
+				v_currTabTag.editDataObject.ht.destroy();
+			}
 
-													if (v_currTabTag.editDataObject.infoRows[rowIndex].changed_cols.indexOf(columnIndex-1)==-1) {
-													v_currTabTag.editDataObject.infoRows[rowIndex].changed_cols.push(columnIndex-1);
-												}
+			v_currTabTag.editDataObject.infoRows = v_infoRows;
+
+			var container = v_div_result;
+			v_currTabTag.editDataObject.ht = new Handsontable(container,
+			{
+				licenseKey: 'non-commercial-and-evaluation',
+				columns : columnProperties,
+				data : v_data.v_data,
+				colHeaders : true,
+				rowHeaders : true,
+				manualColumnResize: true,
+				fixedColumnsLeft: 1,
+				minSpareRows: 1,
+				contextMenu: {
+						callback: function (key, options) {
+							if (key === 'edit_data') {
+								if (v_currTabTag.editDataObject.hasPK)
+									editCellData(this,options[0].start.row,options[0].start.col,this.getDataAtCell(options[0].start.row,options[0].start.col),true);
+								else
+									editCellData(this,options[0].start.row,options[0].start.col,this.getDataAtCell(options[0].start.row,options[0].start.col),false);
+							}
+							else if (key === 'copy') {
+								this.selectCell(options[0].start.row,options[0].start.col,options[0].end.row,options[0].end.col);
+								document.execCommand('copy');
+							}
+						},
+						items: {
+							"copy": {name: '<div style=\"position: absolute;\"><i class=\"fas fa-copy cm-all\" style=\"vertical-align: middle;\"></i></div><div style=\"padding-left: 30px;\">Copy</div>'},
+							"edit_data": {name: '<div style=\"position: absolute;\"><i class=\"fas fa-edit cm-all\" style=\"vertical-align: middle;\"></i></div><div style=\"padding-left: 30px;\">Edit Content</div>'}
+						}
+					},
+				beforeChange: function (changes, source) {
+											if (!changes) {
+													return;
+											}
+
+											$.each(changes, function (index, element) {
+													var change = element;
+													var rowIndex = change[0];
+													var columnIndex = change[1];
+													var oldValue = change[2];
+													var newValue = change[3];
+
+													if (rowIndex >= v_currTabTag.editDataObject.infoRows.length)
+													{
+														var v_object = new Object();
+									v_object.mode = 2;
+									v_object.old_mode = -1;
+									v_object.changed_cols = [];
+									v_object.index = v_currTabTag.editDataObject.infoRows.length;
+									v_object.pk = null;
+
+							v_currTabTag.editDataObject.infoRows.push(v_object);
+
+							v_currTabTag.button_save.style.visibility = 'visible';
 
+													}
+													if(oldValue != newValue && v_currTabTag.editDataObject.infoRows[rowIndex].mode!=2){
 
-													if (v_currTabTag.editDataObject.infoRows[rowIndex].mode!=-1) {
-														v_currTabTag.editDataObject.infoRows[rowIndex].mode = 1;
+														var v_found = false;
 
+														if (v_currTabTag.editDataObject.infoRows[rowIndex].changed_cols.indexOf(columnIndex-1)==-1) {
+														v_currTabTag.editDataObject.infoRows[rowIndex].changed_cols.push(columnIndex-1);
 													}
-													else
-														v_currTabTag.editDataObject.infoRows[rowIndex].old_mode = 1;
 
-														v_currTabTag.button_save.style.visibility = 'visible';
 
-												}
-										});
-								},
-								cells: function (row, col, prop) {
+														if (v_currTabTag.editDataObject.infoRows[rowIndex].mode!=-1) {
+															v_currTabTag.editDataObject.infoRows[rowIndex].mode = 1;
+
+														}
+														else
+															v_currTabTag.editDataObject.infoRows[rowIndex].old_mode = 1;
 
-									var cellProperties = {};
+															v_currTabTag.button_save.style.visibility = 'visible';
 
+													}
+											});
+									},
+									cells: function (row, col, prop) {
 
-					if (v_currTabTag.editDataObject.infoRows[row]!=null) {
+										var cellProperties = {};
 
-						if (!v_currTabTag.editDataObject.hasPK && v_currTabTag.editDataObject.infoRows[row].mode!=2) {
-							if (col==0)
-								cellProperties.renderer = grayEmptyRenderer;
-							else
-								cellProperties.renderer = grayRenderer;
-							cellProperties.readOnly = true;
+
+						if (v_currTabTag.editDataObject.infoRows[row]!=null) {
+
+							if (!v_currTabTag.editDataObject.hasPK && v_currTabTag.editDataObject.infoRows[row].mode!=2) {
+								if (col==0)
+									cellProperties.renderer = grayEmptyRenderer;
+								else
+									cellProperties.renderer = grayRenderer;
+								cellProperties.readOnly = true;
+							}
+							else if (col==0) {
+								cellProperties.renderer = editDataActionRenderer;
+								cellProperties.readOnly = true;
 						}
-						else if (col==0) {
-							cellProperties.renderer = editDataActionRenderer;
-							cellProperties.readOnly = true;
+							else if (v_currTabTag.editDataObject.infoRows[row].mode==2) {
+								cellProperties.renderer = greenRenderer;
+							}
+							else if (v_currTabTag.editDataObject.infoRows[row].mode==-1) {
+								cellProperties.renderer = redRenderer;
+							}
+							else if (v_currTabTag.editDataObject.infoRows[row].mode==1) {
+								cellProperties.renderer = yellowRenderer;
+							}
+							else {
+								cellProperties.renderer = whiteRenderer;
+								// if (row % 2 == 0) {
+								// 	cellProperties.renderer = blueRenderer;
+								// }
+								// else {
+								// 	cellProperties.renderer = whiteRenderer;
+								// }
+							}
+
 					}
-						else if (v_currTabTag.editDataObject.infoRows[row].mode==2) {
-							cellProperties.renderer = greenRenderer;
-						}
-						else if (v_currTabTag.editDataObject.infoRows[row].mode==-1) {
-							cellProperties.renderer = redRenderer;
-						}
-						else if (v_currTabTag.editDataObject.infoRows[row].mode==1) {
-							cellProperties.renderer = yellowRenderer;
+					else {
+						if (col==0) {
+								cellProperties.renderer = newRowRenderer;
+								cellProperties.readOnly = true;
 						}
-						else {
-							cellProperties.renderer = whiteRenderer;
-							// if (row % 2 == 0) {
-							// 	cellProperties.renderer = blueRenderer;
-							// }
-							// else {
-							// 	cellProperties.renderer = whiteRenderer;
-							// }
-						}
-
-				}
-				else {
-					if (col==0) {
-							cellProperties.renderer = newRowRenderer;
-							cellProperties.readOnly = true;
 					}
-				}
 
-					return cellProperties;
+						return cellProperties;
 
-			}
-		});
+				}
+			});
+
+		}
 
 	}
 
+	if (!p_message.v_error && v_data.v_has_more)
+		p_context.tab_tag.bt_fetch_more.style.display = '';
+	else
+		p_context.tab_tag.bt_fetch_more.style.display = 'none';
+
 	p_context.tab_tag.tab_loading_span.style.visibility = 'hidden';
 	p_context.tab_tag.tab_check_span.style.display = 'none';
 	p_context.tab_tag.bt_cancel.style.display = 'none';
@@ -587,6 +677,8 @@ function saveEditDataReturnRender(p_message,p_context) {
 	var v_has_error = false;
 
 	v_currTabTag.button_save.style.visibility = 'hidden';
+	//Saving closes the cursor used to fetch more rows
+	v_currTabTag.bt_fetch_more.style.display = 'none';
 
 	for (var i = v_data.length-1; i >= 0; i--) {
 
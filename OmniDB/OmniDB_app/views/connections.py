@@ -316,6 +316,12 @@ def test_connection(request):
 
                 database.v_connection.v_host = '127.0.0.1'
                 database.v_connection.v_port = server.local_bind_port
+                database.v_connection.v_tunnel_target = (
+                    json_object['tunnel']['server'],
+                    str(json_object['tunnel']['port']),
+                    database.v_active_server,
+                    str(database.v_active_port)
+                )
 
                 message = database.TestConnection()
                 server.close()
@@ -2,38 +2,161 @@ import os
 import json
 import threading
 import time
+import heapq
+import itertools
+import queue
+from collections import deque
 from django.http import JsonResponse
 from datetime import datetime,timedelta
+from OmniDB import settings
 
 import OmniDB_app.include.OmniDatabase as OmniDatabase
 
 global_object = {}
-to_be_removed = []
-
-def cleanup_thread():
+connection_pool = OmniDatabase.ConnectionPool(
+    settings.CONNECTION_POOL_MIN_SIZE,
+    settings.CONNECTION_POOL_MAX_SIZE,
+    settings.CONNECTION_POOL_IDLE_TIMEOUT
+)
+
+# Clients and tabs expire settings.TAB_IDLE_TIMEOUT seconds after their
+# last_update. Instead of scanning every tab, the cleanup thread keeps a heap
+# of (deadline, seq, client id, tab id, kind) entries and only looks at the
+# entries that are due. last_update is changed without touching the heap: a
+# due entry whose object was used meanwhile is pushed again with its real
+# deadline. Kinds are 'tab', 'client' (one per client, pushed again until the
+# client times out and is removed), 'sweep' (one shot, closes the client's tabs
+# flagged to_be_removed) and 'edit' (closes the paging cursor of an edit data
+# tab after EDIT_DATA_IDLE_TIMEOUT).
+expiry_heap = []
+expiry_lock = threading.Lock()
+expiry_event = threading.Event()
+expiry_counter = itertools.count()
+
+# Connections are closed by a few closer threads, so a slow disconnect
+# doesn't hold up the cleanup thread or the request that replaced them.
+closer_queue = queue.Queue()
+
+def closer_thread():
     while True:
-        v_remove_index = len(to_be_removed)-1
+        v_function, v_args = closer_queue.get()
         try:
-            while to_be_removed:
-                conn = to_be_removed.pop(0)
-                conn.v_connection.Close()
-        except:
+            v_function(*v_args)
+        except Exception:
             None
-        for client in list(global_object):
 
-            # Client reached timeout
-            client_timeout_reached = datetime.now() > global_object[client]['last_update'] + timedelta(0,3600)
+for i in range(0, settings.CLOSER_THREADS):
+    t = threading.Thread(target=closer_thread)
+    t.setDaemon(True)
+    t.start()
 
-            for tab_id in list(global_object[client]['tab_list']):
-                try:
-                    # Tab reached timeout
-                    tab_timeout_reached = datetime.now() > global_object[client]['tab_list'][tab_id]['last_update'] + timedelta(0,3600)
+def close_database(p_database):
+    p_database.v_connection.Close()
 
-                    if client_timeout_reached or tab_timeout_reached or global_object[client]['tab_list'][tab_id]['to_be_removed'] == True:
-                        close_tab_handler(global_object[client],tab_id)
-                except Exception as exc:
-                    None
-        time.sleep(30)
+def schedule_expiry(p_deadline, p_client_id, p_tab_id=None, p_kind='tab'):
+    with expiry_lock:
+        v_first = len(expiry_heap) == 0 or p_deadline < expiry_heap[0][0]
+        heapq.heappush(expiry_heap, (p_deadline, next(expiry_counter), p_client_id, p_tab_id, p_kind))
+    if v_first:
+        expiry_event.set()
+
+def expiry_deadline(p_object):
+    return p_object['last_update'].timestamp() + settings.TAB_IDLE_TIMEOUT
+
+def is_tab_alive(p_owner):
+    try:
+        return p_owner[1] in global_object[p_owner[0]]['tab_list']
+    except Exception:
+        return False
+
+def expire_tab(p_client_object, p_tab_id):
+    try:
+        tab_object = p_client_object['tab_list'].pop(p_tab_id)
+    except KeyError:
+        return
+    closer_queue.put((close_tab_object, (tab_object,)))
+
+def expire_entry(p_now, p_client_id, p_tab_id, p_kind):
+    try:
+        client_object = global_object[p_client_id]
+    except KeyError:
+        return
+
+    if p_kind == 'edit':
+        try:
+            tab_object = client_object['tab_list'][p_tab_id]
+        except KeyError:
+            return
+        if not tab_object.get('edit_cursor'):
+            return
+        edit_deadline = tab_object['last_update'].timestamp() + settings.EDIT_DATA_IDLE_TIMEOUT
+        if edit_deadline <= p_now:
+            tab_object['edit_cursor'] = False
+            closer_queue.put((close_database, (tab_object['omnidatabase'],)))
+        else:
+            schedule_expiry(edit_deadline, p_client_id, p_tab_id, 'edit')
+        return
+
+    client_deadline = expiry_deadline(client_object)
+
+    if p_kind == 'tab':
+        try:
+            tab_object = client_object['tab_list'][p_tab_id]
+        except KeyError:
+            return
+        tab_deadline = min(expiry_deadline(tab_object), client_deadline)
+        if tab_object['to_be_removed'] == True or tab_deadline <= p_now:
+            expire_tab(client_object, p_tab_id)
+        else:
+            schedule_expiry(tab_deadline, p_client_id, p_tab_id)
+    else:
+        client_timeout_reached = client_deadline <= p_now
+        for tab_id in list(client_object['tab_list']):
+            try:
+                if client_timeout_reached or client_object['tab_list'][tab_id]['to_be_removed'] == True:
+                    expire_tab(client_object, tab_id)
+            except Exception:
+                None
+        if p_kind == 'client':
+            # A timed out client without tabs is removed, get_client_object
+            # creates a new one if the browser comes back. If a tab was opened
+            # meanwhile, the client is checked again in 30s.
+            if not client_timeout_reached:
+                schedule_expiry(client_deadline, p_client_id, None, 'client')
+            elif len(client_object['tab_list']) > 0:
+                schedule_expiry(p_now + 30, p_client_id, None, 'client')
+            elif global_object.get(p_client_id) is client_object:
+                del global_object[p_client_id]
+
+def cleanup_thread():
+    v_next_pool_check = time.time() + 30
+    while True:
+        v_now = time.time()
+        v_due = []
+        with expiry_lock:
+            while expiry_heap and expiry_heap[0][0] <= v_now:
+                v_due.append(heapq.heappop(expiry_heap))
+            if expiry_heap:
+                v_wait = expiry_heap[0][0] - v_now
+            else:
+                v_wait = None
+            expiry_event.clear()
+        for (v_deadline, v_seq, v_client_id, v_tab_id, v_kind) in v_due:
+            try:
+                expire_entry(v_now, v_client_id, v_tab_id, v_kind)
+            except Exception:
+                None
+        if v_now >= v_next_pool_check:
+            try:
+                connection_pool.ReleaseOrphans(is_tab_alive)
+                connection_pool.Evict()
+            except:
+                None
+            v_next_pool_check = v_now + 30
+        if v_wait is None or v_wait > v_next_pool_check - v_now:
+            v_wait = v_next_pool_check - v_now
+        if len(v_due) == 0:
+            expiry_event.wait(v_wait)
 
 t = threading.Thread(target=cleanup_thread)
 t.setDaemon(True)
@@ -103,7 +226,15 @@ def close_tab_handler(p_client_object,p_tab_object_id):
     try:
         tab_object = p_client_object['tab_list'][p_tab_object_id]
         del p_client_object['tab_list'][p_tab_object_id]
-        if tab_object['type'] == 'query' or tab_object['type'] == 'console' or tab_object['type'] == 'connection' or tab_object['type'] == 'edit':
+        close_tab_object(tab_object)
+    except Exception as exc:
+        None
+
+def close_tab_object(tab_object):
+    try:
+        if tab_object['type'] == 'connection' and hasattr(tab_object['omnidatabase'], 'v_pool_key'):
+            connection_pool.Release(tab_object['omnidatabase'])
+        elif tab_object['type'] == 'query' or tab_object['type'] == 'console' or tab_object['type'] == 'connection' or tab_object['type'] == 'edit':
             try:
                 tab_object['omnidatabase'].v_connection.Cancel(False)
             except Exception:
@@ -150,6 +281,7 @@ def clear_client_object(
 
         for tab_id in list(client_object['tab_list']):
             global_object[p_client_id]['tab_list'][tab_id]['to_be_removed'] = True
+        schedule_expiry(time.time(), p_client_id, None, 'sweep')
 
         try:
             client_object['polling_lock'].release()
@@ -171,6 +303,7 @@ def create_tab_object(
     v_object['last_update'] = datetime.now()
     v_object['to_be_removed'] = False
     global_object[p_session.session_key]['tab_list'][p_tab_id] = v_object
+    schedule_expiry(expiry_deadline(v_object), p_session.session_key, p_tab_id)
     return v_object
 
 
@@ -183,11 +316,15 @@ def get_client_object(p_client_id):
             'id': p_client_id,
             'polling_lock': threading.Lock(),
             'returning_data_lock': threading.Lock(),
-            'returning_data': [],
+            'returning_data': deque(),
+            'returning_data_size': 0,
+            'returning_data_drained': threading.Condition(),
+            'push_notify': set(),
             'tab_list': {},
             'last_update': datetime.now()
         }
         global_object[p_client_id] = client_object
+        schedule_expiry(expiry_deadline(client_object), p_client_id, None, 'client')
 
     return client_object
 
@@ -250,26 +387,50 @@ def get_database_tab_object(
             v_global_database_object.v_connection.v_password!=p_tab_object['omnidatabase'].v_connection.v_password)
             ):
 
-        v_database_new = OmniDatabase.Generic.InstantiateDatabase(
-            v_global_database_object.v_db_type,
-            v_global_database_object.v_connection.v_host,
-            str(v_global_database_object.v_connection.v_port),
-            v_current_tab_database,
-            v_global_database_object.v_active_user,
-            v_global_database_object.v_connection.v_password,
-            v_global_database_object.v_conn_id,
-            v_global_database_object.v_alias,
-            p_conn_string = v_global_database_object.v_conn_string,
-            p_parse_conn_string = False
-        )
-        if p_use_lock:
-            v_database_new.v_lock = threading.Lock()
+        def new_database():
+            v_database = OmniDatabase.Generic.InstantiateDatabase(
+                v_global_database_object.v_db_type,
+                v_global_database_object.v_connection.v_host,
+                str(v_global_database_object.v_connection.v_port),
+                v_current_tab_database,
+                v_global_database_object.v_active_user,
+                v_global_database_object.v_connection.v_password,
+                v_global_database_object.v_conn_id,
+                v_global_database_object.v_alias,
+                p_conn_string = v_global_database_object.v_conn_string,
+                p_parse_conn_string = False
+            )
+            if p_use_lock:
+                v_database.v_lock = threading.Lock()
+            return v_database
+
+        # Connection tabs only run catalog queries in autocommit mode, so their
+        # connections can be shared through the pool. Query, console and edit
+        # tabs keep session state and always get a dedicated connection.
+        if p_tab_object.get('type') == 'connection':
+            v_database_new = connection_pool.Acquire(
+                (
+                    v_global_database_object.v_conn_id,
+                    v_current_tab_database,
+                    v_global_database_object.v_active_user,
+                    v_global_database_object.v_db_type,
+                    v_global_database_object.v_connection.v_host,
+                    str(v_global_database_object.v_connection.v_port),
+                    v_global_database_object.v_connection.v_password
+                ),
+                new_database,
+                (p_client_object['id'], p_connection_tab_id)
+            )
+        else:
+            v_database_new = new_database()
 
         # Instead of waiting for garbage collector to clear existing connection,
-        # put it in the list of to be removed connections and let the cleaning
-        # thread close it
+        # let a closer thread close it. Pooled connections go back to the pool.
         if (p_tab_object['omnidatabase']):
-            to_be_removed.append(p_tab_object['omnidatabase'])
+            if hasattr(p_tab_object['omnidatabase'], 'v_pool_key'):
+                connection_pool.Release(p_tab_object['omnidatabase'])
+            else:
+                closer_queue.put((close_database, (p_tab_object['omnidatabase'],)))
 
 
         p_tab_object['omnidatabase'] = v_database_new
@@ -1,17 +1,23 @@
 from django.http import HttpResponse
 from django.template import loader
 from django.http import JsonResponse
+from django.http import StreamingHttpResponse
 from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
 from django.shortcuts import redirect
 from datetime import datetime
 from math import ceil
 import json
 import time
 import threading
+import queue
+import selectors
+from collections import deque
 import OmniDB_app.include.Spartacus as Spartacus
 import OmniDB_app.include.Spartacus.Database as Database
 import OmniDB_app.include.Spartacus.Utils as Utils
 import OmniDB_app.include.OmniDatabase as OmniDatabase
+from OmniDB_app.include.RequestExecutor import RequestExecutor
 from OmniDB.startup import clean_temp_folder
 
 from enum import IntEnum
@@ -80,6 +86,56 @@ class StoppableThread(threading.Thread):
     def stop(self):
         self.cancel = True
 
+class StoppableThreadPool(object):
+    """Runs a list of jobs on at most p_max_workers threads. Each thread calls
+        p_target(self, p_jobs) and pops jobs until the deque is empty or the
+        pool is stopped. stop() sets the cancel flag and then calls
+        p_callback(self), which can use self.tag to interrupt running work.
+    """
+    def __init__(self, p_max_workers, p_tag=None):
+        self.v_max_workers = max(1, p_max_workers)
+        self.tag = p_tag
+        self.cancel = False
+    def stop(self, p_callback=None):
+        self.cancel = True
+        if p_callback is not None:
+            p_callback(self)
+    def run(self, p_target, p_jobs):
+        v_jobs = deque(p_jobs)
+        v_threads = []
+        for i in range(0, min(self.v_max_workers, len(v_jobs))):
+            t = threading.Thread(target=p_target, args=(self, v_jobs,))
+            t.setDaemon(True)
+            t.start()
+            v_threads.append(t)
+        for t in v_threads:
+            t.join()
+
+def drop_request(p_task):
+    # The request was cancelled before it started, so no thread will answer
+    # it. Tell the browser to release its context.
+    queue_response(p_task.v_args['v_client_object'], {
+        'v_code': response.RemoveContext,
+        'v_context_code': p_task.v_args['v_context_code'],
+        'v_error': False,
+        'v_data': 1
+    })
+
+# Query, console, edit data and object search requests run on this executor. Terminal and
+# debugger sessions live as long as their tab and keep dedicated threads.
+request_executor = RequestExecutor(
+    settings.REQUEST_POOL_MAX_WORKERS,
+    settings.REQUEST_POOL_MAX_PER_USER,
+    settings.REQUEST_POOL_PRIORITY_WORKERS,
+    drop_request
+)
+
+def current_request():
+    v_thread = threading.current_thread()
+    if isinstance(v_thread, StoppableThread):
+        return v_thread
+    return request_executor.CurrentTask()
+
 import time
 
 def clear_client(request):
@@ -94,8 +150,15 @@ def client_keep_alive(request):
     client_object = get_client_object(request.session.session_key)
     client_object['last_update'] = datetime.now()
 
+    v_session = request.session.get('omnidb_session')
+
     return JsonResponse(
-    {}
+    {
+        'v_queue_depth': len(client_object['returning_data']),
+        'v_queue_size': client_object['returning_data_size'],
+        'v_requests_queued': request_executor.Queued(v_session.v_user_id) if v_session else 0,
+        'v_requests_stats': request_executor.Stats()
+    }
     )
 
 def long_polling(request):
@@ -126,34 +189,150 @@ def long_polling(request):
     # Acquire client polling lock to read returning data
     client_object['polling_lock'].acquire()
 
+    v_returning_data = dequeue_responses(client_object)
+
+    return StreamingHttpResponse(
+        json_stream(
+        {
+            'returning_rows': v_returning_data
+        }
+        ),
+        content_type='application/json'
+    )
+
+def json_stream(p_object, p_chunksize=1000, p_buffersize=65536):
+    v_buffer = []
+    v_size = 0
+    for v_chunk in json_stream_chunks(p_object, p_chunksize):
+        v_buffer.append(v_chunk)
+        v_size = v_size + len(v_chunk)
+        if v_size >= p_buffersize:
+            yield ''.join(v_buffer)
+            v_buffer = []
+            v_size = 0
+    if len(v_buffer) > 0:
+        yield ''.join(v_buffer)
+
+def json_stream_chunks(p_object, p_chunksize):
+    # Result tables are encoded a block of rows at a time, straight from
+    # DataTable.Rows, so a large result never exists both as rows and as text
+    if isinstance(p_object, Database.DataTable):
+        yield from p_object.JsonifyStream(False, p_chunksize, DjangoJSONEncoder)
+    elif isinstance(p_object, dict):
+        yield '{'
+        v_first = True
+        for v_key, v_value in p_object.items():
+            if not v_first:
+                yield ', '
+            v_first = False
+            yield json.dumps(str(v_key)) + ': '
+            yield from json_stream_chunks(v_value, p_chunksize)
+        yield '}'
+    elif isinstance(p_object, list) and any(isinstance(v_item, (dict, Database.DataTable)) for v_item in p_object):
+        yield '['
+        for k in range(0, len(p_object)):
+            if k > 0:
+                yield ', '
+            yield from json_stream_chunks(p_object[k], p_chunksize)
+        yield ']'
+    elif isinstance(p_object, list) and len(p_object) > p_chunksize:
+        yield '['
+        for k in range(0, len(p_object), p_chunksize):
+            if k > 0:
+                yield ', '
+            yield json.dumps(p_object[k:k+p_chunksize], cls=DjangoJSONEncoder)[1:-1]
+        yield ']'
+    else:
+        yield json.dumps(p_object, cls=DjangoJSONEncoder)
+
+def estimate_response_size(p_object):
+    # Approximate size of the JSON text of a response. Large tables and lists
+    # are extrapolated from a sample of their rows instead of being encoded.
+    if isinstance(p_object, Database.DataTable):
+        v_count = len(p_object.Rows)
+        if v_count == 0:
+            return 2
+        v_sample = []
+        for k in range(0, min(v_count, 20)):
+            v_row = p_object.Rows[k]
+            if isinstance(v_row, dict):
+                v_sample.append(list(v_row.values()))
+            else:
+                v_sample.append(list(v_row))
+        return len(json.dumps(v_sample, cls=DjangoJSONEncoder)) * v_count // len(v_sample)
+    elif isinstance(p_object, dict):
+        return sum([len(str(k)) + estimate_response_size(v) + 4 for k, v in p_object.items()]) + 2
+    elif isinstance(p_object, (list, tuple)):
+        if len(p_object) > 100:
+            return sum([estimate_response_size(v) + 2 for v in p_object[:100]]) * len(p_object) // 100
+        return sum([estimate_response_size(v) + 2 for v in p_object]) + 2
+    elif isinstance(p_object, str):
+        return len(p_object) + 2
+    else:
+        return 8
+
+def dequeue_responses(p_client_object):
+
     v_returning_data = []
 
-    client_object['returning_data_lock'].acquire()
+    p_client_object['returning_data_lock'].acquire()
 
-    while len(client_object['returning_data'])>0:
-        v_returning_data.append(client_object['returning_data'].pop(0))
+    while len(p_client_object['returning_data'])>0:
+        v_returning_data.append(p_client_object['returning_data'].popleft()[0])
+    p_client_object['returning_data_size'] = 0
 
-    client_object['returning_data_lock'].release()
+    p_client_object['returning_data_lock'].release()
 
-    return JsonResponse(
-    {
-        'returning_rows': v_returning_data
-    }
-    )
+    # Resume producers paused by queue_response
+    with p_client_object['returning_data_drained']:
+        p_client_object['returning_data_drained'].notify_all()
+
+    return v_returning_data
+
+def wait_response_queue(p_client_object, p_request):
+    # Called by producer threads after queueing a response. While the client
+    # has more than RESPONSE_QUEUE_MAX_SIZE bytes waiting, the producer pauses
+    # here, so it stops fetching until the browser catches up. A producer that
+    # is cancelled stops waiting. If the client does not read anything for
+    # RESPONSE_QUEUE_TIMEOUT seconds, the producer is cancelled.
+    v_start = time.time()
+    with p_client_object['returning_data_drained']:
+        while p_client_object['returning_data_size'] > settings.RESPONSE_QUEUE_MAX_SIZE:
+            if p_request.cancel:
+                return
+            if time.time() - v_start > settings.RESPONSE_QUEUE_TIMEOUT:
+                p_request.stop()
+                return
+            p_client_object['returning_data_drained'].wait(1)
 
 def queue_response(p_client_object, p_data):
 
+    v_size = estimate_response_size(p_data)
+
     p_client_object['returning_data_lock'].acquire()
 
-    p_client_object['returning_data'].append(p_data)
+    p_client_object['returning_data'].append((p_data, v_size))
+    p_client_object['returning_data_size'] += v_size
 
     try:
         # Attempt to release client polling lock so that the polling thread can read data
         p_client_object['polling_lock'].release()
     except Exception as exc:
         None
+    v_push_notify = list(p_client_object['push_notify'])
     p_client_object['returning_data_lock'].release()
 
+    # Wake up the push channel connections of this client, one per browser tab
+    for v_notify in v_push_notify:
+        try:
+            v_notify()
+        except Exception as exc:
+            None
+
+    v_request = current_request()
+    if v_request is not None:
+        wait_response_queue(p_client_object, v_request)
+
 
 def create_request(request):
 
@@ -198,6 +377,9 @@ def create_request(request):
                         finally:
                             self.tag['lock'].release()
 
+                    # Drops the search if it is still queued in the executor,
+                    # the pool stops it if it already started
+                    thread_data['thread'].stop()
                     thread_data['thread_pool'].stop(p_callback=callback)
                 else:
                     thread_data['thread'].stop()
@@ -343,7 +525,7 @@ def create_request(request):
             if v_code == requestType.Query:
                 tab_object['tab_db_id'] = v_data['v_tab_db_id']
                 v_data['v_tab_object'] = tab_object
-                t = StoppableThread(thread_query,v_data)
+                t = request_executor.Task(thread_query,v_data,v_session.v_user_id)
                 tab_object['thread'] = t
                 tab_object['type'] = 'query'
                 tab_object['sql_cmd'] = v_data['v_sql_cmd']
@@ -355,7 +537,7 @@ def create_request(request):
             #Console request
             elif v_code == requestType.Console:
                 v_data['v_tab_object'] = tab_object
-                t = StoppableThread(thread_console,v_data)
+                t = request_executor.Task(thread_console,v_data,v_session.v_user_id)
                 tab_object['thread'] = t
                 tab_object['type'] = 'console'
                 tab_object['sql_cmd'] = v_data['v_sql_cmd']
@@ -365,7 +547,9 @@ def create_request(request):
 
             #Query edit data
             elif v_code == requestType.QueryEditData:
-                t = StoppableThread(thread_query_edit_data,v_data)
+                v_data['v_tab_object'] = tab_object
+                # The only priority task, a page of edit data is short
+                t = request_executor.Task(thread_query_edit_data,v_data,v_session.v_user_id,True)
                 tab_object['thread'] = t
                 tab_object['type'] = 'edit'
                 #t.setDaemon(True)
@@ -373,12 +557,29 @@ def create_request(request):
 
             #Save edit data
             elif v_code == requestType.SaveEditData:
-                t = StoppableThread(thread_save_edit_data,v_data)
+                t = request_executor.Task(thread_save_edit_data,v_data,v_session.v_user_id)
                 tab_object['thread'] = t
                 tab_object['type'] = 'edit'
                 #t.setDaemon(True)
                 t.start()
 
+            #Advanced object search
+            elif v_code == requestType.AdvancedObjectSearch:
+                v_thread_pool = StoppableThreadPool(
+                    settings.THREAD_POOL_MAX_WORKERS,
+                    {
+                        'lock': threading.Lock(),
+                        'activeConnections': []
+                    }
+                )
+                v_data['v_thread_pool'] = v_thread_pool
+                t = request_executor.Task(thread_advanced_object_search,v_data,v_session.v_user_id)
+                tab_object['thread'] = t
+                tab_object['thread_pool'] = v_thread_pool
+                tab_object['type'] = 'advancedobjectsearch'
+                tab_object['tab_id'] = v_data['v_tab_id']
+                t.start()
+
         #Debugger
         elif v_code == requestType.Debug:
 
@@ -453,6 +654,51 @@ def create_request(request):
     {}
     )
 
+def debug_listen(p_database_control, p_pid):
+    # The debugger extension writes the current line of the debuggee to
+    # omnidb.contexts. If the extension installed the omnidb_notify_context
+    # trigger on that table, it notifies channel omnidb_debugger_<pid> and the
+    # control connection wakes up as soon as the debuggee stops. Returns False
+    # if the trigger is absent, the caller then polls.
+    try:
+        v_installed = p_database_control.v_connection.ExecuteScalar('''
+            select count(*)
+            from pg_trigger
+            where tgname = 'omnidb_notify_context'
+              and tgrelid = 'omnidb.contexts'::regclass
+        ''')
+        if v_installed == 0:
+            return False
+        p_database_control.v_connection.Listen('omnidb_debugger_{0}'.format(p_pid))
+        return True
+    except Exception as exc:
+        logger.warning('Debugger notifications not available, polling instead: {0}'.format(str(exc)))
+        return False
+
+def debug_context(p_database_control, p_pid):
+    # Current line, finished flag and variables of the debuggee in one query.
+    # The line is returned as an int, or None if unset.
+    v_table = p_database_control.v_connection.Query('''
+        select c.lineno,
+               c.finished,
+               v.name,
+               v.attribute,
+               v.vartype,
+               v.value,
+               v.pid is null as novariable
+        from omnidb.contexts c
+        left join omnidb.variables v
+        on v.pid = c.pid
+        where c.pid = {0}
+    '''.format(p_pid),True)
+    if len(v_table.Rows) == 0:
+        return None, None, []
+    v_lineno = None
+    if v_table.Rows[0][0] != '':
+        v_lineno = int(v_table.Rows[0][0])
+    v_variables = [list(r[2:6]) for r in v_table.Rows if r[6] != 'True']
+    return v_lineno, v_table.Rows[0][1], v_variables
+
 def thread_debug(self,args):
     v_response = {
         'v_code': -1,
@@ -489,6 +735,9 @@ def thread_debug(self,args):
             #updating pid and port in tab object
             v_tab_object['debug_pid'] = pid
 
+            #listen before the function runs so its first stop is not missed
+            v_notify = debug_listen(v_database_control, pid)
+
             #Run thread that will execute the function
             t = StoppableThread(thread_debug_run_func,{ 'v_tab_object': v_tab_object, 'v_context_code': args['v_context_code'], 'v_function': args['v_function'], 'v_type': args['v_type'], 'v_client_object': v_client_object})
             v_tab_object['thread'] = t
@@ -500,20 +749,21 @@ def thread_debug(self,args):
             v_lineno = None
             #wait for context to be ready or thread ends
             while v_lineno == None and t.isAlive():
-                time.sleep(0.5)
-                v_lineno = v_database_control.v_connection.ExecuteScalar('select lineno from omnidb.contexts where pid = {0} and lineno is not null'.format(pid))
+                if v_notify:
+                    v_database_control.v_connection.WaitNotify(0.5)
+                else:
+                    time.sleep(0.5)
+                v_lineno, v_finished, v_variables = debug_context(v_database_control, pid)
 
             # Function ended instantly
             if not t.isAlive():
                 v_database_control.v_connection.Close()
             else:
-                v_variables = v_database_control.v_connection.Query('select name,attribute,vartype,value from omnidb.variables where pid = {0}'.format(pid),True)
-
                 v_response['v_code'] = response.DebugResponse
                 v_response['v_data'] = {
                 'v_state': debugState.Ready,
                 'v_remove_context': False,
-                'v_variables': v_variables.Rows,
+                'v_variables': v_variables,
                 'v_lineno': v_lineno
                 }
                 queue_response(v_client_object,v_response)
@@ -526,17 +776,16 @@ def thread_debug(self,args):
                 v_database_control.v_connection.Execute('select pg_advisory_unlock({0}) from omnidb.contexts where pid = {0}; select pg_advisory_lock({0}) from omnidb.contexts where pid = {0};'.format(v_tab_object['debug_pid']))
 
                 #acquired the lock, get variables and lineno
-                v_variables = v_database_control.v_connection.Query('select name,attribute,vartype,value from omnidb.variables where pid = {0}'.format(v_tab_object['debug_pid']),True)
-                v_context_data = v_database_control.v_connection.Query('select lineno,finished from omnidb.contexts where pid = {0}'.format(v_tab_object['debug_pid']),True)
+                v_lineno, v_finished, v_variables = debug_context(v_database_control, v_tab_object['debug_pid'])
 
                 #not last statement
-                if (v_context_data.Rows[0][1]!='True'):
+                if (v_finished!='True'):
                     v_response['v_code'] = response.DebugResponse
                     v_response['v_data'] = {
                     'v_state': debugState.Ready,
                     'v_remove_context': True,
-                    'v_variables': v_variables.Rows,
-                    'v_lineno': v_context_data.Rows[0][0]
+                    'v_variables': v_variables,
+                    'v_lineno': v_lineno
                     }
                     queue_response(v_client_object,v_response)
                 else:
@@ -717,61 +966,82 @@ def LogHistory(p_user_id,
     except Exception as exc:
         logger.error('''*** Exception ***\n{0}'''.format(traceback.format_exc()))
 
+def terminal_read(p_tab_object):
+    # Returns the terminal output available right now, '' if there is none
+    # and None when the terminal was closed
+    try:
+        if p_tab_object['terminal_type'] == 'local':
+            return p_tab_object['terminal_object'].read_nonblocking(size=4096, timeout=0)
+        else:
+            v_data = p_tab_object['terminal_object'].read_available()
+            if v_data == -1:
+                return None
+            return v_data
+    except Exception as exc:
+        if 'EOF' in str(exc):
+            return None
+        if 'TIMEOUT' in type(exc).__name__.upper():
+            return ''
+        raise
+
 def thread_terminal(self,args):
+    # The thread sleeps in select until the terminal has output, then keeps
+    # reading for TERMINAL_FRAME_SECONDS so bursts of output are sent as one
+    # frame instead of one message per read.
+    v_response = {
+        'v_code': response.TerminalResult,
+        'v_context_code': args['v_context_code'],
+        'v_error': False,
+        'v_data': 1
+    }
+    v_selector = None
 
     try:
-        v_cmd             = args['v_cmd']
-        v_tab_id          = args['v_tab_id']
         v_tab_object      = args['v_tab_object']
         v_terminal_object = v_tab_object['terminal_object']
         v_terminal_ssh_client = v_tab_object['terminal_ssh_client']
         v_client_object  = args['v_client_object']
 
-        while not self.cancel:
-            try:
-                if v_tab_object['terminal_type'] == 'local':
-                    v_data_return = v_terminal_object.read_nonblocking(size=1024)
-                else:
-                    v_data_return = v_terminal_object.read_current()
-
-                #send data in chunks to avoid blocking the websocket server
-                chunks = [v_data_return[x:x+10000] for x in range(0, len(v_data_return), 10000)]
-
-                if len(chunks)>0:
-                    for count in range(0,len(chunks)):
-                        if self.cancel:
-                            break
-
-                        v_response = {
-                            'v_code': response.TerminalResult,
-                            'v_context_code': args['v_context_code'],
-                            'v_error': False,
-                            'v_data': 1
-                        }
-
-                        if not count==len(chunks)-1:
-                            v_response['v_data'] = {
-                                'v_data' : chunks[count],
-                                'v_last_block': False
-                            }
-                        else:
-                            v_response['v_data'] = {
-                                'v_data' : chunks[count],
-                                'v_last_block': True
-                            }
-                        if not self.cancel:
-                            queue_response(v_client_object,v_response)
-                else:
-                    if not self.cancel:
-                        queue_response(v_client_object,v_response)
+        v_selector = selectors.DefaultSelector()
+        v_selector.register(v_terminal_object, selectors.EVENT_READ)
 
-            except Exception as exc:
-                transport = v_terminal_ssh_client.get_transport()
-                if transport == None or transport.is_active() == False:
+        v_closed = False
+        while not self.cancel and not v_closed:
+            if not v_selector.select(settings.TERMINAL_IDLE_SECONDS):
+                if v_tab_object['terminal_type'] != 'local':
+                    transport = v_terminal_ssh_client.get_transport()
+                    if transport == None or transport.is_active() == False:
+                        break
+                continue
+
+            v_frame = []
+            v_frame_size = 0
+            v_frame_end = time.time() + settings.TERMINAL_FRAME_SECONDS
+            while not self.cancel:
+                v_data = terminal_read(v_tab_object)
+                if v_data is None:
+                    v_closed = True
                     break
-                if 'EOF' in str(exc):
+                v_frame.append(v_data)
+                v_frame_size = v_frame_size + len(v_data)
+                v_remaining = v_frame_end - time.time()
+                if v_frame_size >= settings.TERMINAL_FRAME_SIZE or v_remaining <= 0 or not v_selector.select(v_remaining):
                     break
 
+            #send data in chunks to avoid blocking the websocket server
+            v_data_return = ''.join(v_frame)
+            for x in range(0, len(v_data_return), settings.TERMINAL_FRAME_SIZE):
+                if self.cancel:
+                    break
+                queue_response(v_client_object,{
+                    'v_code': response.TerminalResult,
+                    'v_context_code': args['v_context_code'],
+                    'v_error': False,
+                    'v_data': {
+                        'v_data' : v_data_return[x:x+settings.TERMINAL_FRAME_SIZE],
+                        'v_last_block': x+settings.TERMINAL_FRAME_SIZE >= len(v_data_return)
+                    }
+                })
 
     except Exception as exc:
         logger.error('''*** Exception ***\n{0}'''.format(traceback.format_exc()))
@@ -781,6 +1051,85 @@ def thread_terminal(self,args):
         }
         if not self.cancel:
             queue_response(v_client_object,v_response)
+    finally:
+        if v_selector is not None:
+            v_selector.close()
+
+def query_block(p_database, p_sql, p_block_size, p_alltypesstr, p_columnar=False):
+    # Fetches the next block of a result with the size chosen by p_block_size
+    # and reports the block's size and fetch time back to it
+    v_start_time = time.time()
+    v_table = p_database.v_connection.QueryBlock(p_sql, p_block_size.Size(), p_alltypesstr, True, p_columnar)
+    v_seconds = time.time() - v_start_time
+    try:
+        v_bytes = estimate_response_size(v_table)
+    except Exception:
+        v_bytes = 0
+    p_block_size.Update(len(v_table.Rows), v_bytes, v_seconds)
+    return v_table
+
+def export_progress(p_client_object, p_context_code, p_rows):
+    queue_response(p_client_object, {
+        'v_code': response.QueryResult,
+        'v_context_code': p_context_code,
+        'v_error': False,
+        'v_data': {
+            'v_data': [],
+            'v_export_progress': p_rows,
+            'v_last_block': False,
+            'v_chunks': True
+        }
+    })
+
+def export_blocks(p_request, p_client_object, p_context_code, p_writer, p_database, p_first_block, p_fetch, p_queue_size=4):
+    # Blocks are written by a second thread while the next one is fetched.
+    # The bounded queue pauses fetching when the writer falls behind. Every
+    # second a QueryResult with v_export_progress reports the rows fetched.
+    v_queue = queue.Queue(p_queue_size)
+    v_errors = []
+
+    def writer():
+        while True:
+            v_block = v_queue.get()
+            if v_block is None:
+                break
+            if len(v_errors) == 0:
+                try:
+                    p_writer.Write(v_block)
+                except Exception as exc:
+                    v_errors.append(exc)
+
+    t = threading.Thread(target=writer)
+    t.setDaemon(True)
+    t.start()
+
+    v_rows = 0
+    v_last_progress = time.time()
+    try:
+        v_block = p_first_block
+        while True:
+            v_queue.put(v_block)
+            v_rows = v_rows + len(v_block.Rows)
+            if p_database.v_connection.v_start or len(v_block.Rows) == 0 or p_request.cancel or len(v_errors) > 0:
+                break
+            if time.time() - v_last_progress >= 1:
+                v_last_progress = time.time()
+                export_progress(p_client_object, p_context_code, v_rows)
+            v_block = p_fetch()
+    finally:
+        v_queue.put(None)
+        t.join()
+
+    if len(v_errors) > 0:
+        raise v_errors[0]
+    return v_rows
+
+def result_block(p_database, p_table, p_compact):
+    # Compact blocks keep integers as numbers and send repeated strings once,
+    # the browser expands them back into rows of strings
+    if p_compact:
+        return p_table.Compact(p_database.v_connection.String)
+    return p_table
 
 def thread_query(self,args):
     v_response = {
@@ -801,6 +1150,7 @@ def thread_query(self,args):
         v_tab_title      = args['v_tab_title']
         v_autocommit     = args['v_autocommit']
         v_client_object  = args['v_client_object']
+        v_compact        = args.get('v_compact', False) and settings.COMPACT_RESULT_BLOCKS
 
         #Removing last character if it is a semi-colon
         if v_sql[-1:]==';':
@@ -833,13 +1183,15 @@ def thread_query(self,args):
             log_end_time = datetime.now()
             v_duration = GetDuration(log_start_time,log_end_time)
 
-            if v_cmd_type=='export_csv' or v_cmd_type=='export_xlsx':
+            if v_cmd_type=='export_csv' or v_cmd_type=='export_csv_gz' or v_cmd_type=='export_xlsx':
 
                 #cleaning temp folder
                 clean_temp_folder()
 
                 if v_cmd_type=='export_csv':
                     v_extension = 'csv'
+                elif v_cmd_type=='export_csv_gz':
+                    v_extension = 'csv.gz'
                 else:
                     v_extension = 'xlsx'
 
@@ -849,34 +1201,44 @@ def thread_query(self,args):
 
                 v_database.v_connection.Open()
                 v_file_name = '{0}.{1}'.format(str(time.time()).replace('.','_'),v_extension)
-                v_data1 = v_database.v_connection.QueryBlock(v_sql, 1000, False, True)
-                #if platform.system() == 'Windows':
-                #    f = Spartacus.Utils.DataFileWriter(os.path.join(v_export_dir, v_file_name), v_data1.Columns, 'windows-1252')
-                #else:
-                #    f = Spartacus.Utils.DataFileWriter(os.path.join(v_export_dir, v_file_name), v_data1.Columns)
-                f = Spartacus.Utils.DataFileWriter(os.path.join(v_export_dir, v_file_name), v_data1.Columns,v_session.v_csv_encoding, v_session.v_csv_delimiter)
-                f.Open()
-                if v_database.v_connection.v_start:
-                    f.Write(v_data1)
-                    v_hasmorerecords = False
-                elif len(v_data1.Rows) > 0:
-                    f.Write(v_data1)
-                    v_hasmorerecords = True
+
+                #PostgreSQL writes the CSV itself, rows never become Python objects.
+                #Values keep PostgreSQL's text format: booleans are t/f, arrays
+                #{1,2}, intervals '1 day' and json is JSON, where the block path
+                #wrote Python's True/False, [1, 2], timedelta and dict reprs.
+                #Dates and timestamps are the same text in both paths.
+                if (v_extension != 'xlsx' and v_database.v_can_copy_to_csv and
+                    len(v_session.v_csv_delimiter.encode()) == 1 and
+                    v_database.v_connection.CopyStatement(v_sql) is not None):
+                    v_database.v_connection.CopyToFile(
+                        v_sql,
+                        os.path.join(v_export_dir, v_file_name),
+                        v_session.v_csv_encoding,
+                        v_session.v_csv_delimiter,
+                        lambda p_rows: export_progress(v_client_object, args['v_context_code'], p_rows)
+                    )
+                    v_database.v_connection.Close()
                 else:
-                    v_hasmorerecords = False
-                while v_hasmorerecords:
-                    v_data1 = v_database.v_connection.QueryBlock(v_sql, 1000, False, True)
-                    if v_database.v_connection.v_start:
-                        f.Write(v_data1)
-                        v_hasmorerecords = False
-                    elif len(v_data1.Rows) > 0:
-                        f.Write(v_data1)
-                        v_hasmorerecords = True
-                    else:
-                        v_hasmorerecords = False
+                    v_block_size = OmniDatabase.AdaptiveBlockSize(v_database)
+                    v_data1 = query_block(v_database, v_sql, v_block_size, False)
+                    #if platform.system() == 'Windows':
+                    #    f = Spartacus.Utils.DataFileWriter(os.path.join(v_export_dir, v_file_name), v_data1.Columns, 'windows-1252')
+                    #else:
+                    #    f = Spartacus.Utils.DataFileWriter(os.path.join(v_export_dir, v_file_name), v_data1.Columns)
+                    f = Spartacus.Utils.DataFileWriter(os.path.join(v_export_dir, v_file_name), v_data1.Columns,v_session.v_csv_encoding, v_session.v_csv_delimiter)
+                    f.Open()
+                    export_blocks(
+                        self,
+                        v_client_object,
+                        args['v_context_code'],
+                        f,
+                        v_database,
+                        v_data1,
+                        lambda: query_block(v_database, v_sql, v_block_size, False)
+                    )
 
-                v_database.v_connection.Close()
-                f.Flush()
+                    v_database.v_connection.Close()
+                    f.Flush()
 
                 log_end_time = datetime.now()
                 v_duration = GetDuration(log_start_time,log_end_time)
@@ -901,7 +1263,7 @@ def thread_query(self,args):
                     else:
                         v_database.v_connection.v_start=True
                 if (v_mode==0 or v_mode==1) and not v_all_data:
-                    v_data1 = v_database.v_connection.QueryBlock(v_sql, 50, True, True)
+                    v_data1 = v_database.v_connection.QueryBlock(v_sql, 50, not v_compact, True, v_compact)
 
                     v_notices = v_database.v_connection.GetNotices()
                     v_notices_text = ''
@@ -923,7 +1285,7 @@ def thread_query(self,args):
 
                     v_response['v_data'] = {
                         'v_col_names' : v_data1.Columns,
-                        'v_data' : v_data1.Rows,
+                        'v_data' : result_block(v_database, v_data1, v_compact),
                         'v_last_block': True,
                         'v_duration': v_duration,
                         'v_notices': v_notices_text,
@@ -946,12 +1308,13 @@ def thread_query(self,args):
                 elif v_mode==2 or v_all_data:
 
                     v_hasmorerecords = True
+                    v_block_size = OmniDatabase.AdaptiveBlockSize(v_database, 10000)
                     k = 0
                     while v_hasmorerecords:
 
                         k = k + 1
 
-                        v_data1 = v_database.v_connection.QueryBlock(v_sql, 10000, True, True)
+                        v_data1 = query_block(v_database, v_sql, v_block_size, not v_compact, True)
                         v_notices = v_database.v_connection.GetNotices()
                         v_notices_text = ''
                         v_notices_length = len(v_notices)
@@ -972,7 +1335,7 @@ def thread_query(self,args):
 
                         v_response['v_data'] = {
                             'v_col_names' : v_data1.Columns,
-                            'v_data' : v_data1.Rows,
+                            'v_data' : result_block(v_database, v_data1, v_compact),
                             'v_last_block': False,
                             #'v_query_info' : "Number of records: {0}".format(len(v_data1.Rows)),
                             'v_duration': v_duration,
@@ -1016,7 +1379,7 @@ def thread_query(self,args):
 
                         v_response['v_data'] = {
                             'v_col_names' : v_data1.Columns,
-                            'v_data' : v_data1.Rows,
+                            'v_data' : result_block(v_database, v_data1, v_compact),
                             'v_last_block': True,
                             #'v_query_info' : "Number of records: {0}".format(len(v_data1.Rows)),
                             'v_duration': v_duration,
@@ -1122,6 +1485,39 @@ def thread_query(self,args):
         if not self.cancel:
             queue_response(v_client_object,v_response)
 
+def console_flush(self, p_client_object, p_context_code, p_buffer, p_last_block=False, p_data=None):
+    # Sends the console output buffered so far in chunks, the last chunk of
+    # the last flush carries p_data (duration, connection status...)
+    v_data_return = ''.join(p_buffer)
+    del p_buffer[:]
+
+    #send data in chunks to avoid blocking the websocket server
+    v_chunks = [v_data_return[x:x+10000] for x in range(0, len(v_data_return), 10000)]
+    if len(v_chunks) == 0 and p_last_block:
+        v_chunks = ['']
+    for count in range(0,len(v_chunks)):
+        if self.cancel:
+            break
+        v_response = {
+            'v_code': response.ConsoleResult,
+            'v_context_code': p_context_code,
+            'v_error': False,
+            'v_data': {
+                'v_data' : v_chunks[count],
+                'v_last_block': False
+            }
+        }
+        if p_last_block and count==len(v_chunks)-1:
+            v_response['v_data']['v_last_block'] = True
+            if p_data:
+                v_response['v_data'].update(p_data)
+        queue_response(p_client_object,v_response)
+
+def console_write(p_buffer, p_text):
+    # Line endings are converted as the output is produced, so it is never
+    # copied again as a whole
+    p_buffer.append(p_text.replace("\n","\r\n"))
+
 def thread_console(self,args):
     v_response = {
         'v_code': response.ConsoleResult,
@@ -1151,7 +1547,7 @@ def thread_console(self,args):
         try:
             list_sql = sqlparse.split(v_sql)
 
-            v_data_return = ''
+            v_buffer = []
             run_command_list = True
 
             if v_mode==0:
@@ -1165,13 +1561,14 @@ def thread_console(self,args):
                 v_table = v_database.v_connection.QueryBlock('', 50, True, True)
                 #need to stop again
                 if not v_database.v_connection.v_start or len(v_table.Rows)>=50:
-                    v_data_return += '\n' + v_table.Pretty(v_database.v_connection.v_expanded) + '\n' + v_database.v_connection.GetStatus()
+                    console_write(v_buffer, '\n' + v_table.Pretty(v_database.v_connection.v_expanded) + '\n' + v_database.v_connection.GetStatus())
                     run_command_list = False
                     v_show_fetch_button = True
                 else:
-                    v_data_return += '\n' + v_table.Pretty(v_database.v_connection.v_expanded) + '\n' + v_database.v_connection.GetStatus()
+                    console_write(v_buffer, '\n' + v_table.Pretty(v_database.v_connection.v_expanded) + '\n' + v_database.v_connection.GetStatus())
                     run_command_list = True
                     list_sql = v_tab_object['remaining_commands']
+                    console_flush(self, v_client_object, args['v_context_code'], v_buffer)
 
             if v_mode == 3:
                 run_command_list = True
@@ -1181,23 +1578,22 @@ def thread_console(self,args):
                 counter = 0
                 v_show_fetch_button = False
                 for sql in list_sql:
+                    if self.cancel:
+                        break
                     counter = counter + 1
                     try:
                         formated_sql = sql.strip()
-                        v_data_return += '\n' + v_database.v_active_service + '=# ' + formated_sql + '\n'
+                        console_write(v_buffer, '\n' + v_database.v_active_service + '=# ' + formated_sql + '\n')
 
                         v_database.v_connection.ClearNotices()
                         v_database.v_connection.v_start=True
                         v_data1 = v_database.v_connection.Special(sql);
 
                         v_notices = v_database.v_connection.GetNotices()
-                        v_notices_text = ''
                         if len(v_notices) > 0:
-                            for v_notice in v_notices:
-                                v_notices_text += v_notice
-                            v_data_return += v_notices_text
+                            console_write(v_buffer, ''.join(v_notices))
 
-                        v_data_return += v_data1
+                        console_write(v_buffer, v_data1)
 
                         if v_database.v_use_server_cursor:
                             if v_database.v_connection.v_last_fetched_size == 50:
@@ -1207,72 +1603,24 @@ def thread_console(self,args):
                     except Exception as exc:
                         try:
                             v_notices = v_database.v_connection.GetNotices()
-                            v_notices_text = ''
                             if len(v_notices) > 0:
-                                for v_notice in v_notices:
-                                    v_notices_text += v_notice
-                                v_data_return += v_notices_text
+                                console_write(v_buffer, ''.join(v_notices))
                         except Exception as exc:
                             None
-                        v_data_return += str(exc)
+                        console_write(v_buffer, str(exc))
                     v_tab_object['remaining_commands'] = []
+                    #output of each statement is sent as soon as it is ready
+                    if counter < len(list_sql):
+                        console_flush(self, v_client_object, args['v_context_code'], v_buffer)
 
             log_end_time = datetime.now()
             v_duration = GetDuration(log_start_time,log_end_time)
 
-            v_data_return = v_data_return.replace("\n","\r\n")
-
-            v_response = {
-                'v_code': response.ConsoleResult,
-                'v_context_code': args['v_context_code'],
-                'v_error': False,
-                'v_data': 1
-            }
-            v_response['v_data'] = {
-                'v_data' : v_data_return,
-                'v_last_block': True,
-                'v_duration': v_duration
-            }
-
-            #send data in chunks to avoid blocking the websocket server
-            chunks = [v_data_return[x:x+10000] for x in range(0, len(v_data_return), 10000)]
-            if len(chunks)>0:
-                for count in range(0,len(chunks)):
-                    if self.cancel:
-                        break
-                    if not count==len(chunks)-1:
-                        v_response = {
-                            'v_code': response.ConsoleResult,
-                            'v_context_code': args['v_context_code'],
-                            'v_error': False,
-                            'v_data': 1
-                        }
-                        v_response['v_data'] = {
-                            'v_data' : chunks[count],
-                            'v_last_block': False,
-                            'v_duration': v_duration,
-                            'v_show_fetch_button': v_show_fetch_button,
-                            'v_con_status': '',
-                        }
-                    else:
-                        v_response = {
-                            'v_code': response.ConsoleResult,
-                            'v_context_code': args['v_context_code'],
-                            'v_error': False,
-                            'v_data': 1
-                        }
-                        v_response['v_data'] = {
-                            'v_data' : chunks[count],
-                            'v_last_block': True,
-                            'v_duration': v_duration,
-                            'v_show_fetch_button': v_show_fetch_button,
-                            'v_con_status': v_database.v_connection.GetConStatus(),
-                        }
-                    if not self.cancel:
-                        queue_response(v_client_object,v_response)
-            else:
-                if not self.cancel:
-                    queue_response(v_client_object,v_response)
+            console_flush(self, v_client_object, args['v_context_code'], v_buffer, True, {
+                'v_duration': v_duration,
+                'v_show_fetch_button': v_show_fetch_button,
+                'v_con_status': v_database.v_connection.GetConStatus(),
+            })
 
             try:
                 v_database.v_connection.ClearNotices()
@@ -1288,6 +1636,7 @@ def thread_console(self,args):
             log_status = 'error'
             v_response['v_data'] = {
                 'v_data': str(exc),
+                'v_last_block': True,
                 'v_duration': v_duration
             }
 
@@ -1310,11 +1659,36 @@ def thread_console(self,args):
         logger.error('''*** Exception ***\n{0}'''.format(traceback.format_exc()))
         v_response['v_data'] = {
             'v_data': str(exc),
+            'v_last_block': True,
             'v_duration': ''
         }
         if not self.cancel:
             queue_response(v_client_object,v_response)
 
+def edit_data_page(p_table, p_pk_list):
+    # Converts a block of table records to grid rows one column at a time and
+    # reads the primary key values from the key columns once per page
+    v_data = p_table.ColumnData()
+    v_grid_columns = [['[null]' if v is None else str(v) for v in c] for c in v_data]
+    v_rows = [list(r) for r in zip([''] * len(p_table.Rows), *v_grid_columns)]
+
+    v_pk_columns = []
+    for v_pk in p_pk_list:
+        v_pk_columns.append((v_pk, v_data[p_table.Columns.index(v_pk['v_column'].replace('"',''))]))
+
+    v_row_pk = []
+    for i in range(0, len(v_rows)):
+        v_row_pk.append([
+            {
+                'v_column': v_pk['v_column'],
+                'v_type': v_pk['v_type'],
+                'v_value': v_values[i]
+            }
+            for (v_pk, v_values) in v_pk_columns
+        ])
+
+    return v_rows, v_row_pk
+
 def thread_query_edit_data(self,args):
     v_response = {
         'v_code': response.QueryEditDataResult,
@@ -1323,7 +1697,10 @@ def thread_query_edit_data(self,args):
         'v_data': {
             'v_data' : [],
             'v_row_pk' : [],
-            'v_query_info' : ''
+            'v_query_info' : '',
+            'v_has_more': False,
+            'v_expired': False,
+            'v_mode': 0
         }
     }
 
@@ -1341,7 +1718,11 @@ def thread_query_edit_data(self,args):
         v_pk_list        = args['v_pk_list']
         v_columns        = args['v_columns']
         v_tab_id         = args['v_tab_id']
+        v_tab_object     = args['v_tab_object']
         v_client_object  = args['v_client_object']
+        v_mode           = args.get('v_mode', 0)
+
+        v_response['v_data']['v_mode'] = v_mode
 
         try:
             if v_database.v_has_schema:
@@ -1357,33 +1738,53 @@ def thread_query_edit_data(self,args):
                 v_first = False
                 v_column_list = v_column_list + v_column['v_column']
 
-            v_data1 = v_database.QueryTableRecords(v_column_list, v_table_name, v_filter, v_count)
+            # v_count is the page size ("N rows per page" in the tab), the
+            # records are read through a cursor kept open on the tab connection
+            # and mode 1 fetches the next page. The cursor is WITHOUT HOLD, so
+            # the server only reads the pages fetched instead of materializing
+            # the table. Its transaction is closed as soon as a page comes back
+            # short, by a save or after EDIT_DATA_IDLE_TIMEOUT seconds idle.
+            if str(v_count) == '-1':
+                v_block_size = v_database.v_block_size
+            else:
+                v_block_size = int(v_count)
 
-            v_response['v_data']['v_query_info'] = str(len(v_data1.Rows))
+            v_tab_object['edit_cursor'] = False
 
-            for v_row in v_data1.Rows:
-                v_row_data = []
+            v_data1 = None
+            if v_mode == 0:
+                v_database.v_connection.v_autocommit = False
+                if not v_database.v_connection.v_con or v_database.v_connection.GetConStatus() == 0:
+                    v_database.v_connection.Open()
+                else:
+                    v_database.v_connection.v_start = True
+                v_data1 = v_database.QueryTableRecordsBlock(v_column_list, v_table_name, v_filter, v_block_size)
+            elif v_database.v_connection.v_con and not v_database.v_connection.v_start:
+                v_data1 = v_database.QueryTableRecordsBlock(v_column_list, v_table_name, v_filter, v_block_size)
+            else:
+                v_response['v_data']['v_expired'] = True
 
-                v_row_pk = []
-                for j in range(0, len(v_pk_list)):
-                    v_pk_col = {}
-                    v_pk_col['v_column'] = v_pk_list[j]['v_column']
-                    v_pk_col['v_type'] = v_pk_list[j]['v_type']
-                    v_pk_col['v_value'] = v_row[v_pk_list[j]['v_column'].replace('"','')]
-                    v_row_pk.append(v_pk_col)
-                v_response['v_data']['v_row_pk'].append(v_row_pk)
+            if v_data1 is not None and len(v_data1.Columns) > 0:
+                v_rows, v_row_pk = edit_data_page(v_data1, v_pk_list)
+                v_response['v_data']['v_data'] = v_rows
+                v_response['v_data']['v_row_pk'] = v_row_pk
+                v_response['v_data']['v_has_more'] = len(v_rows) == v_block_size and not v_database.v_connection.v_start
 
-                v_row_data.append('')
-                for v_col in v_data1.Columns:
-                    if v_row[v_col] == None:
-                        v_row_data.append('[null]')
-                    else:
-                        v_row_data.append(str(v_row[v_col]))
-                v_response['v_data']['v_data'].append(v_row_data)
+            v_response['v_data']['v_query_info'] = str(len(v_response['v_data']['v_data']))
+
+            if not v_response['v_data']['v_has_more']:
+                v_database.v_connection.Close()
+            else:
+                v_tab_object['edit_cursor'] = True
+                schedule_expiry(time.time() + settings.EDIT_DATA_IDLE_TIMEOUT, v_client_object['id'], v_tab_id, 'edit')
 
         except Exception as exc:
             v_response['v_data'] = str(exc)
             v_response['v_error'] = True
+            try:
+                v_database.v_connection.Close()
+            except Exception:
+                None
 
         if not self.cancel:
             queue_response(v_client_object,v_response)
@@ -1394,6 +1795,72 @@ def thread_query_edit_data(self,args):
         if not self.cancel:
             queue_response(v_client_object,v_response)
 
+def edit_data_quoted(p_database, p_type):
+    # Getting details about the data type
+    try:
+        return p_database.v_data_types[p_type]['quoted']
+    # Type not found
+    except:
+        return True
+
+def edit_data_value(p_value, p_quoted):
+    v_value = ''
+    if p_value != None:
+        v_value = p_value
+
+    v_value = v_value.replace("'","''")
+
+    if v_value == '[null]':
+        return 'null'
+    elif p_quoted:
+        return "'{0}'".format(v_value)
+    else:
+        return v_value
+
+def edit_data_pk_value(p_value, p_quoted):
+    if p_quoted:
+        return "'{0}'".format(str(p_value).replace("'","''"))
+    else:
+        return str(p_value)
+
+def edit_data_parameter(p_value):
+    # Grid values are strings, '[null]' stands for null
+    if p_value == None:
+        return ''
+    elif p_value == '[null]':
+        return None
+    else:
+        return p_value
+
+def edit_data_pk_parameter(p_value, p_quoted):
+    if p_quoted:
+        return str(p_value)
+    else:
+        return p_value
+
+def edit_data_placeholders(p_database, p_start, p_count):
+    return [p_database.v_connection.Placeholder(k) for k in range(p_start, p_start + p_count)]
+
+def execute_edit_data_batch(p_database, p_command, p_parameters, p_rows):
+    # Runs one statement for all p_rows inside a savepoint. If it fails, the
+    # savepoint is rolled back and each row's own statement is retried alone,
+    # so every row still gets its own error message. p_rows holds
+    # (row info, parameters, statement) tuples.
+    try:
+        p_database.v_connection.Execute('savepoint omnidb_edit_data')
+        p_database.v_connection.ExecuteMany(p_command, [p_parameters])
+        for v_row in p_rows:
+            v_row[0]['error'] = False
+            v_row[0]['v_message'] = 'Success.'
+    except Exception as exc:
+        p_database.v_connection.Execute('rollback to savepoint omnidb_edit_data')
+        if len(p_rows) == 1:
+            p_rows[0][0]['error'] = True
+            p_rows[0][0]['v_message'] = str(exc)
+        else:
+            for v_row in p_rows:
+                execute_edit_data_batch(p_database, v_row[2], v_row[1], [v_row])
+
 def thread_save_edit_data(self,args):
     v_response = {
         'v_code': response.SaveEditDataResult,
@@ -1410,7 +1877,7 @@ def thread_save_edit_data(self,args):
 
         if v_database.v_has_schema:
             v_schema         = args['v_schema']
-        
+
         v_data_rows      = args['v_data_rows']
         v_rows_info      = args['v_rows_info']
         v_pk_info        = args['v_pk_info']
@@ -1422,194 +1889,327 @@ def thread_save_edit_data(self,args):
         else:
             v_table_name = v_table
 
-        i = 0
-        for v_row_info in v_rows_info:
-
-            if (self.cancel):
-                return
-
-            v_command = ''
+        # Type details are looked up once per column
+        v_quoted = [edit_data_quoted(v_database, v_col['v_type']) for v_col in v_columns]
+        v_column_list = ', '.join([v_col['v_column'] for v_col in v_columns])
 
-            # Deleting row
-            if v_row_info['mode'] == -1:
-
-                v_command = 'delete from ' + v_table_name + ' where '
-                v_first = True
-                v_pk_index = 0
+        def delete_statement(p_pk_columns, p_count):
+            if len(p_pk_columns) == 1:
+                v_filter = '{0} in ({1})'.format(p_pk_columns[0], ', '.join(edit_data_placeholders(v_database, 0, p_count)))
+            else:
+                v_filters = []
+                for n in range(0, p_count):
+                    v_placeholders = edit_data_placeholders(v_database, n * len(p_pk_columns), len(p_pk_columns))
+                    v_filters.append('({0})'.format(' and '.join(['{0} = {1}'.format(c, v) for c, v in zip(p_pk_columns, v_placeholders)])))
+                v_filter = ' or '.join(v_filters)
+            return 'delete from {0} where {1}'.format(v_table_name, v_filter)
+
+        def update_statement(p_changed, p_pk_columns):
+            v_placeholders = edit_data_placeholders(v_database, 0, len(p_changed) + len(p_pk_columns))
+            return 'update {0} set {1} where {2}'.format(
+                v_table_name,
+                ', '.join(['{0} = {1}'.format(v_columns[v_col_index]['v_column'], v) for v_col_index, v in zip(p_changed, v_placeholders)]),
+                ' and '.join(['{0} = {1}'.format(c, v) for c, v in zip(p_pk_columns, v_placeholders[len(p_changed):])])
+            )
 
-                for v_pk in v_row_info['pk']:
-                    if not v_first:
-                        v_command = v_command + ' and '
-                    v_first = False
+        def update_values_statement(p_changed, p_pk_columns, p_count):
+            # The empty select gives the values the types of the table columns
+            v_names = ['c{0}'.format(k) for k in range(0, len(p_changed))] + ['k{0}'.format(k) for k in range(0, len(p_pk_columns))]
+            v_source_columns = [v_columns[v_col_index]['v_column'] for v_col_index in p_changed] + list(p_pk_columns)
+            return 'update {0} t set {1} from (select {2} from {0} where false union all values {3}) v ({4}) where {5}'.format(
+                v_table_name,
+                ', '.join(['{0} = v.c{1}'.format(v_columns[v_col_index]['v_column'], k) for k, v_col_index in enumerate(p_changed)]),
+                ', '.join(v_source_columns),
+                ', '.join([
+                    '({0})'.format(', '.join(edit_data_placeholders(v_database, n * len(v_names), len(v_names))))
+                    for n in range(0, p_count)
+                ]),
+                ', '.join(v_names),
+                ' and '.join(['t.{0} = v.k{1}'.format(c, k) for k, c in enumerate(p_pk_columns)])
+            )
 
-                    # Getting details about the data type
-                    try:
-                        v_type_details = v_database.v_data_types[v_pk['v_type']]
-                    # Type not found
-                    except:
-                        v_type_details = {
-                            'quoted': True
-                        }
+        def insert_statement(p_count):
+            v_values = []
+            for n in range(0, p_count):
+                v_values.append('( {0} )'.format(', '.join(edit_data_placeholders(v_database, n * len(v_columns), len(v_columns)))))
+            return 'insert into {0} ( {1} ) values {2}'.format(v_table_name, v_column_list, ', '.join(v_values))
+
+        # Values are sent as driver parameters, never inlined in the SQL. Each
+        # row gets its own statement, used alone when a batch fails, and a
+        # 'command' with the values inlined that is only shown in the grid's
+        # error log. Only adjacent rows with the same operation, key columns
+        # and changed columns are grouped, so rows still run in grid order.
+        v_runs = []
+
+        def add_row(p_key, p_row):
+            if len(v_runs) > 0 and v_runs[-1][0] == p_key:
+                v_runs[-1][1].append(p_row)
+            else:
+                v_runs.append((p_key, [p_row]))
 
-                    if v_type_details['quoted']:
-                        v_command = "{0} {1} = '{2}'".format(v_command,v_pk['v_column'],v_pk['v_value'])
-                    else:
-                        v_command = "{0} {1} = {2}".format(v_command,v_pk['v_column'],v_pk['v_value'])
+        i = 0
+        for v_row_info in v_rows_info:
 
-                v_row_info_return = {}
-                v_row_info_return['mode'] = -1
-                v_row_info_return['index'] = v_row_info['index']
-                v_row_info_return['command'] = v_command
+            v_row_info_return = {}
+            v_row_info_return['mode'] = v_row_info['mode']
+            v_row_info_return['index'] = v_row_info['index']
+            v_response['v_data'].append(v_row_info_return)
 
-                try:
-                    v_database.v_connection.Execute(v_command)
-                    v_row_info_return['error'] = False
-                    v_row_info_return['v_message'] = 'Success.'
-                except Exception as exc:
-                    v_row_info_return['error'] = True
-                    v_row_info_return['v_message'] = str(exc)
+            if v_row_info['mode'] == -1 or v_row_info['mode'] == 1:
+                v_pk_columns = tuple([v_pk['v_column'] for v_pk in v_row_info['pk']])
+                v_pk_quoted = [edit_data_quoted(v_database, v_pk['v_type']) for v_pk in v_row_info['pk']]
+                v_pk_values = [edit_data_pk_parameter(v_pk['v_value'], q) for v_pk, q in zip(v_row_info['pk'], v_pk_quoted)]
+                v_where = ' and '.join([
+                    '{0} = {1}'.format(c, edit_data_pk_value(v_pk['v_value'], q))
+                    for c, v_pk, q in zip(v_pk_columns, v_row_info['pk'], v_pk_quoted)
+                ])
 
-                v_response['v_data'].append(v_row_info_return)
+            # Deleting row
+            if v_row_info['mode'] == -1:
+                v_row_info_return['command'] = 'delete from {0} where {1}'.format(v_table_name, v_where)
+                add_row(('delete', v_pk_columns), (
+                    v_row_info_return,
+                    v_pk_values,
+                    delete_statement(v_pk_columns, 1)
+                ))
 
             # Inserting new row
             elif v_row_info['mode'] == 2:
-
-                v_command = 'insert into ' + v_table_name + ' ( '
-                v_first = True
-
-                for v_col in v_columns:
-                    if not v_first:
-                        v_command = v_command + ', '
-                    v_first = False
-                    v_command = v_command + v_col['v_column']
-
-                v_command = v_command + ' ) values ( '
-                v_first = True
-
-                for j in range(1, len(v_data_rows[i])):
-                    if not v_first:
-                        v_command = v_command + ', '
-                    v_first = False
-
-                    v_value = ''
-                    if v_data_rows[i][j] != None:
-                        v_value = v_data_rows[i][j]
-
-                    v_value = v_value.replace("'","''")
-
-                    # Getting details about the data type
-                    try:
-                        v_type_details = v_database.v_data_types[v_columns[j-1]['v_type']]
-                    # Type not found
-                    except:
-                        v_type_details = {
-                            'quoted': True
-                        }
-
-                    if v_value == '[null]':
-                        v_command = v_command + 'null'
-                    elif v_type_details['quoted']:
-                        v_command = "{0} '{1}'".format(v_command,v_value)
-                    else:
-                        v_command = "{0} {1}".format(v_command,v_value)
-
-                v_command = v_command + ' )'
-
-                v_row_info_return = {}
-                v_row_info_return['mode'] = 2
-                v_row_info_return['index'] = v_row_info['index']
-                v_row_info_return['command'] = v_command
-
-                try:
-                    v_database.v_connection.Execute(v_command)
-                    v_row_info_return['error'] = False
-                    v_row_info_return['v_message'] = 'Success.'
-                except Exception as exc:
-                    v_row_info_return['error'] = True
-                    v_row_info_return['v_message'] = str(exc)
-
-                v_response['v_data'].append(v_row_info_return)
+                v_row_info_return['command'] = 'insert into {0} ( {1} ) values ( {2} )'.format(
+                    v_table_name,
+                    v_column_list,
+                    ', '.join([edit_data_value(v_data_rows[i][j], v_quoted[j-1]) for j in range(1, len(v_data_rows[i]))])
+                )
+                add_row(('insert',), (
+                    v_row_info_return,
+                    [edit_data_parameter(v_data_rows[i][j]) for j in range(1, len(v_data_rows[i]))],
+                    insert_statement(1)
+                ))
 
             # Updating existing row
             elif v_row_info['mode'] == 1:
+                v_changed = tuple(v_row_info['changed_cols'])
+                v_row_info_return['command'] = 'update {0} set {1} where {2}'.format(
+                    v_table_name,
+                    ', '.join([
+                        '{0} = {1}'.format(v_columns[v_col_index]['v_column'], edit_data_value(v_data_rows[i][v_col_index+1], v_quoted[v_col_index]))
+                        for v_col_index in v_changed
+                    ]),
+                    v_where
+                )
+                add_row(('update', v_changed, v_pk_columns), (
+                    v_row_info_return,
+                    [edit_data_parameter(v_data_rows[i][v_col_index+1]) for v_col_index in v_changed] + v_pk_values,
+                    update_statement(v_changed, v_pk_columns)
+                ))
 
-                v_command = 'update ' + v_table_name + ' set '
-                v_first = True
-
-                for v_col_index in v_rows_info[i]['changed_cols']:
-                    if not v_first:
-                        v_command = v_command + ', '
-                    v_first = False
+            i = i + 1
 
-                    v_value = ''
-                    if v_data_rows[i][v_col_index+1] != None:
-                        v_value = v_data_rows[i][v_col_index+1]
+        # Batches are (statement, parameters of all its rows in order, rows)
+        v_batches = []
+
+        def add_batch(p_command, p_rows):
+            v_parameters = []
+            for r in p_rows:
+                v_parameters.extend(r[1])
+            v_batches.append((p_command, v_parameters, p_rows))
+
+        for (v_key, v_rows) in v_runs:
+            if (v_key[0] == 'delete' or
+                (v_key[0] == 'update' and v_database.v_can_update_from_values) or
+                (v_key[0] == 'insert' and v_database.v_can_insert_multiple_rows)):
+                for k in range(0, len(v_rows), settings.EDIT_DATA_BATCH_SIZE):
+                    v_block = v_rows[k:k+settings.EDIT_DATA_BATCH_SIZE]
+                    if v_key[0] == 'delete':
+                        add_batch(delete_statement(v_key[1], len(v_block)), v_block)
+                    elif v_key[0] == 'update':
+                        add_batch(update_values_statement(v_key[1], v_key[2], len(v_block)), v_block)
+                    else:
+                        add_batch(insert_statement(len(v_block)), v_block)
+            else:
+                for r in v_rows:
+                    add_batch(r[2], [r])
+
+        # An open edit data cursor is closed first.
+        v_database.v_connection.Close()
+
+        if type(v_database.v_connection).ExecuteMany is Database.Generic.ExecuteMany:
+            # Drivers without batch execution run each row's command, with the
+            # values inlined, as its own autocommitted statement.
+            for (v_key, v_rows) in v_runs:
+                for r in v_rows:
+                    if (self.cancel):
+                        break
+                    try:
+                        v_database.v_connection.Execute(r[0]['command'])
+                        r[0]['error'] = False
+                        r[0]['v_message'] = 'Success.'
+                    except Exception as exc:
+                        r[0]['error'] = True
+                        r[0]['v_message'] = str(exc)
+        else:
+            # All batches run in one transaction, the connection is reopened
+            # without autocommit.
+            v_database.v_connection.Open(False)
 
-                    v_value = v_value.replace("'","''")
+            try:
+                for (v_command, v_parameters, v_rows) in v_batches:
+                    if (self.cancel):
+                        break
+                    execute_edit_data_batch(v_database, v_command, v_parameters, v_rows)
+            finally:
+                v_database.v_connection.Close(not self.cancel)
 
-                    v_command = v_command + v_columns[v_col_index]['v_column'] + ' = '
+        if not self.cancel:
+            queue_response(v_client_object,v_response)
+    except Exception as exc:
+        logger.error('''*** Exception ***\n{0}'''.format(traceback.format_exc()))
+        v_response['v_error'] = True
+        v_response['v_data'] = traceback.format_exc().replace('\n','<br>')
+        if not self.cancel:
+            queue_response(v_client_object,v_response)
 
-                    # Getting details about the data type
-                    try:
-                        v_type_details = v_database.v_data_types[v_columns[v_col_index]['v_type']]
-                    # Type not found
-                    except:
-                        v_type_details = {
-                            'quoted': True
-                        }
+def thread_advanced_object_search(self,args):
+    v_response = {
+        'v_code': response.AdvancedObjectSearchResult,
+        'v_context_code': args['v_context_code'],
+        'v_error': False,
+        'v_data': {
+            'v_category': None,
+            'v_result': None,
+            'v_last_block': True
+        }
+    }
 
-                    if v_value == '[null]':
-                        v_command = v_command + 'null'
-                    elif v_type_details['quoted']:
-                        v_command = "{0} '{1}'".format(v_command,v_value)
-                    else:
-                        v_command = "{0} {1}".format(v_command,v_value)
+    v_client_object = args['v_client_object']
+    v_thread_pool   = args['v_thread_pool']
+    v_lock          = v_thread_pool.tag['lock']
+    v_active        = v_thread_pool.tag['activeConnections']
 
-                v_command = v_command + ' where '
-                v_first = True
-                v_pk_index = 0
+    try:
+        v_database = args['v_database']
 
-                for v_pk in v_row_info['pk']:
-                    if not v_first:
-                        v_command = v_command + ' and '
-                    v_first = False
+        #Data category lists columns on the tab connection while building sql
+        with v_lock:
+            v_active.append(v_database.v_connection)
+        try:
+            v_sql_dict = v_database.AdvancedObjectSearch(
+                args['v_text'],
+                args['v_case_sensitive'],
+                args['v_regex'],
+                args['v_category_list'],
+                args['v_schema_list'],
+                args['v_data_category_filter']
+            )
+        finally:
+            with v_lock:
+                v_active.remove(v_database.v_connection)
+
+        #One job per query, Data has one query per table
+        v_jobs = []
+        v_pending = {}
+        v_results = {}
+        for v_category, v_sql in v_sql_dict.items():
+            if isinstance(v_sql, dict):
+                v_results[v_category] = {}
+                for v_key, v_table_sql in v_sql.items():
+                    v_jobs.append((v_category, v_key, v_table_sql))
+            else:
+                v_results[v_category] = None
+                v_jobs.append((v_category, None, v_sql))
+            v_pending[v_category] = len(v_sql) if isinstance(v_sql, dict) else 1
 
-                    # Getting details about the data type
+        def worker(p_pool, p_jobs):
+            v_worker_database = None
+            try:
+                while not p_pool.cancel:
                     try:
-                        v_type_details = v_database.v_data_types[v_pk['v_type']]
-                    # Type not found
-                    except:
-                        v_type_details = {
-                            'quoted': True
-                        }
-
-                    if v_type_details['quoted']:
-                        v_command = "{0} {1} = '{2}'".format(v_command,v_pk['v_column'],v_pk['v_value'])
-                    else:
-                        v_command = "{0} {1} = {2}".format(v_command,v_pk['v_column'],v_pk['v_value'])
-
-                v_row_info_return = {}
-                v_row_info_return['mode'] = 1
-                v_row_info_return['index'] = v_row_info['index']
-                v_row_info_return['command'] = v_command
+                        (v_category, v_key, v_sql) = p_jobs.popleft()
+                    except IndexError:
+                        break
 
-                try:
-                    v_database.v_connection.Execute(v_command)
-                    v_row_info_return['error'] = False
-                    v_row_info_return['v_message'] = 'Success.'
-                except Exception as exc:
-                    v_row_info_return['error'] = True
-                    v_row_info_return['v_message'] = str(exc)
+                    v_result = {}
+                    try:
+                        #Each worker runs its queries on its own connection
+                        if v_worker_database is None:
+                            v_worker_database = OmniDatabase.Generic.InstantiateDatabase(
+                                v_database.v_db_type,
+                                v_database.v_connection.v_host,
+                                str(v_database.v_connection.v_port),
+                                v_database.v_active_service,
+                                v_database.v_active_user,
+                                v_database.v_connection.v_password,
+                                v_database.v_conn_id,
+                                v_database.v_alias,
+                                p_conn_string = v_database.v_conn_string,
+                                p_parse_conn_string = False
+                            )
+                            v_worker_database.v_connection.Open()
+                            with v_lock:
+                                v_active.append(v_worker_database.v_connection)
+
+                        v_table = v_worker_database.v_connection.Query(v_sql, True)
+                        v_result['v_columns'] = v_table.Columns
+                        v_result['v_rows'] = v_table.Rows
+                        v_result['v_error'] = False
+                    except Exception as exc:
+                        if p_pool.cancel:
+                            break
+                        v_result['v_error'] = True
+                        v_result['v_message'] = str(exc)
 
-                v_response['v_data'].append(v_row_info_return)
+                    with v_lock:
+                        if v_key is None:
+                            v_results[v_category] = v_result
+                        else:
+                            v_results[v_category][v_key] = v_result
+                        v_pending[v_category] -= 1
+                        v_finished = v_pending[v_category] == 0
+
+                    #Category is complete, send it without waiting for the others
+                    if v_finished and not p_pool.cancel:
+                        queue_response(v_client_object, {
+                            'v_code': response.AdvancedObjectSearchResult,
+                            'v_context_code': args['v_context_code'],
+                            'v_error': False,
+                            'v_data': {
+                                'v_category': v_category,
+                                'v_result': v_results[v_category],
+                                'v_last_block': False
+                            }
+                        })
+            finally:
+                if v_worker_database is not None:
+                    with v_lock:
+                        if v_worker_database.v_connection in v_active:
+                            v_active.remove(v_worker_database.v_connection)
+                    try:
+                        v_worker_database.v_connection.Close()
+                    except Exception:
+                        None
+
+        #Categories without queries, such as Data with no matching columns
+        for v_category in list(v_pending.keys()):
+            if v_pending[v_category] == 0:
+                queue_response(v_client_object, {
+                    'v_code': response.AdvancedObjectSearchResult,
+                    'v_context_code': args['v_context_code'],
+                    'v_error': False,
+                    'v_data': {
+                        'v_category': v_category,
+                        'v_result': v_results[v_category],
+                        'v_last_block': False
+                    }
+                })
 
-            i = i + 1
+        if not v_thread_pool.cancel:
+            v_thread_pool.run(worker, v_jobs)
 
-        if not self.cancel:
+        if not v_thread_pool.cancel:
             queue_response(v_client_object,v_response)
     except Exception as exc:
         logger.error('''*** Exception ***\n{0}'''.format(traceback.format_exc()))
         v_response['v_error'] = True
         v_response['v_data'] = traceback.format_exc().replace('\n','<br>')
-        if not self.cancel:
+        if not v_thread_pool.cancel:
             queue_response(v_client_object,v_response)
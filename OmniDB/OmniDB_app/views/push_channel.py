@@ -0,0 +1,149 @@
+import asyncio
+import threading
+from http.cookies import SimpleCookie
+from urllib.parse import urlparse
+
+from django.contrib.sessions.backends.db import SessionStore
+from OmniDB import settings
+
+from OmniDB_app.views.memory_objects import *
+from OmniDB_app.views.polling import dequeue_responses, json_stream
+
+import logging
+logger = logging.getLogger('OmniDB_app.PushChannel')
+
+# Server-sent events channel. Each browser keeps one EventSource connection
+# here instead of a long polling request, so waiting clients are coroutines on
+# a single event loop instead of parked webserver threads. Responses are still
+# produced by queue_response and drained by dequeue_responses, exactly like
+# long polling, and are sent as 'data:' events with the same
+# {'returning_rows': [...]} payload. A client may have one connection per
+# browser tab, so every connection registers its own notifier.
+
+v_loop = None
+v_port = None
+
+KEEP_ALIVE_SECS = 15
+
+def start(p_address, p_port=0, p_ssl_context=None):
+    global v_loop
+    global v_port
+
+    v_loop = asyncio.new_event_loop()
+    v_server = v_loop.run_until_complete(
+        asyncio.start_server(handle_client, p_address, p_port, ssl=p_ssl_context)
+    )
+    v_port = v_server.sockets[0].getsockname()[1]
+
+    t = threading.Thread(target=v_loop.run_forever)
+    t.setDaemon(True)
+    t.start()
+
+    return v_port
+
+def get_session_key(p_headers):
+    v_cookie = SimpleCookie()
+    try:
+        v_cookie.load(p_headers.get('cookie', ''))
+    except Exception:
+        return None
+    if settings.SESSION_COOKIE_NAME in v_cookie:
+        return v_cookie[settings.SESSION_COOKIE_NAME].value
+    return None
+
+def is_session_valid(p_session_key):
+    try:
+        return SessionStore(session_key=p_session_key).get('omnidb_session') is not None
+    except Exception:
+        return False
+
+def get_allowed_origin(p_headers):
+    # Browsers send cross-port EventSource requests with an Origin header. Only
+    # the host serving OmniDB itself is allowed to read the stream.
+    v_origin = p_headers.get('origin')
+    if v_origin is None:
+        return None
+    v_host = p_headers.get('host', '').rsplit(':', 1)[0].strip('[]')
+    if urlparse(v_origin).hostname == v_host:
+        return v_origin
+    return None
+
+async def read_request(p_reader):
+    v_request_line = (await p_reader.readline()).decode('latin-1').strip()
+    v_headers = {}
+    while True:
+        v_line = (await p_reader.readline()).decode('latin-1')
+        if v_line in ('\r\n', '\n', ''):
+            break
+        v_name, v_sep, v_value = v_line.partition(':')
+        v_headers[v_name.strip().lower()] = v_value.strip()
+    return v_request_line.split(' '), v_headers
+
+async def handle_client(p_reader, p_writer):
+    v_event_loop = asyncio.get_event_loop()
+    v_client_object = None
+    v_notify = None
+    try:
+        v_request, v_headers = await read_request(p_reader)
+        v_origin = get_allowed_origin(v_headers)
+        v_session_key = get_session_key(v_headers)
+
+        if (len(v_request) < 2 or v_request[0] != 'GET' or
+            urlparse(v_request[1]).path.rstrip('/') != settings.PATH + '/push' or
+            v_session_key is None or
+            not await v_event_loop.run_in_executor(None, is_session_valid, v_session_key)):
+            p_writer.write(b'HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+            await p_writer.drain()
+            return
+
+        v_response = [
+            'HTTP/1.1 200 OK',
+            'Content-Type: text/event-stream',
+            'Cache-Control: no-cache',
+            'Connection: keep-alive'
+        ]
+        if v_origin:
+            v_response.append('Access-Control-Allow-Origin: {0}'.format(v_origin))
+            v_response.append('Access-Control-Allow-Credentials: true')
+        p_writer.write(('\r\n'.join(v_response) + '\r\n\r\n').encode())
+        await p_writer.drain()
+
+        v_event = asyncio.Event()
+        v_notify = lambda: v_event_loop.call_soon_threadsafe(v_event.set)
+        v_client_object = get_client_object(v_session_key)
+        with v_client_object['returning_data_lock']:
+            v_client_object['push_notify'].add(v_notify)
+
+        # Responses queued before the connection was opened are sent right away
+        v_event.set()
+
+        while True:
+            try:
+                await asyncio.wait_for(v_event.wait(), KEEP_ALIVE_SECS)
+            except asyncio.TimeoutError:
+                p_writer.write(b': keep-alive\n\n')
+                await p_writer.drain()
+                continue
+            v_event.clear()
+
+            v_returning_data = dequeue_responses(v_client_object)
+            if len(v_returning_data) > 0:
+                # Encoding large results is CPU bound, keep it off the event loop
+                v_payload = await v_event_loop.run_in_executor(
+                    None,
+                    lambda: ''.join(json_stream({'returning_rows': v_returning_data}))
+                )
+                p_writer.write(('data: ' + v_payload + '\n\n').encode())
+                await p_writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        None
+    except Exception as exc:
+        logger.error('Push channel error: {0}'.format(str(exc)))
+    finally:
+        if v_client_object is not None:
+            with v_client_object['returning_data_lock']:
+                v_client_object['push_notify'].discard(v_notify)
+        try:
+            p_writer.close()
+        except Exception:
+            None
@@ -28,6 +28,7 @@ from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 
 from OmniDB_app.views.memory_objects import *
+from OmniDB_app.views import push_channel
 
 @login_required
 def index(request):
@@ -106,7 +107,8 @@ def index(request):
         'tab_token': ''.join(random.choice(string.ascii_lowercase + string.digits) for i in range(20)),
         'show_terminal_option': v_show_terminal_option,
         'url_folder': settings.PATH,
-        'csrf_cookie_name': settings.CSRF_COOKIE_NAME
+        'csrf_cookie_name': settings.CSRF_COOKIE_NAME,
+        'push_port': push_channel.v_port or ''
     }
 
     #wiping saved tabs databases list
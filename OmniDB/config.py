@@ -25,6 +25,56 @@ CSRF_TRUSTED_ORIGINS = []
 # Max number of threads that can used by each advanced object search request
 THREAD_POOL_MAX_WORKERS = 2
 
+# Connection pool used by database tree tabs. Each (connection, database, user)
+# keeps at most CONNECTION_POOL_MAX_SIZE connections and closes idle ones after
+# CONNECTION_POOL_IDLE_TIMEOUT seconds, always keeping CONNECTION_POOL_MIN_SIZE
+CONNECTION_POOL_MIN_SIZE     = 0
+CONNECTION_POOL_MAX_SIZE     = 4
+CONNECTION_POOL_IDLE_TIMEOUT = 600
+
+# Port of the server-sent events channel used to push results to the browser.
+# None disables it and the browser uses long polling, 0 picks a free port.
+# Browsers connect to this port directly, so only enable it when they can reach
+# it, i.e. not when OmniDB is served through a reverse proxy
+PUSH_CHANNEL_PORT = None
+
+# Bytes of responses that may wait for a browser before queries pause fetching,
+# and seconds a paused query waits for the browser before it is cancelled
+RESPONSE_QUEUE_MAX_SIZE = 64*1024*1024
+RESPONSE_QUEUE_TIMEOUT  = 300
+
+# Worker threads that run query, console, edit data and object search requests,
+# and how many of them a single user may occupy. The priority workers are extra
+# workers that only load pages of edit data tabs. Tree and other metadata
+# requests don't use this pool, they run directly in the web server's threads
+REQUEST_POOL_MAX_WORKERS      = 32
+REQUEST_POOL_MAX_PER_USER     = 8
+REQUEST_POOL_PRIORITY_WORKERS = 4
+
+# Send query result blocks as typed columns, with integers kept as numbers and
+# repeated strings sent once, instead of rows of strings
+COMPACT_RESULT_BLOCKS = True
+
+# Max number of edited rows saved by a single insert, update or delete statement
+EDIT_DATA_BATCH_SIZE = 500
+
+# Terminal output read within TERMINAL_FRAME_SECONDS of the first byte is sent
+# as one message of up to TERMINAL_FRAME_SIZE chars. An idle terminal checks
+# its connection every TERMINAL_IDLE_SECONDS
+TERMINAL_IDLE_SECONDS  = 1
+TERMINAL_FRAME_SECONDS = 0.02
+TERMINAL_FRAME_SIZE    = 10000
+
+# Seconds without activity before a browser client or one of its tabs is
+# closed, and threads used to close their database connections
+TAB_IDLE_TIMEOUT = 3600
+CLOSER_THREADS   = 4
+
+# Seconds an edit data tab may keep its paging cursor, and the transaction
+# around it, open without fetching more records. Keep it short, the open
+# transaction holds back vacuum on the table
+EDIT_DATA_IDLE_TIMEOUT = 30
+
 # List of domains that OmniDB can serve. '*' serves all domains
 ALLOWED_HOSTS = ['*']
 
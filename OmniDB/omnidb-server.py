@@ -523,6 +523,19 @@ class DjangoApplication(object):
             # Startup
             startup.startup_procedure()
 
+            if OmniDB.settings.PUSH_CHANNEL_PORT is not None:
+                from OmniDB_app.views import push_channel
+                try:
+                    push_port = push_channel.start(
+                        parameters['listening_address'],
+                        OmniDB.settings.PUSH_CHANNEL_PORT,
+                        ssl_ctx if parameters['is_ssl'] else None
+                    )
+                    logger.info("Push channel listening at {0}:{1}.".format(parameters['listening_address'],str(push_port)))
+                except Exception as exc:
+                    print("Could not start push channel, using long polling: {0}".format(str(exc)),flush=True)
+                    logger.error("Could not start push channel: {0}".format(str(exc)))
+
             cherrypy.engine.start()
 
             if not app_version:
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# RequestExecutor is imported as OmniDB_app.include.RequestExecutor, like in the app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'OmniDB')))
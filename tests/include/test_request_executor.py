@@ -0,0 +1,50 @@
+import threading
+
+from OmniDB_app.include.RequestExecutor import RequestExecutor
+
+
+def test_stop_drops_queued_task_without_running_it():
+    v_dropped = []
+    v_ran = []
+    v_release = threading.Event()
+    v_executor = RequestExecutor(1, 1, 0, v_dropped.append)
+
+    # The user's only slot is taken, so the second task stays queued
+    v_busy = v_executor.Task(lambda self, args: v_release.wait(5), None, 'user')
+    v_busy.start()
+    v_search = v_executor.Task(lambda self, args: v_ran.append(args), 'search', 'user')
+    v_search.start()
+
+    v_search.stop()
+    v_release.set()
+    v_done = v_executor.Task(lambda self, args: args.set(), threading.Event(), 'user')
+    v_done.start()
+
+    assert v_done.v_args.wait(5)
+    assert v_dropped == [v_search]
+    assert v_ran == []
+    assert v_search.cancel
+
+
+def test_stop_leaves_started_task_to_finish():
+    v_dropped = []
+    v_started = threading.Event()
+    v_release = threading.Event()
+    v_finished = threading.Event()
+    v_executor = RequestExecutor(1, 1, 0, v_dropped.append)
+
+    def run(self, args):
+        v_started.set()
+        v_release.wait(5)
+        v_finished.set()
+
+    v_task = v_executor.Task(run, None, 'user')
+    v_task.start()
+    assert v_started.wait(5)
+
+    v_task.stop()
+    v_release.set()
+
+    assert v_finished.wait(5)
+    assert v_dropped == []
+    assert v_task.cancel
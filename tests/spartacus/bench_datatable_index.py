@@ -0,0 +1,47 @@
+'''
+Compares DataTable.Select with and without a hash index on 1M rows.
+
+    python tests/spartacus/bench_datatable_index.py [rows] [lookups]
+'''
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'OmniDB')))
+
+import OmniDB_app.include.Spartacus as Spartacus
+import OmniDB_app.include.Spartacus.Database
+
+
+def build(p_rows):
+    v_table = Spartacus.Database.DataTable(p_simple=True)
+    v_table.AddColumn('id')
+    v_table.AddColumn('name')
+    v_table.Rows = [[i, 'name{0}'.format(i)] for i in range(p_rows)]
+    return v_table
+
+
+def run(p_table, p_rows, p_lookups):
+    v_start = time.perf_counter()
+    for i in range(p_lookups):
+        v_result = p_table.Select('id', (i * 7919) % p_rows)
+        assert len(v_result.Rows) == 1
+    return time.perf_counter() - v_start
+
+
+if __name__ == '__main__':
+    v_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    v_lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    v_table = build(v_rows)
+    v_scan = run(v_table, v_rows, v_lookups)
+
+    v_start = time.perf_counter()
+    v_table.CreateIndex('id')
+    v_build = time.perf_counter() - v_start
+    v_index = run(v_table, v_rows, v_lookups)
+
+    print('{0} rows, {1} lookups'.format(v_rows, v_lookups))
+    print('scan:  {0:10.3f} ms per lookup'.format(v_scan * 1000 / v_lookups))
+    print('index: {0:10.3f} ms per lookup, {1:.0f} ms to build'.format(v_index * 1000 / v_lookups, v_build * 1000))
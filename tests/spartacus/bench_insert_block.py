@@ -0,0 +1,77 @@
+'''
+Compares SQLite InsertBlock through parameterized executemany batches with the
+previous path that mogrified every row into one SQL script.
+
+    python tests/spartacus/bench_insert_block.py [rows] [batchsize]
+'''
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'OmniDB')))
+
+import OmniDB_app.include.Spartacus as Spartacus
+import OmniDB_app.include.Spartacus.Database
+
+
+def build(p_rows):
+    v_table = Spartacus.Database.DataTable()
+    v_table.AddColumn('id')
+    v_table.AddColumn('name')
+    v_table.AddColumn('price')
+    for i in range(p_rows):
+        v_table.AddRow([i, "name'{0}".format(i), i * 0.5])
+    return v_table
+
+
+def create(p_path):
+    v_database = Spartacus.Database.SQLite(p_path)
+    v_database.Execute('drop table if exists items')
+    v_database.Execute('create table items (id integer, name text, price real)')
+    return v_database
+
+
+def insert_mogrify(p_database, p_table):
+    v_fields = [Spartacus.Database.DataField(c) for c in p_table.Columns]
+    v_insert = 'begin; '
+    for r in p_table.Rows:
+        v_insert = v_insert + 'insert into items(' + ','.join(p_table.Columns) + ') values ' + p_database.Mogrify(r, v_fields) + '; '
+    v_insert = v_insert + 'commit;'
+    p_database.Open()
+    try:
+        p_database.v_con.executescript(v_insert)
+    finally:
+        p_database.Close()
+
+
+def insert_many(p_database, p_table, p_batchsize):
+    p_database.InsertBlock(p_table, 'items', None, p_batchsize)
+
+
+def run(p_function, *p_args):
+    v_start = time.perf_counter()
+    p_function(*p_args)
+    return time.perf_counter() - v_start
+
+
+if __name__ == '__main__':
+    v_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    v_batchsize = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    v_table = build(v_rows)
+    with tempfile.TemporaryDirectory() as v_dir:
+        v_path = os.path.join(v_dir, 'bench.db')
+
+        v_database = create(v_path)
+        v_mogrify = run(insert_mogrify, v_database, v_table)
+        assert v_database.ExecuteScalar('select count(*) from items') == v_rows
+
+        v_database = create(v_path)
+        v_many = run(insert_many, v_database, v_table, v_batchsize)
+        assert v_database.ExecuteScalar('select count(*) from items') == v_rows
+
+    print('{0} rows, batch size {1}'.format(v_rows, v_batchsize))
+    print('mogrify:     {0:10.0f} ms'.format(v_mogrify * 1000))
+    print('executemany: {0:10.0f} ms'.format(v_many * 1000))
@@ -0,0 +1,54 @@
+import gzip
+import io
+
+import OmniDB_app.include.Spartacus as Spartacus
+import OmniDB_app.include.Spartacus.Database
+
+
+def test_copy_writer_writes_through():
+    v_file = io.StringIO()
+    v_writer = Spartacus.Database.DataCopyWriter(v_file)
+    v_writer.write('id;name\n')
+    v_writer.write('1;a\n')
+    assert v_file.getvalue() == 'id;name\n1;a\n'
+
+
+def test_copy_writer_reports_rows_without_header():
+    v_progress = []
+    v_writer = Spartacus.Database.DataCopyWriter(io.StringIO(), v_progress.append, 0)
+    v_writer.write('id;name\n')
+    v_writer.write('1;a\n')
+    v_writer.write('2;b\n')
+    assert v_progress == [0, 1, 2]
+
+
+def test_copy_writer_reports_at_most_once_per_interval():
+    v_progress = []
+    v_writer = Spartacus.Database.DataCopyWriter(io.StringIO(), v_progress.append, 3600)
+    for i in range(0, 100):
+        v_writer.write('{0}\n'.format(i))
+    assert v_progress == []
+
+
+def test_copy_writer_is_a_text_target():
+    # psycopg2's copy_expert only writes str to io.TextIOBase targets
+    assert isinstance(Spartacus.Database.DataCopyWriter(io.StringIO()), io.TextIOBase)
+
+
+def test_copy_writer_decodes_bytes_into_text_file(tmp_path):
+    v_path = tmp_path / 'export.csv'
+    with open(v_path, 'w', encoding='utf-8') as v_file:
+        v_writer = Spartacus.Database.DataCopyWriter(v_file, None, 1, 'latin-1')
+        v_writer.write('id;name\n'.encode('latin-1'))
+        v_writer.write('1;ação\n'.encode('latin-1'))
+    assert v_path.read_text(encoding='utf-8') == 'id;name\n1;ação\n'
+
+
+def test_copy_writer_decodes_bytes_into_gzip_file(tmp_path):
+    v_path = tmp_path / 'export.csv.gz'
+    with gzip.open(v_path, 'wt', encoding='utf-8') as v_file:
+        v_writer = Spartacus.Database.DataCopyWriter(v_file)
+        v_writer.write(b'id;name\n')
+        v_writer.write('1;ação\n'.encode('utf-8'))
+    with gzip.open(v_path, 'rt', encoding='utf-8') as v_file:
+        assert v_file.read() == 'id;name\n1;ação\n'
@@ -0,0 +1,73 @@
+import pytest
+
+import OmniDB_app.include.Spartacus as Spartacus
+import OmniDB_app.include.Spartacus.Database
+
+
+def make_table(p_simple, p_rows=200):
+    v_table = Spartacus.Database.DataTable(p_simple=p_simple)
+    v_table.AddColumn('id')
+    v_table.AddColumn('name')
+    v_table.AddColumn('price')
+    for i in range(p_rows):
+        v_table.AddRow([i % 50, 'name{0}'.format(i), i * 0.1])
+    return v_table
+
+
+def values(p_table):
+    return [list(r.values()) if isinstance(r, dict) else list(r) for r in p_table.Rows]
+
+
+@pytest.mark.parametrize('p_simple', [False, True])
+def test_select_same_rows_with_and_without_index(p_simple):
+    v_plain = make_table(p_simple)
+    v_indexed = make_table(p_simple)
+    v_indexed.CreateIndex('id')
+    v_indexed.CreateIndex(['name', 'id'])
+    for v_key, v_value in [
+        ('id', 7),
+        ('id', 999),
+        (['name', 'id'], ['name57', 7]),
+        (['id', 'name'], [7, 'name57']),
+        ('price', 0.3),
+    ]:
+        assert values(v_indexed.Select(v_key, v_value)) == values(v_plain.Select(v_key, v_value))
+    assert len(v_indexed.Select('id', 7).Rows) == 4
+
+
+def test_index_follows_added_rows():
+    v_table = make_table(False, 10)
+    v_table.CreateIndex('id')
+    v_table.AddRow([3, 'late', 1.0])
+    v_table.Rows.append(v_table.Rows[0])
+    assert [r['name'] for r in v_table.Select('id', 3).Rows] == ['name3', 'late']
+    assert len(v_table.Select('id', 0).Rows) == 2
+
+
+def test_index_float_matches_equal():
+    v_table = make_table(False, 10)
+    v_table.CreateIndex('price')
+    assert len(v_table.Select('price', 0.30000000000000004).Rows) == 1
+
+
+@pytest.mark.parametrize('p_simple', [False, True])
+def test_index_on_json_values(p_simple):
+    v_table = Spartacus.Database.DataTable(p_simple=p_simple)
+    v_table.AddColumn('id')
+    v_table.AddColumn('doc')
+    v_table.CreateIndex('doc')
+    v_table.AddRow([1, {'a': 1, 'b': [1, 2]}])
+    v_table.AddRow([2, [1, 2]])
+    v_table.AddRow([3, {'b': [1, 2], 'a': 1}])
+    assert [r[0] for r in values(v_table.Select('doc', {'a': 1, 'b': [1, 2]}))] == [1, 3]
+    assert [r[0] for r in values(v_table.Select('doc', [[1, 2]]))] == [2]
+
+
+def test_index_on_unhashable_values_scans():
+    v_table = Spartacus.Database.DataTable()
+    v_table.AddColumn('id')
+    v_table.AddColumn('blob')
+    v_table.CreateIndex('blob')
+    v_table.AddRow([1, bytearray(b'x')])
+    v_table.AddRow([2, bytearray(b'y')])
+    assert [r['id'] for r in v_table.Select('blob', bytearray(b'y')).Rows] == [2]
@@ -0,0 +1,48 @@
+import OmniDB_app.include.Spartacus as Spartacus
+import OmniDB_app.include.Spartacus.Database
+
+
+def build(p_rows):
+    v_table = Spartacus.Database.DataTable()
+    v_table.AddColumn('id')
+    v_table.AddColumn('name')
+    for i in range(p_rows):
+        v_table.AddRow([i, "o'name{0}".format(i)])
+    return v_table
+
+
+def create(p_path):
+    v_database = Spartacus.Database.SQLite(str(p_path))
+    v_database.Execute('create table items (id integer, name text)')
+    return v_database
+
+
+def test_insert_block_inserts_every_batch(tmp_path):
+    v_database = create(tmp_path / 'test.db')
+    v_database.InsertBlock(build(25), 'items', None, 10)
+    v_result = v_database.Query('select id, name from items order by id')
+    assert len(v_result.Rows) == 25
+    assert v_result.Rows[24]['name'] == "o'name24"
+
+
+def test_insert_block_opens_connection_once(tmp_path, monkeypatch):
+    v_database = create(tmp_path / 'test.db')
+    v_opens = []
+    v_open = v_database.Open
+    def counting_open(*args, **kwargs):
+        v_opens.append(1)
+        return v_open(*args, **kwargs)
+    monkeypatch.setattr(v_database, 'Open', counting_open)
+    v_database.InsertBlock(build(25), 'items', None, 10)
+    assert len(v_opens) == 1
+    assert v_database.v_con is None
+    assert v_database.ExecuteScalar('select count(*) from items') == 25
+
+
+def test_insert_block_keeps_open_connection(tmp_path):
+    v_database = create(tmp_path / 'test.db')
+    v_database.Open()
+    v_database.InsertBlock(build(5), 'items', None, 2)
+    assert v_database.v_con is not None
+    v_database.Close()
+    assert v_database.ExecuteScalar('select count(*) from items') == 5